@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+The procfile serves everything through this app with uvicorn workers, so
+the SSE streams are cheap coroutines. Under ASGI, Django runs every sync view
+(home, login, the JSON APIs, the admin) on one thread per worker, so a worker
+handles one of those requests at a time. Request concurrency comes from the
+number of workers: WEB_CONCURRENCY, 4 by default.
 """
 
 import os
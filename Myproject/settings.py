@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole middleware stack
+    'members.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,11 +80,118 @@ WSGI_APPLICATION = 'Myproject.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 plus the SQLITE_* settings below
+        'ENGINE': 'members.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests instead of reopening them every time
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds sqlite3 waits for a lock before raising "database is locked"
+            'timeout': 20,
+        },
     }
 }
 
+# Applied to every new SQLite connection. journal_mode=WAL is stored in the
+# database file itself, which is why db.sqlite3 isn't committed: run migrate.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Start transactions with BEGIN IMMEDIATE so writers wait for the lock
+# (up to busy_timeout) instead of failing with "database is locked"
+SQLITE_IMMEDIATE_TRANSACTIONS = True
+
+# Run leaderboard write transactions one at a time across all workers,
+# queued behind a lock on SQLITE_WRITER_LOCK
+SQLITE_SINGLE_WRITER = False
+SQLITE_WRITER_LOCK = os.path.join(BASE_DIR, 'db.sqlite3.lock')
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# LocMem is per process and evicts least recently used keys past MAX_ENTRIES;
+# switch to FileBasedCache to share entries between gunicorn workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'contestvibes',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    # Small values every worker must agree on, such as the leaderboard version and
+    # the LeetCode limiter; keep per-user keys out so culling never drops these
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
+    # Sessions, read by every worker; sized for one per student so they aren't culled
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'sessions'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+    # Submission cursors, one per participant and contest
+    'cursors': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'cursors'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+}
+
+# The logged-in student lives in the session (see members/identity.py). cached_db
+# reads sessions from SESSION_CACHE_ALIAS and only queries django_session when the
+# cache lost one. Expired rows are deleted with manage.py prune_sessions.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Cached leaderboards are rebuilt when the version in this cache moves,
+# and at least every LEADERBOARD_CACHE_MAX_AGE seconds.
+LEADERBOARD_CACHE_ALIAS = 'shared'
+LEADERBOARD_CACHE_MAX_AGE = 300
+
+# Each contest's {slug: question} map used to score verifies; shared so that
+# every worker sees question edits at once.
+CONTEST_QUESTIONS_CACHE_ALIAS = 'shared'
+
+# Per-user cursors: the newest submission a verify has processed and the solves
+# so far, so later verifies only read newer submissions (see members/cursors.py)
+SUBMISSION_CURSOR_CACHE_ALIAS = 'cursors'
+SUBMISSION_CURSOR_TIMEOUT = 2 * 24 * 3600
+
+# Verify results are buffered and written in bulk every LEADERBOARD_FLUSH_SECONDS,
+# or once LEADERBOARD_FLUSH_SIZE are waiting (see members/writebehind.py)
+LEADERBOARD_WRITE_BEHIND = True
+LEADERBOARD_FLUSH_SECONDS = 2
+LEADERBOARD_FLUSH_SIZE = 200
+
+# Equal marks are ranked by solve times (see members/events.py): 'penalty' sums
+# the time to each first accept, ICPC style; 'first_solve' uses the last one
+LEADERBOARD_TIEBREAK = 'penalty'
+
+# The leaderboard part of home.html is rendered once per leaderboard version and
+# kept in the default cache for this many seconds (see {% cache %} in home.html)
+HOME_FRAGMENT_SECONDS = 600
+
+# Longest time a worker keeps today's contest in memory without re-reading it,
+# so contest edits made through another worker show up within this many seconds.
+CURRENT_CONTEST_MAX_AGE = 60
+
+# Live leaderboard stream (Server-Sent Events, served by the ASGI app)
+LIVE_STREAM_QUEUE_SIZE = 100
+LIVE_STREAM_KEEPALIVE_SECONDS = 15
+LIVE_STREAM_MAX_SECONDS = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -129,4 +238,91 @@ STATICFILES_DIRS = [
 
 # WhiteNoise storage backend (for compression + cache busting)
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic writes hashed names plus .gz and, with Brotli installed, .br
+# copies (the .br files aren't committed: run collectstatic on deploy); WhiteNoise serves the hashed files with a year-long immutable
+# Cache-Control and picks the smallest encoding the browser accepts.
+# static/css/home.css is built from assets/home.css: npm run build:css
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Verification jobs
+# A verify click is queued and handled by this many threads per web process.
+
+VERIFY_WORKERS = 4
+VERIFY_QUEUE_SIZE = 500
+VERIFY_JOB_STALE_SECONDS = 120
+
+
+# LeetCode client
+# One pooled keep-alive session per process; timeouts are (connect, read) seconds.
+
+LEETCODE_GRAPHQL_URL = os.environ.get('LEETCODE_GRAPHQL_URL', 'https://leetcode.com/graphql')
+LEETCODE_POOL_SIZE = 10
+LEETCODE_CONNECT_TIMEOUT = 3.05
+LEETCODE_READ_TIMEOUT = 10
+LEETCODE_BATCH_SIZE = 20
+
+# The profile-page fallback (fetch.get_submissions_from_profile) stops reading a
+# page after this many bytes or seconds if it hasn't found the submissions yet.
+LEETCODE_PROFILE_MAX_BYTES = 2 * 1024 * 1024
+LEETCODE_PROFILE_MAX_SECONDS = 5
+
+# Upstream calls in flight at once per event loop for the async client
+LEETCODE_ASYNC_CONCURRENCY = 100
+
+# Upstream protection, shared by all workers through LEETCODE_LIMITER_CACHE_ALIAS:
+# a token bucket of LEETCODE_RATE_LIMIT calls/second (bursts up to LEETCODE_RATE_BURST),
+# up to LEETCODE_MAX_RETRIES retries with jittered exponential backoff or Retry-After,
+# and a circuit breaker that stops calling for LEETCODE_BREAKER_COOLDOWN seconds after
+# LEETCODE_BREAKER_THRESHOLD failures in a row. No call waits longer than LEETCODE_MAX_WAIT.
+LEETCODE_LIMITER_CACHE_ALIAS = 'shared'
+LEETCODE_RATE_LIMIT = 10
+LEETCODE_RATE_BURST = 20
+LEETCODE_MAX_RETRIES = 2
+LEETCODE_BACKOFF_BASE = 0.5
+LEETCODE_BACKOFF_MAX = 8
+LEETCODE_MAX_WAIT = 10
+LEETCODE_BREAKER_THRESHOLD = 5
+LEETCODE_BREAKER_COOLDOWN = 30
+
+# Contest poller (manage.py poll_contest): seconds between polls of a user who just
+# solved something, the most an idle user's interval grows to, the growth factor,
+# and how often newly registered participants are picked up.
+POLLER_MIN_INTERVAL = 30
+POLLER_MAX_INTERVAL = 300
+POLLER_BACKOFF = 2
+POLLER_REFRESH_SECONDS = 60
+
+# Recent submissions are cached per user for this many seconds
+LEETCODE_CACHE_ALIAS = 'default'
+LEETCODE_CACHE_TTL = 30
+
+# Request metrics (members/metrics.py), served per process at /metrics. Off by
+# default; /metrics also stays closed until METRICS_TOKEN is set, and scrapers
+# send it as "Authorization: Bearer <token>". With METRICS_SERVER_TIMING, responses also
+# carry a Server-Timing header that browser dev tools show next to each request.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_SERVER_TIMING = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'plain',
+        },
+    },
+    'loggers': {
+        'members': {
+            'handlers': ['console'],
+            'level': os.environ.get('MEMBERS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
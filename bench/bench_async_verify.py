@@ -0,0 +1,64 @@
+"""
+Verify throughput of one worker: sync client versus async client.
+
+A gunicorn sync worker handles one verify at a time, so its throughput is
+bounded by upstream latency. An ASGI worker overlaps in-flight calls on one
+event loop, up to LEETCODE_ASYNC_CONCURRENCY. Both variants fetch and score
+``--verifies`` users from a local GraphQL stub answering after ``--latency-ms``.
+
+    python -m bench.bench_async_verify --verifies 200 --latency-ms 100
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench import django_setup
+from bench.stub_leetcode import StubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--verifies', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+
+    server = StubServer(latency_ms=args.latency_ms).start()
+    django_setup.setup(
+        LEETCODE_GRAPHQL_URL=server.url,
+        LEETCODE_ASYNC_CONCURRENCY=args.concurrency,
+    )
+    from members import fetch
+
+    usernames = [f'user{n}' for n in range(args.verifies)]
+
+    started = time.perf_counter()
+    for username in usernames:
+        submissions = fetch.get_latest_submissions(username, 10)
+        fetch.display_solved_questions(submissions, username, 10)
+    sync_seconds = time.perf_counter() - started
+
+    async def verify_all():
+        async def verify_one(username):
+            submissions = await fetch.aget_latest_submissions(username, 10)
+            return await fetch.adisplay_solved_questions(submissions, username, 10)
+        results = await asyncio.gather(*(verify_one(username) for username in usernames))
+        await fetch.aclose_client()
+        return results
+
+    started = time.perf_counter()
+    asyncio.run(verify_all())
+    async_seconds = time.perf_counter() - started
+    server.shutdown()
+
+    print(json.dumps({
+        'verifies': args.verifies,
+        'upstream_latency_ms': args.latency_ms,
+        'sync_worker_verifies_per_sec': round(args.verifies / sync_seconds, 1),
+        'async_worker_verifies_per_sec': round(args.verifies / async_seconds, 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares per-call ``requests.post`` against the pooled LeetCodeClient.
+
+Fires ``--verifies`` GraphQL calls from ``--threads`` concurrent threads at a
+local stub server whose new connections cost ``--handshake-ms``, and reports
+wall time, throughput and how many connections each variant opened.
+
+    python -m bench.bench_http_pool --verifies 500 --threads 16 --handshake-ms 30
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from members import fetch
+from bench.stub_leetcode import StubServer
+
+
+def run(label, call, verifies, threads, server):
+    server.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: call(), range(verifies)))
+    elapsed = time.perf_counter() - started
+    return {
+        'variant': label,
+        'seconds': round(elapsed, 3),
+        'verifies_per_sec': round(verifies / elapsed, 1),
+        'connections_opened': server.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--verifies', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--handshake-ms', type=float, default=30)
+    args = parser.parse_args()
+
+    server = StubServer(handshake_ms=args.handshake_ms).start()
+    payload = {
+        'query': fetch.SUBMISSIONS_QUERY,
+        'variables': {'username': 'bench', 'limit': 10},
+    }
+    client = fetch.LeetCodeClient(url=server.url, pool_size=args.threads)
+
+    results = [
+        run('requests.post per call',
+            lambda: requests.post(server.url, json=payload, timeout=10).json(),
+            args.verifies, args.threads, server),
+        run('pooled LeetCodeClient',
+            lambda: client.post_graphql(payload).json(),
+            args.verifies, args.threads, server),
+    ]
+    client.close()
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
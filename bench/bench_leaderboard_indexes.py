@@ -0,0 +1,118 @@
+"""
+Leaderboard query plans and latency before and after the index migration.
+
+Migrates a throwaway database up to 0008 (no leaderboard indexes), seeds
+``--rows`` leaderboard entries spread over ``--contests`` contest days, times
+the queries the views run, then applies 0009 and times them again.
+
+    python -m bench.bench_leaderboard_indexes --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from bench import django_setup
+
+QUERIES = {
+    'latest contest day': (
+        'SELECT contest_date FROM members_contestleaderboard ORDER BY contest_date DESC LIMIT 1', ()
+    ),
+    'one day ranked by marks': (
+        'SELECT id, user_name, marks FROM members_contestleaderboard '
+        'WHERE contest_date = %s ORDER BY marks DESC LIMIT 10', ('LAST_DAY',)
+    ),
+    'upsert lookup': (
+        'SELECT id FROM members_contestleaderboard '
+        'WHERE contest_name = %s AND user_name = %s AND contest_date = %s', ('LAST_NAME', 'user7', 'LAST_DAY')
+    ),
+    'contest of the day': (
+        'SELECT id FROM members_contest WHERE date = %s LIMIT 1', ('LAST_DAY',)
+    ),
+}
+
+
+def seed(connection, rows, contests):
+    first_day = date(2020, 1, 1)
+    days = [(first_day + timedelta(days=7 * n)).isoformat() for n in range(contests)]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO members_contest (name, date, start_time, end_time, question_1, question_1_link,"
+            " question_2, question_2_link, question_3, question_3_link) VALUES (%s, %s, %s, %s, '', '', '', '', '', '')",
+            [(f'Contest {n}', day, '18:00:00', '19:30:00') for n, day in enumerate(days)],
+        )
+        per_day = rows // contests
+        batch = []
+        for n, day in enumerate(days):
+            for user in range(per_day):
+                solved = [random.random() < 0.5 for _ in range(3)]
+                batch.append((f'Contest {n}', f'user{user}', 100 * sum(solved), *solved, day))
+                if len(batch) >= 50000:
+                    _insert_entries(cursor, batch)
+                    batch = []
+        _insert_entries(cursor, batch)
+    return f'Contest {contests - 1}', days[-1]
+
+
+def _insert_entries(cursor, batch):
+    cursor.executemany(
+        'INSERT INTO members_contestleaderboard (contest_name, user_name, marks, question1, question2,'
+        ' question3, contest_date) VALUES (%s, %s, %s, %s, %s, %s, %s)',
+        batch,
+    )
+
+
+def measure(connection, last_name, last_day, repeat):
+    results = {}
+    with connection.cursor() as cursor:
+        for label, (sql, params) in QUERIES.items():
+            params = [last_name if p == 'LAST_NAME' else last_day if p == 'LAST_DAY' else p for p in params]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' | '.join(row[-1] for row in cursor.fetchall())
+            started = time.perf_counter()
+            for _ in range(repeat):
+                cursor.execute(sql, params)
+                cursor.fetchall()
+            results[label] = {
+                'plan': plan,
+                'ms': round((time.perf_counter() - started) * 1000 / repeat, 3),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--contests', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = django_setup.setup()
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    try:
+        call_command('migrate', 'members', '0008', verbosity=0)
+        with transaction.atomic():
+            last_name, last_day = seed(connection, args.rows, args.contests)
+        before = measure(connection, last_name, last_day, args.repeat)
+
+        started = time.perf_counter()
+        call_command('migrate', 'members', '0009', verbosity=0)
+        migrate_seconds = round(time.perf_counter() - started, 2)
+        after = measure(connection, last_name, last_day, args.repeat)
+
+        print(json.dumps({
+            'rows': args.rows,
+            'migration_seconds': migrate_seconds,
+            'queries': {label: {'before': before[label], 'after': after[label]} for label in QUERIES},
+        }, indent=2))
+    finally:
+        connection.close()
+        os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Compares the old profile-page extraction from temp.py against the streaming scanner.
+
+Runs both over the saved pages in bench/fixtures and reports, per page, the
+time per call, the peak memory it allocated (tracemalloc) and how much of
+the page it had to read:
+
+    profile_next_data  the list inside a __NEXT_DATA__ JSON script
+    profile_flight     the list inside JSON embedded as a string literal
+    profile_private    a page without the list (private profile)
+
+The old way decodes the whole page, runs its regexes over it and json.loads
+the __NEXT_DATA__ blob; the scanner is fed the page in the 16 KiB pieces
+fetch.get_submissions_from_profile reads it in.
+
+    python -m bench.bench_profile_extract --repeat 50
+"""
+import argparse
+import json
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+from members import fetch
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+KEY = 'recentSubmissionList'
+
+
+def extract_json_array_from_text(text, key):
+    # temp.py before the scanner, kept here as the baseline
+    pattern = re.compile(rf'"{re.escape(key)}"\s*:\s*(\[\s*\{{.*?\}}\s*\])', re.DOTALL)
+    m = pattern.search(text)
+    if not m:
+        pattern2 = re.compile(rf'{re.escape(key)}"\s*:\s*(\[\s*.+?\])', re.DOTALL)
+        m = pattern2.search(text)
+        if not m:
+            return None
+    array_text = m.group(1)
+    try:
+        return json.loads(array_text)
+    except Exception:
+        try:
+            return json.loads(array_text.encode('utf-8').decode('unicode_escape'))
+        except Exception:
+            return None
+
+
+def find_key(obj, key):
+    if isinstance(obj, dict):
+        if key in obj and isinstance(obj[key], list):
+            return obj[key]
+        for value in obj.values():
+            found = find_key(value, key)
+            if found:
+                return found
+    elif isinstance(obj, list):
+        for item in obj:
+            found = find_key(item, key)
+            if found:
+                return found
+    return None
+
+
+def regex_extract(body):
+    text = body.decode('utf-8')
+    submissions = extract_json_array_from_text(text, KEY)
+    if submissions:
+        return submissions, len(body)
+    match = re.search(r'__NEXT_DATA__\s*=\s*({.*?});\s*</script>', text, re.DOTALL)
+    if not match:
+        match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});\s*</script>', text, re.DOTALL)
+    if match:
+        try:
+            return find_key(json.loads(match.group(1)), KEY), len(body)
+        except Exception:
+            pass
+    return None, len(body)
+
+
+class SavedPage:
+    """Stands in for a streamed requests.Response over a saved page."""
+
+    def __init__(self, body):
+        self.body = body
+        self.read = 0
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            chunk = self.body[start:start + chunk_size]
+            self.read += len(chunk)
+            yield chunk
+
+
+def scanner_extract(body):
+    page = SavedPage(body)
+    return fetch._scan_profile(page, len(body), time.perf_counter() + 60), page.read
+
+
+VARIANTS = (('regex + json.loads (temp.py)', regex_extract), ('streaming scanner', scanner_extract))
+
+
+def run(label, extract, body, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        submissions, read = extract(body)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    extract(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'variant': label,
+        'ms_per_call': round(elapsed / repeat * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+        'bytes_read': read,
+        'submissions': None if submissions is None else len(submissions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    report = []
+    for path in sorted(FIXTURES.glob('*.html')):
+        body = path.read_bytes()
+        report.append({
+            'page': path.stem,
+            'bytes': len(body),
+            'results': [run(label, extract, body, args.repeat) for label, extract in VARIANTS],
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
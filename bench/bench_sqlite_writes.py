@@ -0,0 +1,139 @@
+"""
+Stress-tests concurrent leaderboard writes from several processes on SQLite.
+
+Every process stands in for a gunicorn worker: it records ``--writes``
+verify results through verify.record_result (update_or_create plus the
+rating signal, or the write-behind buffer) and closes its connection after
+each one like the end of a request would, unless the profile keeps
+connections open. Each profile runs
+against its own copy of a freshly migrated database.
+
+    python -m bench.bench_sqlite_writes --processes 8 --writes 200
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+PROFILES = {
+    'default sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {},
+        'LEADERBOARD_WRITE_BEHIND': False,
+    },
+    'WAL + busy_timeout': {
+        'SQLITE_IMMEDIATE_TRANSACTIONS': False,
+        'LEADERBOARD_WRITE_BEHIND': False,
+    },
+    'WAL + BEGIN IMMEDIATE': {
+        'LEADERBOARD_WRITE_BEHIND': False,
+    },
+    'WAL + BEGIN IMMEDIATE + single writer': {
+        'SQLITE_SINGLE_WRITER': True,
+        'LEADERBOARD_WRITE_BEHIND': False,
+    },
+    'WAL + BEGIN IMMEDIATE + write-behind': {
+        'LEADERBOARD_WRITE_BEHIND': True,
+    },
+}
+
+DATABASE_KEYS = ('ENGINE', 'CONN_MAX_AGE', 'OPTIONS')
+
+
+def worker(db_path, profile, index, writes, users):
+    from bench.django_setup import setup
+    from Myproject import settings as project_settings
+
+    database = dict(project_settings.DATABASES['default'])
+    for name in DATABASE_KEYS:
+        if name in profile:
+            database[name] = profile[name]
+    database['NAME'] = db_path
+    overrides = {name: value for name, value in profile.items() if name not in DATABASE_KEYS}
+    setup(db_path, DATABASES={'default': database}, SQLITE_WRITER_LOCK=db_path + '.lock', **overrides)
+
+    from django.db import OperationalError, close_old_connections
+    from members.models import Contest
+    from members import verify, writebehind
+
+    contest = Contest.objects.get()
+    latencies = []
+    errors = 0
+    loop_started = time.perf_counter()
+    for i in range(writes):
+        result = {
+            'marks': (i % 4) * 100, 'question1': i % 4 > 0, 'question2': i % 4 > 1, 'question3': i % 4 > 2,
+            'penalty': i % 4 * 600,
+        }
+        started = time.perf_counter()
+        try:
+            verify.record_result(contest, f'user{(index * writes + i) % users}', result)
+        except OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+        close_old_connections()
+    # Buffered results only count once they are in the database
+    writebehind.flush()
+    return latencies, errors, time.perf_counter() - loop_started
+
+
+def run(label, profile, template, processes, writes, users):
+    directory = tempfile.mkdtemp(prefix='contestvibes-writes-')
+    db_path = os.path.join(directory, 'db.sqlite3')
+    shutil.copy(template, db_path)
+
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn')) as pool:
+        futures = [pool.submit(worker, db_path, profile, index, writes, users) for index in range(processes)]
+        outcomes = [future.result() for future in futures]
+    shutil.rmtree(directory)
+
+    # Process start-up and Django setup aren't counted, only the write loops
+    elapsed = max(seconds for _, _, seconds in outcomes)
+    latencies = sorted(latency for found, _, _ in outcomes for latency in found)
+    errors = sum(found for _, found, _ in outcomes)
+    return {
+        'profile': label,
+        'writes': len(latencies) - errors,
+        'locked_errors': errors,
+        'seconds': round(elapsed, 3),
+        'writes_per_sec': round((len(latencies) - errors) / elapsed, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Writes per process')
+    parser.add_argument('--users', type=int, default=500, help='Distinct leaderboard rows written')
+    args = parser.parse_args()
+
+    from bench.django_setup import setup
+
+    template = setup(SQLITE_PRAGMAS={})  # no WAL, so the default profile starts from a plain journal
+    from datetime import date, time as clock
+
+    from django.core.management import call_command
+    from django.db import connection
+    from members.models import Contest
+
+    call_command('migrate', verbosity=0)
+    Contest.objects.create(name='Bench', date=date.today(), start_time=clock(0), end_time=clock(23, 59))
+    connection.close()
+
+    results = [
+        run(label, profile, template, args.processes, args.writes, args.users)
+        for label, profile in PROFILES.items()
+    ]
+    os.remove(template)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
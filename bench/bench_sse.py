@@ -0,0 +1,129 @@
+"""
+Memory cost of idle leaderboard SSE connections under the ASGI app.
+
+Starts uvicorn on Myproject.asgi against a throwaway database, opens
+``--clients`` concurrent streams to /api/leaderboard/stream/, waits until
+every one has received its first event, and reports the server's resident
+memory before and after.
+
+    python -m bench.bench_sse --clients 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench import django_setup
+
+# Myproject.settings with the database the benchmark set up
+SETTINGS = """\
+from Myproject.settings import *
+
+DATABASES['default']['NAME'] = {db_path!r}
+"""
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def open_stream(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        b'GET /api/leaderboard/stream/ HTTP/1.1\r\nHost: localhost\r\n'
+        b'Accept: text/event-stream\r\n\r\n'
+    )
+    await writer.drain()
+    received = b''
+    while b'retry:' not in received:
+        chunk = await reader.read(1024)
+        if not chunk:
+            raise ConnectionError('stream closed before its first event')
+        received += chunk
+    return writer
+
+
+async def run(port, clients, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def guarded():
+        async with gate:
+            return await open_stream(port)
+
+    started = time.perf_counter()
+    writers = await asyncio.gather(*(guarded() for _ in range(clients)))
+    return writers, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200, help="Connections opened at once.")
+    args = parser.parse_args()
+
+    db_path = django_setup.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    settings_dir = tempfile.TemporaryDirectory(prefix='contestvibes-sse-')
+    Path(settings_dir.name, 'bench_sse_settings.py').write_text(SETTINGS.format(db_path=db_path))
+    python_path = os.pathsep.join(filter(None, [settings_dir.name, os.getcwd(), os.environ.get('PYTHONPATH')]))
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'Myproject.asgi:application',
+         '--port', str(port), '--log-level', 'warning', '--backlog', '4096',
+         '--timeout-graceful-shutdown', '1'],
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'bench_sse_settings', 'PYTHONPATH': python_path},
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        # One stream first, so imports and the app itself count in the baseline
+        warm, _ = asyncio.run(run(port, 1, 1))
+        baseline = rss_kb(server.pid)
+
+        async def measure():
+            writers, elapsed = await run(port, args.clients, args.concurrency)
+            loaded = rss_kb(server.pid)
+            for writer in writers:
+                writer.close()
+            return loaded, elapsed
+
+        loaded, elapsed = asyncio.run(measure())
+        print(json.dumps({
+            'clients': args.clients,
+            'connect_seconds': round(elapsed, 2),
+            'server_rss_mb_before': round(baseline / 1024, 1),
+            'server_rss_mb_after': round(loaded / 1024, 1),
+            'kb_per_connection': round((loaded - baseline) / args.clients, 1),
+        }, indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+        settings_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
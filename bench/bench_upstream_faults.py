@@ -0,0 +1,74 @@
+"""
+Runs get_latest_submissions against a stub LeetCode that rate limits or fails.
+
+Each scenario starts with a fresh limiter and circuit breaker, fires
+``--calls`` lookups from ``--threads`` threads and reports how many succeeded,
+how many requests actually reached the stub, and how long it took. A healthy
+policy keeps succeeding through sporadic 429/5xx answers and stops hammering
+the stub once it is down.
+
+    python -m bench.bench_upstream_faults --calls 200 --threads 8
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.django_setup import setup
+
+SCENARIOS = [
+    ('healthy', {}),
+    ('10% 503', {'error_rate': 0.1, 'error_status': 503}),
+    ('10% 429, Retry-After 0.2', {'error_rate': 0.1, 'error_status': 429, 'retry_after': 0.2}),
+    ('outage', {'error_rate': 1.0, 'error_status': 503}),
+]
+
+
+def run(label, options, calls, threads):
+    from django.core.cache import caches
+
+    from bench.stub_leetcode import StubServer
+    from members import fetch
+
+    server = StubServer(**options).start()
+    caches['default'].clear()
+    fetch._policy = None
+    client = fetch.LeetCodeClient(url=server.url, pool_size=threads)
+    fetch._client = client
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda i: fetch.get_latest_submissions(f'user{i}', 10), range(calls)))
+    elapsed = time.perf_counter() - started
+
+    client.close()
+    server.shutdown()
+    return {
+        'scenario': label,
+        'succeeded': sum(result is not None for result in results),
+        'calls': calls,
+        'upstream_requests': server.requests,
+        'upstream_errors': server.errors,
+        'seconds': round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=100, help='LEETCODE_RATE_LIMIT for the run')
+    args = parser.parse_args()
+
+    setup(
+        LEETCODE_LIMITER_CACHE_ALIAS='default',
+        LEETCODE_RATE_LIMIT=args.rate,
+        LEETCODE_RATE_BURST=args.rate,
+        LEETCODE_BACKOFF_BASE=0.05,
+    )
+    results = [run(label, options, args.calls, args.threads) for label, options in SCENARIOS]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Configures Django for a benchmark against a throwaway SQLite database."""
+import atexit
+import os
+import tempfile
+
+import django
+from django.conf import settings
+
+
+def _remove(db_path):
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def setup(db_path=None, keep=False, **overrides):
+    """
+    Loads Myproject.settings with the default database pointed at `db_path`.
+
+    A temp file is made if no `db_path` is given, and deleted with its WAL
+    files when the process exits unless `keep` is true.
+
+    Returns:
+        The path of the SQLite file in use.
+    """
+    from Myproject import settings as project_settings
+
+    if db_path is None:
+        handle, db_path = tempfile.mkstemp(prefix='contestvibes-bench-', suffix='.sqlite3')
+        os.close(handle)
+        if not keep:
+            atexit.register(_remove, db_path)
+    values = {name: getattr(project_settings, name) for name in dir(project_settings) if name.isupper()}
+    values['DATABASES'] = {
+        'default': {**project_settings.DATABASES['default'], 'NAME': db_path},
+    }
+    values.update(overrides)
+    settings.configure(**values)
+    django.setup()
+    return db_path
@@ -0,0 +1,237 @@
+"""
+Contest-day load scenarios against the real views, with a stub LeetCode.
+
+Seeds a throwaway database (see bench/seed.py), points the LeetCode client at
+a local StubServer and drives the views through Django's test client from
+``--concurrency`` threads. Every scenario reports p50/p95/p99 latency and
+requests/sec; the JSON goes to stdout or ``--output`` so runs of different
+commits can be compared.
+
+Scenarios:
+    register     POST /register/ with new students
+    login        POST /login/ with seeded credentials
+    home         GET /home/ for seeded users, logged in beforehand
+    leaderboard  GET /api/leaderboard/ pages
+    verify       a verify storm: POST /home/ verify for distinct users, plus
+                 the time until every job finished and was written
+
+    python -m bench.run_scenarios --requests 500 --concurrency 16 --output before.json
+"""
+import argparse
+import itertools
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench import django_setup
+from bench.seed import credentials
+
+SCENARIOS = ('register', 'login', 'home', 'leaderboard', 'verify')
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Runner:
+    """Sends requests from a thread pool, one test client per thread."""
+
+    def __init__(self, concurrency):
+        from django.test import Client
+
+        self.concurrency = concurrency
+        self._local = threading.local()
+        self._client_class = Client
+
+    def client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self._client_class()
+        return self._local.client
+
+    def run(self, name, count, request):
+        """Calls request(client, i) `count` times; a response >= 400 counts as an error."""
+        from django.db import close_old_connections
+
+        def timed(i):
+            started = time.perf_counter()
+            try:
+                status = request(self.client(), i).status_code
+            except Exception:
+                status = 599
+            finally:
+                close_old_connections()
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            outcomes = list(pool.map(timed, range(count)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in outcomes)
+        return {
+            'scenario': name,
+            'requests': count,
+            'concurrency': self.concurrency,
+            'errors': sum(status >= 400 for _, status in outcomes),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'rps': round(count / elapsed, 1),
+        }
+
+
+def scenario_register(runner, count, students):
+    new = itertools.count(students)
+
+    def request(client, i):
+        n = next(new)
+        email, password, _ = credentials(n)
+        return client.post('/register/', {
+            'first_name': 'New', 'last_name': str(n), 'email': email,
+            'password': password, 'confirm_password': password,
+        })
+    return runner.run('register', count, request)
+
+
+def scenario_login(runner, count, students):
+    def request(client, i):
+        email, password, username = credentials(i % students)
+        return client.post('/login/', {'email': email, 'password': password, 'LeetcodeID': username})
+    return runner.run('login', count, request)
+
+
+def logged_in_sessions(count):
+    """Session keys of students 0..count-1, logged in as views.login does, made before timing."""
+    from importlib import import_module
+
+    from django.conf import settings
+    from members.models import Students
+    from members import identity
+
+    store_class = import_module(settings.SESSION_ENGINE).SessionStore
+    emails = [credentials(n)[0] for n in range(count)]
+    by_email = {student.email: student for student in Students.objects.filter(email__in=emails)}
+    keys = []
+    for n in range(count):
+        email, _, username = credentials(n)
+        session = store_class()
+        identity.remember(session, by_email[email], username)
+        session.save()
+        keys.append(session.session_key)
+    return keys
+
+
+def as_session(client, key):
+    from django.conf import settings
+
+    client.cookies[settings.SESSION_COOKIE_NAME] = key
+    return client
+
+
+def scenario_home(runner, count, students):
+    keys = logged_in_sessions(min(count, students))
+
+    def request(client, i):
+        return as_session(client, keys[i % len(keys)]).get('/home/')
+    return runner.run('home', count, request)
+
+
+def scenario_leaderboard(runner, count, students):
+    def request(client, i):
+        return client.get('/api/leaderboard/', {'limit': 50})
+    return runner.run('leaderboard', count, request)
+
+
+def scenario_verify(runner, count, students):
+    from members.models import VerificationJob
+    from members import writebehind
+
+    keys = logged_in_sessions(min(count, students))
+    started = time.perf_counter()
+    result = runner.run('verify', count, lambda client, i: as_session(client, keys[i % len(keys)]).post(
+        '/home/', {'verify': '1'}
+    ))
+    open_statuses = [VerificationJob.QUEUED, VerificationJob.RUNNING]
+    while VerificationJob.objects.filter(status__in=open_statuses).exists():
+        time.sleep(0.05)
+    if writebehind.enabled():
+        writebehind.flush()
+    result['all_written_seconds'] = round(time.perf_counter() - started, 3)
+    result['jobs_failed'] = VerificationJob.objects.filter(status=VerificationJob.FAILED).count()
+    return result
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run (repeatable, all by default)')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--contests', type=int, default=20)
+    parser.add_argument('--participants', type=int, default=2000)
+    parser.add_argument('--upstream-latency-ms', type=float, default=50)
+    parser.add_argument('--upstream-error-rate', type=float, default=0)
+    parser.add_argument('--submissions-per-user', type=int, default=20)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+
+    from bench.stub_leetcode import StubServer
+
+    stub = StubServer(
+        latency_ms=args.upstream_latency_ms,
+        error_rate=args.upstream_error_rate,
+        submissions_per_user=args.submissions_per_user,
+    ).start()
+    django_setup.setup(
+        ALLOWED_HOSTS=['testserver'],
+        DEBUG=False,
+        LEETCODE_GRAPHQL_URL=stub.url,
+        LEETCODE_LIMITER_CACHE_ALIAS='default',
+        LEETCODE_RATE_LIMIT=10000,
+        LEETCODE_RATE_BURST=10000,
+        LEADERBOARD_CACHE_ALIAS='default',
+        CONTEST_QUESTIONS_CACHE_ALIAS='default',
+        VERIFY_QUEUE_SIZE=max(args.requests, 500),
+    )
+    from django.core.management import call_command
+    from bench.seed import seed
+
+    call_command('migrate', verbosity=0)
+    seed(args.students, args.contests, args.participants)
+
+    runner = Runner(args.concurrency)
+    results = []
+    for name in args.scenario or SCENARIOS:
+        scenario = globals()[f'scenario_{name}']
+        results.append(scenario(runner, args.requests, args.students))
+    stub.shutdown()
+
+    report = {
+        'commit': _commit(),
+        'options': vars(args),
+        'upstream_requests': stub.requests,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
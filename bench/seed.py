@@ -0,0 +1,112 @@
+"""
+Seeds a database with contest-day sized data for the benchmarks.
+
+Creates ``--students`` Students (with IsLogin rows carrying their LeetCode
+usernames), ``--contests`` past weekly contests with ``--participants``
+leaderboard entries each, and today's contest whose questions are drawn
+from the stub server's PROBLEMS. StudentRating is rebuilt at the end.
+
+Student i has the email ``student{i}@example.com``, the password
+``password{i}`` and the LeetCode username ``user{i}``.
+
+    python -m bench.seed --db /tmp/contest.sqlite3 --students 5000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from bench import django_setup
+
+CHUNK = 5000
+
+
+def credentials(number):
+    return f'student{number}@example.com', f'password{number}', f'user{number}'
+
+
+def seed(students=5000, contests=20, participants=2000, questions=3):
+    """
+    Fills an empty, migrated database.
+
+    Returns:
+        A dict with how many rows of each kind were created.
+    """
+    from django.db import transaction
+
+    from members.models import (
+        Contest, ContestLeaderboard, ContestQuestion, IsLogin, Students,
+    )
+    from members import contests as contest_times
+    from members import ratings
+    from bench.stub_leetcode import PROBLEMS
+
+    rng = random.Random(7)
+    today = contest_times.now_ist().date()
+    with transaction.atomic():
+        for start in range(0, students, CHUNK):
+            numbers = range(start, min(start + CHUNK, students))
+            Students.objects.bulk_create([
+                Students(first_name='Student', last_name=str(n), email=credentials(n)[0], password=credentials(n)[1])
+                for n in numbers
+            ])
+            IsLogin.objects.bulk_create([
+                IsLogin(email=credentials(n)[0], leetcode_username=credentials(n)[2]) for n in numbers
+            ])
+
+        past = Contest.objects.bulk_create([
+            Contest(name=f'Weekly {n}', date=today - timedelta(days=7 * (contests - n)),
+                    start_time='00:00', end_time='23:59')
+            for n in range(contests)
+        ])
+        for contest in past:
+            entries = []
+            for n in rng.sample(range(students), min(participants, students)):
+                solved = [rng.random() < 0.5 for _ in range(3)]
+                entries.append(ContestLeaderboard(
+                    contest=contest, contest_name=contest.name, contest_date=contest.date,
+                    user_name=credentials(n)[2], marks=100 * sum(solved),
+                    question1=solved[0], question2=solved[1], question3=solved[2],
+                ))
+            ContestLeaderboard.objects.bulk_create(entries, batch_size=CHUNK)
+
+        picked = rng.sample(PROBLEMS, questions)
+        current = Contest.objects.create(
+            name='Bench contest', date=today, start_time='00:00', end_time='23:59:59',
+            **{f'question_{n}': title for n, (title, _) in enumerate(picked[:3], start=1)},
+        )
+        ContestQuestion.objects.bulk_create([
+            ContestQuestion(contest=current, slug=slug, title=title, points=100, order=n)
+            for n, (title, slug) in enumerate(picked, start=1)
+        ])
+    ratings.rebuild()
+    return {
+        'students': students,
+        'contests': contests + 1,
+        'leaderboard_entries': contests * min(participants, students),
+        'questions_today': questions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', help='SQLite file to create (a temp file by default)')
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--contests', type=int, default=20)
+    parser.add_argument('--participants', type=int, default=2000, help='Leaderboard entries per past contest')
+    parser.add_argument('--questions', type=int, default=3, help="Questions in today's contest")
+    args = parser.parse_args()
+
+    # The seeded file is the point, so a temp one is kept too
+    db_path = django_setup.setup(args.db, keep=True)
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    counts = seed(args.students, args.contests, args.participants, args.questions)
+    print(json.dumps({'db': str(db_path), 'seconds': round(time.perf_counter() - started, 2), **counts}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+A local stand-in for https://leetcode.com/graphql used by the benchmarks.
+
+It speaks HTTP/1.1 with keep-alive, answers every recentSubmissionList query
+with canned accepted submissions, and counts the TCP connections it accepts.
+``handshake_ms`` adds a delay to every new connection to stand in for the
+TCP+TLS handshake cost of the real endpoint, ``latency_ms`` to every answer.
+``error_rate`` makes that fraction of requests fail with ``error_status``
+(429 answers carry a ``Retry-After`` of ``retry_after`` seconds when given).
+With ``submissions_per_user`` every user gets that many submissions of
+their own, drawn from PROBLEMS and the same on every call.
+
+Run standalone with ``python -m bench.stub_leetcode --port 8765``.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUBMISSIONS = [
+    {'statusDisplay': 'Accepted', 'title': 'Two Sum', 'titleSlug': 'two-sum', 'timestamp': '1761900000'},
+    {'statusDisplay': 'Wrong Answer', 'title': 'Pow(x, n)', 'titleSlug': 'powx-n', 'timestamp': '1761899000'},
+]
+
+# (title, titleSlug) pairs the generated submissions are drawn from
+PROBLEMS = [
+    ('Two Sum', 'two-sum'),
+    ('Pow(x, n)', 'powx-n'),
+    ('Add Two Numbers', 'add-two-numbers'),
+    ('N-Queens', 'n-queens'),
+    ('Different Ways to Add Parentheses', 'different-ways-to-add-parentheses'),
+    ('Longest Substring Without Repeating Characters', 'longest-substring-without-repeating-characters'),
+    ('Median of Two Sorted Arrays', 'median-of-two-sorted-arrays'),
+    ('Trapping Rain Water', 'trapping-rain-water'),
+]
+
+
+def user_submissions(username, count, now=None):
+    """`count` submissions of `username`, newest first, the same for every call."""
+    rng = random.Random(zlib.crc32(username.encode()))
+    timestamp = int(now or time.time())
+    submissions = []
+    for _ in range(count):
+        title, slug = rng.choice(PROBLEMS)
+        timestamp -= rng.randint(30, 600)
+        submissions.append({
+            'statusDisplay': 'Accepted' if rng.random() < 0.5 else 'Wrong Answer',
+            'title': title,
+            'titleSlug': slug,
+            'timestamp': str(timestamp),
+        })
+    return submissions
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        status, answer = self.server.answer(payload)
+        body = json.dumps(answer).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if status == 429 and self.server.retry_after is not None:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    request_queue_size = 1024
+
+    def __init__(self, address=('127.0.0.1', 0), handshake_ms=0, latency_ms=0,
+                 error_rate=0, error_status=503, retry_after=None, submissions_per_user=None):
+        super().__init__(address, StubHandler)
+        self.submissions_per_user = submissions_per_user
+        self.started_at = time.time()
+        self.handshake_ms = handshake_ms
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/graphql'
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+        if self.handshake_ms:
+            time.sleep(self.handshake_ms / 1000)
+
+    def answer(self, payload):
+        with self._lock:
+            self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return self.error_status, {'errors': [{'message': 'Injected failure'}]}
+        variables = payload.get('variables', {})
+        limit = variables.get('limit', len(SUBMISSIONS))
+        # Batched queries alias the field once per user ("u0: recentSubmissionList(username: $u0, ...)")
+        fields = re.findall(
+            r'(\w+)\s*:\s*recentSubmissionList\s*\(\s*username:\s*\$(\w+)', payload.get('query', '')
+        ) or [('recentSubmissionList', 'username')]
+        return 200, {'data': {
+            field: self.submissions(variables.get(variable, ''), limit) for field, variable in fields
+        }}
+
+    def submissions(self, username, limit):
+        if self.submissions_per_user is None:
+            return SUBMISSIONS[:limit]
+        return user_submissions(username, self.submissions_per_user, self.started_at)[:limit]
+
+    def start(self):
+        """Serves from a daemon thread and returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--handshake-ms', type=float, default=0)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=float, default=None)
+    parser.add_argument('--submissions-per-user', type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubServer(
+        ('127.0.0.1', args.port),
+        handshake_ms=args.handshake_ms,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        submissions_per_user=args.submissions_per_user,
+    )
+    print(f'Serving fake LeetCode GraphQL on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
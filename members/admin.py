@@ -1,8 +1,79 @@
-from django.contrib import admin
-from .models import Students,Contest,IsLogin,ContestLeaderboard
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .models import Students,Contest,IsLogin,ContestLeaderboard,VerificationJob,StudentRating,ContestQuestion,QuestionSolve,AcceptedSubmission
+from . import onboarding
+
+
+class ContestQuestionInline(admin.TabularInline):
+    model = ContestQuestion
+    extra = 0
+
+
+class ContestAdmin(admin.ModelAdmin):
+    inlines = [ContestQuestionInline]
+
+
+class StudentImportForm(forms.Form):
+    file = forms.FileField(help_text="A CSV with a header row, or JSONL with one object per line.")
+    format = forms.ChoiceField(
+        choices=[('', 'From the file name'), ('csv', 'CSV'), ('jsonl', 'JSONL')], required=False,
+    )
+    dry_run = forms.BooleanField(required=False, help_text="Validate and count without writing.")
+
+
+class StudentsAdmin(admin.ModelAdmin):
+    # change_list.html adds an "Import students" button to the list
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='members_students_import'),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        """Imports an uploaded file of students with onboarding.import_students."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = StudentImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            format = form.cleaned_data['format'] or onboarding.detect_format(upload.name)
+            if format is None:
+                form.add_error('format', "Can't tell the format from the file name.")
+            else:
+                handle = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+                report = onboarding.import_students(
+                    onboarding.read_rows(handle, format), dry_run=form.cleaned_data['dry_run'],
+                )
+                prefix = "Dry run, nothing written. " if form.cleaned_data['dry_run'] else ""
+                self.message_user(
+                    request, prefix + report.summary() + ".", messages.WARNING if report.invalid else messages.SUCCESS,
+                )
+                for line_number, reason in report.errors[:10]:
+                    self.message_user(request, f"Line {line_number}: {reason}", messages.WARNING)
+                return redirect('admin:members_students_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'fields': onboarding.FIELDS,
+            'title': "Import students",
+        }
+        return TemplateResponse(request, 'admin/members/students/import.html', context)
+
 
 # Register your models here.
-admin.site.register(Students)
-admin.site.register(Contest)
+admin.site.register(Students, StudentsAdmin)
+admin.site.register(Contest, ContestAdmin)
 admin.site.register(IsLogin)
-admin.site.register(ContestLeaderboard)
\ No newline at end of file
+admin.site.register(ContestLeaderboard)
+admin.site.register(VerificationJob)
+admin.site.register(StudentRating)
+admin.site.register(QuestionSolve)
+admin.site.register(AcceptedSubmission)
@@ -0,0 +1,24 @@
+"""
+The sqlite3 backend with the concurrency settings of members/db.py applied.
+
+New connections get SQLITE_PRAGMAS. With SQLITE_IMMEDIATE_TRANSACTIONS on,
+atomic() blocks start with BEGIN IMMEDIATE, taking the write lock up front,
+where busy_timeout can wait for it; a plain BEGIN that reads and then writes
+fails with "database is locked" as soon as another process is writing.
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if getattr(settings, 'SQLITE_IMMEDIATE_TRANSACTIONS', False):
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
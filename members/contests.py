@@ -0,0 +1,98 @@
+"""
+Contest timing helpers; contest dates and times are in India Standard Time.
+
+current_contest() answers "which contest is on today" from memory. The answer
+is kept until the next moment it could change on its own (the contest's start
+or end, or midnight IST) and dropped by the Contest signals when a contest
+is edited. Other processes don't receive those signals, so the answer is also
+re-read at least every CURRENT_CONTEST_MAX_AGE seconds.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pytz
+from django.conf import settings
+
+from .models import Contest
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+def now_ist():
+    return datetime.now(IST)
+
+
+def contest_window(contest):
+    """
+    Returns the aware (start, end) datetimes of a contest in IST.
+
+    A contest whose end time is not after its start time runs past midnight.
+    """
+    start = IST.localize(datetime.combine(contest.date, contest.start_time))
+    end = IST.localize(datetime.combine(contest.date, contest.end_time))
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+class CurrentContest:
+    """Today's contest with its start and end worked out once."""
+
+    def __init__(self, contest):
+        self.contest = contest
+        self.start, self.end = contest_window(contest)
+
+    def is_running(self, now=None):
+        now = now or now_ist()
+        return self.start <= now <= self.end
+
+
+_current = None
+_expires_at = None
+_lock = threading.Lock()
+
+
+def _next_midnight(now):
+    return IST.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+
+
+def _find_current(now):
+    # Yesterday's contest is still the current one while it runs past midnight
+    found = {}
+    for contest in Contest.objects.filter(date__in=[now.date() - timedelta(days=1), now.date()]).order_by('pk'):
+        found.setdefault(contest.date, contest)
+    yesterday = found.get(now.date() - timedelta(days=1))
+    if yesterday is not None and now <= contest_window(yesterday)[1]:
+        return yesterday
+    return found.get(now.date())
+
+
+def current_contest(now=None):
+    """
+    Returns today's CurrentContest, or None when there is no contest today.
+
+    Until a contest that runs past midnight ends, it is still the current one
+    on the next day.
+    """
+    global _current, _expires_at
+    now = now or now_ist()
+    with _lock:
+        if _expires_at is not None and now < _expires_at:
+            return _current
+
+        contest = _find_current(now)
+        _current = CurrentContest(contest) if contest is not None else None
+        boundaries = [
+            _next_midnight(now),
+            now + timedelta(seconds=getattr(settings, 'CURRENT_CONTEST_MAX_AGE', 60)),
+        ]
+        if _current is not None:
+            boundaries += [moment for moment in (_current.start, _current.end) if moment > now]
+        _expires_at = min(boundaries)
+        return _current
+
+
+def invalidate():
+    global _expires_at
+    with _lock:
+        _expires_at = None
@@ -0,0 +1,144 @@
+"""
+Per-user submission cursors.
+
+A verify used to score a user's last SUBMISSIONS_TO_CHECK submissions from
+scratch every time, so an accepted solve was lost once the user made more
+attempts than that. A cursor records, for one contest and user, the newest
+submission timestamp already processed and the contest questions solved so
+far with their first accept times. A verify only reads the submissions newer
+than it and adds their solves to the ones the cursor holds.
+
+Cursors live in the SUBMISSION_CURSOR_CACHE_ALIAS cache. A missing one (never
+made, or evicted) starts from the event store and the user's leaderboard
+entry, so solves that were already recorded are kept and only the window is
+read again.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ContestLeaderboard, QuestionSolve
+from . import contests
+from . import events
+from . import questions
+from . import writebehind
+
+# LeetCode's recentSubmissionList returns at most this many entries
+MAX_SUBMISSIONS_TO_CHECK = 20
+
+
+def _cache():
+    return caches[getattr(settings, 'SUBMISSION_CURSOR_CACHE_ALIAS', 'default')]
+
+
+def _key(contest, username):
+    return f'contest:{contest.pk}:cursor:{username}'
+
+
+class Cursor:
+    """How far one user's submissions have been processed for a contest."""
+
+    __slots__ = ('timestamp', 'solved')
+
+    def __init__(self, timestamp=0, solved=None):
+        self.timestamp = timestamp
+        # {slug: first accept timestamp, or None if unknown}
+        self.solved = dict(solved or {})
+
+    def unseen(self, submissions):
+        """
+        The submissions newer than the cursor.
+
+        Submissions without a timestamp always count as unseen, which is safe:
+        matching the same accepted slug twice adds nothing.
+        """
+        return [
+            sub for sub in submissions or ()
+            if events.timestamp_of(sub) > self.timestamp or not sub.get('timestamp')
+        ]
+
+    def advance(self, submissions, solved, solve_times):
+        """Moves the cursor past `submissions`, keeping the questions in `solved`."""
+        newest = max((events.timestamp_of(sub) for sub in submissions or ()), default=0)
+        self.timestamp = max(self.timestamp, newest)
+        self.solved = {question['slug']: solve_times.get(question['slug']) for question in solved}
+
+
+def wider_limit(contest, cursor, submissions, limit):
+    """
+    Returns a bigger limit to fetch again with, or None if `submissions` is enough.
+
+    The window is widened only when it came back full and even its oldest
+    entry is unseen and from the contest, so older unseen solves might have
+    been cut off.
+    """
+    if submissions is None or len(submissions) < limit or limit >= MAX_SUBMISSIONS_TO_CHECK:
+        return None
+    oldest = min(events.timestamp_of(sub) for sub in submissions)
+    start, _ = contests.contest_window(contest)
+    if oldest <= max(cursor.timestamp, int(start.timestamp())):
+        return None
+    return min(limit * 2, MAX_SUBMISSIONS_TO_CHECK)
+
+
+def _from_records(contest, usernames):
+    """Cursors at timestamp 0 holding the solves already stored for each user."""
+    entries = {
+        row['id']: row for row in ContestLeaderboard.objects.filter(
+            contest_name=contest.name, contest_date=contest.date, user_name__in=usernames,
+        ).values('id', 'user_name', 'question1', 'question2', 'question3')
+    }
+    by_number = {question['number']: slug for slug, question in questions.contest_questions(contest).items()}
+    # Solves on the leaderboard without an event have no known time
+    solved = {username: {} for username in usernames}
+    for entry in entries.values():
+        for number in range(1, 4):
+            if entry[f'question{number}'] and number in by_number:
+                solved[entry['user_name']][by_number[number]] = None
+    if entries:
+        for entry_id, slug in QuestionSolve.objects.filter(entry_id__in=entries).values_list(
+            'entry_id', 'question__slug',
+        ):
+            solved[entries[entry_id]['user_name']][slug] = None
+    for username, first in events.stored_first_accepts(contest, usernames).items():
+        solved[username].update(first)
+    return {username: Cursor(0, solve_times) for username, solve_times in solved.items()}
+
+
+def load_many(contest, usernames):
+    """Returns {username: Cursor} for a contest, reading the database once for any not cached."""
+    usernames = list(usernames)
+    keys = {_key(contest, username): username for username in usernames}
+    found = {
+        keys[key]: Cursor(timestamp, dict(solved))
+        for key, (timestamp, solved) in _cache().get_many(list(keys)).items()
+    }
+    missing = [username for username in usernames if username not in found]
+    if missing:
+        found.update(_from_records(contest, missing))
+    return found
+
+
+def load(contest, username):
+    return load_many(contest, [username])[username]
+
+
+def store(entries):
+    """Writes {key: (timestamp, solved items)} cache entries, as save_many() builds them."""
+    if entries:
+        _cache().set_many(entries, getattr(settings, 'SUBMISSION_CURSOR_TIMEOUT', 2 * 24 * 3600))
+
+
+def save_many(contest, cursors):
+    entries = {
+        _key(contest, username): (cursor.timestamp, sorted(cursor.solved.items()))
+        for username, cursor in cursors.items()
+    }
+    if writebehind.enabled():
+        # Saved once the events of the submissions they're past are written
+        writebehind.submit_cursors(entries)
+        return
+    store(entries)
+
+
+def save(contest, username, cursor):
+    save_many(contest, {username: cursor})
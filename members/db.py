@@ -0,0 +1,55 @@
+"""
+Serialized writes for SQLite.
+
+The connection settings (WAL, busy_timeout, BEGIN IMMEDIATE) live in the
+members.backends.sqlite3 engine and let writers wait for each other inside
+SQLite. With SQLITE_SINGLE_WRITER on, writer() also queues leaderboard write
+transactions behind an OS file lock, so they take turns without polling the
+database lock at all.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within the process
+    fcntl = None
+
+_thread_lock = threading.Lock()
+_local = threading.local()
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def writer(using=None):
+    """
+    A write transaction, run alone when SQLITE_SINGLE_WRITER is on.
+
+    Nested writer() blocks join the outer one's lock and transaction.
+    """
+    if not getattr(settings, 'SQLITE_SINGLE_WRITER', False) or getattr(_local, 'held', False):
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    with _thread_lock, _file_lock(settings.SQLITE_WRITER_LOCK):
+        _local.held = True
+        try:
+            with transaction.atomic(using=using):
+                yield
+        finally:
+            _local.held = False
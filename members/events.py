@@ -0,0 +1,177 @@
+"""
+The accepted-submission event store, and the standings derived from it.
+
+Every verify adds the accepted submissions of contest questions it had not
+seen yet to AcceptedSubmission; duplicates are ignored on insert. The first
+accept of each question is its solve time, and solve times break ties
+between equal marks by LEADERBOARD_TIEBREAK:
+
+    penalty      ICPC style: seconds from the contest start to each first
+                 accept, summed
+    first_solve  seconds to the last first accept, i.e. who reached their
+                 score first
+
+The events hold everything scoring needs, so a contest can be scored again
+under new points, questions or tie-break rules without asking LeetCode
+(manage.py rescore_contest).
+"""
+import threading
+
+from django.conf import settings
+from django.db.models import Min
+
+from .models import AcceptedSubmission
+from . import contests
+from . import db
+from . import questions
+from . import writebehind
+
+RULES = ('penalty', 'first_solve')
+
+
+def timestamp_of(submission):
+    """A submission's Unix timestamp, or 0 if it has none."""
+    try:
+        return int(submission.get('timestamp') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def accepted(contest, submissions):
+    """
+    The accepted submissions of `contest`'s questions as (slug, timestamp) pairs.
+
+    The timestamp is None for a submission without one; it still counts as a
+    solve but isn't stored.
+    """
+    slugs = questions.contest_questions(contest).keys()
+    return sorted({
+        (questions.submission_slug(sub), timestamp_of(sub) or None)
+        for sub in submissions or ()
+        if sub.get('statusDisplay') == 'Accepted' and questions.submission_slug(sub) in slugs
+    }, key=lambda event: (event[0], event[1] or 0))
+
+
+def first_accepts(events, solve_times=None):
+    """Folds (slug, timestamp) events into {slug: earliest timestamp}; unknown times lose to known ones."""
+    solve_times = dict(solve_times or {})
+    for slug, timestamp in events:
+        current = solve_times.get(slug)
+        if slug not in solve_times or (timestamp is not None and (current is None or timestamp < current)):
+            solve_times[slug] = timestamp
+    return solve_times
+
+
+def record(contest, username, events):
+    """Stores one user's (slug, timestamp) events; ones already stored are skipped."""
+    rows = [
+        AcceptedSubmission(contest=contest, user_name=username, slug=slug, timestamp=timestamp)
+        for slug, timestamp in events if timestamp is not None
+    ]
+    if not rows:
+        return
+    if writebehind.enabled():
+        writebehind.submit_events(rows)
+        return
+    with db.writer():
+        AcceptedSubmission.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def tiebreak(contest, solve_times, rule=None):
+    """
+    The penalty of a list of solve times under `rule` (LEADERBOARD_TIEBREAK by default).
+
+    A solve time of None (a solve recorded before the event store) counts as
+    the contest's end; solves before the start count as at the start.
+    """
+    start, end = contests.contest_window(contest)
+    start, end = int(start.timestamp()), int(end.timestamp())
+    offsets = [max(0, (end if timestamp is None else timestamp) - start) for timestamp in solve_times]
+    if not offsets:
+        return 0
+    if (rule or getattr(settings, 'LEADERBOARD_TIEBREAK', 'penalty')) == 'first_solve':
+        return max(offsets)
+    return sum(offsets)
+
+
+def score(contest, solve_times, rule=None):
+    """
+    Scores first accepts against the questions of a contest.
+
+    Args:
+        contest: The Contest being scored.
+        solve_times: {slug: timestamp of its first accept, or None if unknown}.
+        rule: The tie-break rule, one of RULES (LEADERBOARD_TIEBREAK by default).
+
+    Returns:
+        A (result, solved) tuple, as verify.score_submissions.
+    """
+    contest_questions = questions.contest_questions(contest)
+    solved = sorted(
+        (contest_questions[slug] for slug in solve_times.keys() & contest_questions.keys()),
+        key=lambda question: question['number'],
+    )
+    numbers = {question['number'] for question in solved}
+    result = {'marks': sum(question['points'] for question in solved)}
+    for number in range(1, 4):
+        result[f'question{number}'] = number in numbers
+    result['penalty'] = tiebreak(contest, [solve_times[question['slug']] for question in solved], rule)
+    return result, solved
+
+
+def stored_first_accepts(contest, usernames):
+    """{username: {slug: first accept}} from the event store, in one query."""
+    found = {}
+    rows = (
+        AcceptedSubmission.objects.filter(contest=contest, user_name__in=usernames)
+        .values('user_name', 'slug').annotate(first=Min('timestamp'))
+    )
+    for row in rows:
+        found.setdefault(row['user_name'], {})[row['slug']] = row['first']
+    return found
+
+
+class Standings:
+    """
+    The first accepts of every user of one contest, kept up to date from the
+    event store: each refresh() reads only the events added since the last.
+    """
+
+    def __init__(self, contest):
+        self.contest = contest
+        self.first = {}
+        self.last_id = 0
+
+    def refresh(self):
+        events = (
+            AcceptedSubmission.objects.filter(contest=self.contest, id__gt=self.last_id)
+            .order_by('id').values_list('id', 'user_name', 'slug', 'timestamp')
+        )
+        for event_id, user_name, slug, timestamp in events.iterator():
+            solves = self.first.setdefault(user_name, {})
+            if slug not in solves or timestamp < solves[slug]:
+                solves[slug] = timestamp
+            self.last_id = event_id
+        return self
+
+    def ranked(self, rule=None):
+        """[(user_name, result, solved)] for every user with an event, best first."""
+        scored = [
+            (user_name, *score(self.contest, solve_times, rule)) for user_name, solve_times in self.first.items()
+        ]
+        scored.sort(key=lambda item: (-item[1]['marks'], item[1]['penalty'], item[0]))
+        return scored
+
+
+_standings = {}
+_standings_lock = threading.Lock()
+
+
+def standings(contest):
+    """The refreshed Standings of a contest, kept in memory between calls."""
+    with _standings_lock:
+        current = _standings.get(contest.pk)
+        if current is None or current.contest.date != contest.date:
+            current = _standings[contest.pk] = Standings(contest)
+        current.contest = contest
+        return current.refresh()
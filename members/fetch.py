@@ -1,21 +1,332 @@
-import requests
+import asyncio
+import codecs
 import json
+import logging
+import random
+import re
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
 
 # The URL for LeetCode's GraphQL API endpoint
 LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
 
+# A user's public profile page, read when the API can't be (see get_submissions_from_profile)
+LEETCODE_PROFILE_URL = "https://leetcode.com/{username}/"
+
+# Headers sent with every request, to mimic a browser
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36',
+}
+
 # The GraphQL query to fetch recent submissions.
-# We only need the question title and the submission status.
+# We need the question title, its slug, the submission status and its
+# timestamp (verifies skip submissions they have already seen, see cursors.py).
 # NOTE: Changed "question { title }" to just "title" based on recent API changes.
 SUBMISSIONS_QUERY = """
 query recentSubmissionList($username: String!, $limit: Int!) {
   recentSubmissionList(username: $username, limit: $limit) {
     statusDisplay
     title
+    titleSlug
+    timestamp
   }
 }
 """
 
+
+def _setting(name, default):
+    """Reads a LEETCODE_* setting, falling back when Django isn't configured (scripts)."""
+    if settings.configured:
+        return getattr(settings, name, default)
+    return default
+
+
+class LeetCodeClient:
+    """
+    A reusable HTTP client for LeetCode.
+
+    Holds one requests.Session whose connection pool keeps TCP+TLS connections
+    to leetcode.com alive between verifications, and applies connect/read
+    timeouts to every call so a slow upstream can't hold a worker forever.
+    """
+
+    def __init__(self, url=None, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.url = url or _setting('LEETCODE_GRAPHQL_URL', LEETCODE_GRAPHQL_URL)
+        self.pool_size = pool_size or _setting('LEETCODE_POOL_SIZE', 10)
+        self.connect_timeout = connect_timeout or _setting('LEETCODE_CONNECT_TIMEOUT', 3.05)
+        self.read_timeout = read_timeout or _setting('LEETCODE_READ_TIMEOUT', 10)
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def timeout(self, read_timeout=None):
+        return (self.connect_timeout, read_timeout or self.read_timeout)
+
+    def post_graphql(self, payload, headers=None, timeout=None):
+        """POSTs a GraphQL payload over the pooled session."""
+        return self.session.post(
+            self.url, json=payload, headers=headers, timeout=self.timeout(timeout)
+        )
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        """GETs any LeetCode page over the pooled session."""
+        return self.session.get(url, headers=headers, timeout=self.timeout(timeout), **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide LeetCodeClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LeetCodeClient()
+    return _client
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling LeetCode while it is rate limiting us or failing."""
+
+
+class TokenBucket:
+    """
+    A token bucket whose state lives in a Django cache, shared by every worker.
+
+    reserve() always takes a token, letting the bucket go negative, and says how
+    long the caller must wait for it. The read-modify-write isn't atomic across
+    processes, so concurrent workers may occasionally overdraw a token.
+    """
+
+    def __init__(self, rate, capacity, cache, key='leetcode:ratelimit'):
+        self.rate = rate
+        self.capacity = capacity
+        self.cache = cache
+        self.key = key
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token and returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self.cache.get(self.key) or (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate) - 1
+            self.cache.set(self.key, (tokens, now), 60)
+        return max(0.0, -tokens / self.rate)
+
+    def refund(self):
+        """Gives back a reserved token the caller decided not to use."""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self.cache.get(self.key) or (self.capacity, now)
+            self.cache.set(self.key, (min(self.capacity, tokens + 1), updated), 60)
+
+
+class CircuitBreaker:
+    """
+    Stops calling LeetCode for `cooldown` seconds after `threshold` failures in a row.
+
+    The state lives in a Django cache so all workers trip together. Once the
+    cooldown is over calls go through again; the first failure re-opens it.
+    """
+
+    def __init__(self, threshold, cooldown, cache, key='leetcode:circuit'):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.cache = cache
+        self.key = key
+
+    def allow(self):
+        state = self.cache.get(self.key)
+        return not state or time.time() >= state['open_until']
+
+    def record_success(self):
+        self.cache.delete(self.key)
+
+    def record_failure(self):
+        state = self.cache.get(self.key) or {'failures': 0, 'open_until': 0}
+        state['failures'] += 1
+        if state['failures'] >= self.threshold:
+            state['open_until'] = time.time() + self.cooldown
+        self.cache.set(self.key, state, self.cooldown * 10)
+
+
+def _retry_after_seconds(value):
+    """Parses a Retry-After header (seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _limiter_cache():
+    """LEETCODE_LIMITER_CACHE_ALIAS, or state local to the process when Django isn't configured (scripts)."""
+    if settings.configured:
+        return caches[_setting('LEETCODE_LIMITER_CACHE_ALIAS', 'default')]
+    return LocMemCache('leetcode-limiter', {})
+
+
+class UpstreamPolicy:
+    """
+    Rate limiting, retries and circuit breaking around every LeetCode call.
+
+    admit() is called before each attempt and retry_delay() after each failed
+    one; callers only do the actual sending and sleeping, so the sync and the
+    async clients share one policy.
+    """
+
+    def __init__(self):
+        cache = _limiter_cache()
+        self.limiter = TokenBucket(
+            _setting('LEETCODE_RATE_LIMIT', 10), _setting('LEETCODE_RATE_BURST', 20), cache
+        )
+        self.breaker = CircuitBreaker(
+            _setting('LEETCODE_BREAKER_THRESHOLD', 5), _setting('LEETCODE_BREAKER_COOLDOWN', 30), cache
+        )
+        self.max_retries = _setting('LEETCODE_MAX_RETRIES', 2)
+        self.backoff_base = _setting('LEETCODE_BACKOFF_BASE', 0.5)
+        self.backoff_max = _setting('LEETCODE_BACKOFF_MAX', 8)
+        self.max_wait = _setting('LEETCODE_MAX_WAIT', 10)
+
+    def admit(self):
+        """
+        Returns how long to wait before the next attempt may be sent.
+
+        Raises:
+            UpstreamUnavailable: If the circuit is open or the wait for a
+                rate limit token would be longer than LEETCODE_MAX_WAIT.
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable("LeetCode is failing, not calling it for now")
+        wait = self.limiter.reserve()
+        if wait > self.max_wait:
+            self.limiter.refund()
+            raise UpstreamUnavailable("Too many LeetCode requests, try again shortly")
+        return wait
+
+    def budget(self, attempt_seconds):
+        """
+        The longest a guarded call can take when each attempt takes up to
+        `attempt_seconds`: every attempt may wait up to LEETCODE_MAX_WAIT for
+        a token, and every retry as long again before it is sent.
+        """
+        attempts = self.max_retries + 1
+        return attempts * (self.max_wait + attempt_seconds) + self.max_retries * self.max_wait
+
+    def succeeded(self):
+        self.breaker.record_success()
+
+    def failed(self):
+        self.breaker.record_failure()
+
+    def retry_delay(self, attempt, retry_after=None):
+        """
+        Records a failed attempt (error, 429 or 5xx).
+
+        Returns:
+            The seconds to wait before retrying, honoring Retry-After, or None
+            when the caller should give up.
+        """
+        self.failed()
+        if attempt >= self.max_retries:
+            return None
+        delay = _retry_after_seconds(retry_after)
+        if delay is None:
+            # Full jitter keeps the workers that failed together from retrying together
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if delay > self.max_wait:
+            return None
+        return delay
+
+
+_policy = None
+
+
+def get_policy():
+    """Returns the process-wide UpstreamPolicy."""
+    global _policy
+    if _policy is None:
+        with _client_lock:
+            if _policy is None:
+                _policy = UpstreamPolicy()
+    return _policy
+
+
+def _is_retryable(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+def _is_answer(status_code, content_type):
+    # A 200 that isn't JSON is a challenge or proxy page; the caller records it as a failure
+    return status_code != 200 or 'json' in (content_type or '').lower()
+
+
+def guarded_post(payload, headers=None, timeout=None):
+    """
+    POSTs to the GraphQL API through the rate limiter, retries and circuit breaker.
+
+    Returns:
+        The final response; it may still be a 429/5xx once retries run out.
+
+    Raises:
+        UpstreamUnavailable: If the call was not attempted (circuit open or
+            rate limited for too long).
+        requests.exceptions.RequestException: If the last attempt failed.
+    """
+    policy = get_policy()
+    attempt = 0
+    while True:
+        time.sleep(policy.admit())
+        started = time.perf_counter()
+        try:
+            response = get_client().post_graphql(payload, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            metrics.observe_upstream(time.perf_counter() - started, 'error')
+            delay = policy.retry_delay(attempt)
+            if delay is None:
+                raise
+        else:
+            metrics.observe_upstream(time.perf_counter() - started, response.status_code)
+            if not _is_retryable(response.status_code):
+                if _is_answer(response.status_code, response.headers.get('Content-Type')):
+                    policy.succeeded()
+                return response
+            delay = policy.retry_delay(attempt, response.headers.get('Retry-After'))
+            if delay is None:
+                return response
+        time.sleep(delay)
+        attempt += 1
+
+
 def get_latest_submissions(username: str, limit: int = 15):
     """
     Fetches the latest code submissions for a given LeetCode user.
@@ -28,49 +339,502 @@ def get_latest_submissions(username: str, limit: int = 15):
         A list of submission dictionaries, or None if the request fails
         or the user is not found.
     """
-    print(f"Checking the last {limit} submissions for user '{username}'...")
-    
-    # Define the payload for the POST request
-    payload = {
+    logger.debug("Checking the last %s submissions for user '%s'", limit, username)
+
+    try:
+        # Make the POST request to the GraphQL API over the shared connection pool
+        response = guarded_post(
+            _submissions_payload(username, limit), headers=_submissions_headers(username)
+        )
+        return _read_submissions(response.status_code, response.text)
+    except (requests.exceptions.RequestException, UpstreamUnavailable) as e:
+        logger.warning("LeetCode request for '%s' failed: %s", username, e)
+        return None
+
+
+def _submissions_payload(username, limit):
+    return {
         "query": SUBMISSIONS_QUERY,
         "variables": {
             "username": username,
             "limit": limit
         }
     }
-    
-    # Set headers to mimic a browser request
-    headers = {
-        'Content-Type': 'application/json',
+
+
+def _submissions_headers(username):
+    # The clients already send the browser headers; only the referer is per user
+    return {
         'Referer': f'https://leetcode.com/{username}/',
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36',
     }
-    
-    try:
-        # Make the POST request to the GraphQL API
-        response = requests.post(LEETCODE_GRAPHQL_URL, json=payload, headers=headers)
+
+
+def _read_submissions(status_code, text):
+    """Extracts recentSubmissionList from a GraphQL response body, or returns None."""
+    # Check if the request was successful
+    if status_code == 200:
+        try:
+            data = json.loads(text)
+            if not isinstance(data, dict):
+                raise ValueError("not a JSON object")
+        except ValueError:
+            # A challenge page or proxy error served with a 200: as good as a failed call
+            get_policy().failed()
+            logger.warning("LeetCode returned a body that isn't a GraphQL answer: %.200s", text)
+            return None
         
-        # Check if the request was successful
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Check for errors in the GraphQL response (e.g., user not found)
-            if 'errors' in data:
-                print(f"Error: {data['errors'][0]['message']}")
+        # Check for errors in the GraphQL response (e.g., user not found)
+        if 'errors' in data:
+            logger.info("LeetCode returned an error: %s", data['errors'][0]['message'])
+            return None
+        
+        # Extract the submission data using the updated field name
+        submissions = data.get('data', {}).get('recentSubmissionList')
+        return submissions
+    else:
+        # Provide more details on failure, including the response body if available
+        logger.warning("LeetCode returned status %s: %.200s", status_code, text)
+        return None
+
+
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'[][{}"\\]')
+
+# JSON string escapes that stand for a single character
+_UNESCAPE = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class SubmissionListScanner:
+    """
+    Finds `"recentSubmissionList": [...]` in a page that arrives in pieces.
+
+    The text is searched for the key with str.find, keeping only a key's length
+    of it between pieces. Only the array after the key is read: the JSON
+    decoder takes it whole once it has arrived, and until then it is walked
+    from bracket to quote, tracking strings and nesting, to know when it
+    closes. Nothing else on the page is parsed or kept. The key is also found inside JSON that a page
+    embeds as a string literal (\\"recentSubmissionList\\"); that array is
+    unescaped before it is parsed.
+
+    feed() returns the list as soon as it is complete, and None until then.
+    """
+
+    KEY = 'recentSubmissionList'
+    _MARKERS = ('"%s"' % KEY, '\\"%s\\"' % KEY)
+
+    def __init__(self):
+        self._text = ''
+        self._state = 'key'
+        self._escaped = False
+        # Where the array scan got to in _text, and its state there
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._in_escape = False
+
+    def feed(self, text):
+        self._text += text
+        while True:
+            if self._state == 'key' and not self._find_key():
                 return None
-            
-            # Extract the submission data using the updated field name
-            submissions = data.get('data', {}).get('recentSubmissionList')
-            return submissions
+            if self._state == 'value' and not self._find_array():
+                return None
+            if self._state == 'array':
+                if not self._escaped:
+                    # Usually the whole array is here already, and the C decoder reads it fastest
+                    try:
+                        return _DECODER.raw_decode(self._text)[0]
+                    except ValueError:
+                        pass
+                end = self._scan()
+                if end is None:
+                    return None
+                submissions = self._parse(self._text[:end])
+                if submissions is not None:
+                    return submissions
+                # Not valid JSON after all: look for the key again past this array
+                self._text = self._text[1:]
+                self._state = 'key'
+
+    def _find_key(self):
+        found = [(self._text.find(marker), marker) for marker in self._MARKERS]
+        found = [(index, marker) for index, marker in found if index >= 0]
+        if not found:
+            # Keep just enough to match a key split across two pieces
+            self._text = self._text[-len(self._MARKERS[1]) + 1:]
+            return False
+        index, marker = min(found)
+        self._text = self._text[index + len(marker):]
+        self._escaped = marker is self._MARKERS[1]
+        self._state = 'value'
+        return True
+
+    def _find_array(self):
+        rest = self._text.lstrip()
+        if not rest or (rest[0] == ':' and not rest[1:].lstrip()):
+            return False
+        if rest[0] == ':' and rest[1:].lstrip()[0] == '[':
+            self._text = rest[1:].lstrip()
+            self._state = 'array'
+            self._pos = self._depth = 0
+            self._in_string = self._in_escape = False
         else:
-            # Provide more details on failure, including the response body if available
-            print(f"Error: Failed to fetch data. Status code: {response.status_code}")
-            print(f"Response: {response.text}")
+            # The key's text was a value, or its value isn't a list (null)
+            self._text = rest
+            self._state = 'key'
+        return True
+
+    def _scan(self):
+        """Returns the end of the array in _text, or None if it hasn't closed yet."""
+        text, i, end = self._text, self._pos, len(self._text)
+        depth, in_string, in_escape = self._depth, self._in_string, self._in_escape
+        while True:
+            # Only brackets, quotes and backslashes change the state; skip to the next one
+            match = _STRUCTURAL.search(text, i)
+            if match is None:
+                i = end
+                break
+            i = match.start()
+            char, width = text[i], 1
+            if self._escaped and char == '\\':
+                # One character of the embedded JSON, escaped in the outer string
+                if i + 1 >= end or (text[i + 1] == 'u' and i + 6 > end):
+                    break
+                if text[i + 1] == 'u':
+                    try:
+                        char, width = chr(int(text[i + 2:i + 6], 16)), 6
+                    except ValueError:
+                        return i
+                else:
+                    char, width = _UNESCAPE.get(text[i + 1], text[i + 1]), 2
+            elif self._escaped and char == '"':
+                # The outer string ended before the array did
+                return i
+            i += width
+            if in_string:
+                if in_escape:
+                    in_escape = False
+                elif char == '\\':
+                    in_escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '[{':
+                depth += 1
+            elif char in ']}':
+                depth -= 1
+                if depth == 0:
+                    return i
+        self._pos, self._depth, self._in_string, self._in_escape = i, depth, in_string, in_escape
+        return None
+
+    def _parse(self, text):
+        try:
+            if self._escaped:
+                text = json.loads('"%s"' % text)
+            submissions = json.loads(text)
+        except ValueError:
             return None
+        return submissions if isinstance(submissions, list) else None
+
+
+def get_submissions_from_profile(username: str, limit: int = 15, max_bytes=None, max_seconds=None):
+    """
+    Reads the latest submissions off a user's LeetCode profile page.
+
+    The fallback for when the GraphQL API can't be used. The page is streamed
+    through a SubmissionListScanner and the download stops as soon as the list
+    is parsed, or once LEETCODE_PROFILE_MAX_BYTES bytes were read or
+    LEETCODE_PROFILE_MAX_SECONDS seconds passed without finding it.
+
+    Args:
+        username: The LeetCode username to look up.
+        limit: The most submissions to return.
+        max_bytes: Overrides LEETCODE_PROFILE_MAX_BYTES.
+        max_seconds: Overrides LEETCODE_PROFILE_MAX_SECONDS.
+
+    Returns:
+        A list of submission dictionaries, or None if the page couldn't be
+        read or has no submission list within the caps.
+    """
+    max_bytes = max_bytes or _setting('LEETCODE_PROFILE_MAX_BYTES', 2 * 1024 * 1024)
+    max_seconds = max_seconds or _setting('LEETCODE_PROFILE_MAX_SECONDS', 5)
+    url = _setting('LEETCODE_PROFILE_URL', LEETCODE_PROFILE_URL).format(username=username)
+    policy = get_policy()
+    try:
+        time.sleep(policy.admit())
+    except UpstreamUnavailable as e:
+        logger.warning("LeetCode profile request for '%s' not sent: %s", username, e)
+        return None
+
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        # The read timeout also bounds each wait for the next piece
+        with get_client().get(url, headers={'Accept': 'text/html'}, timeout=max_seconds, stream=True) as response:
+            status = response.status_code
+            if response.status_code != 200:
+                logger.warning("LeetCode profile of '%s' returned status %s", username, response.status_code)
+                if _is_retryable(response.status_code):
+                    policy.failed()
+                return None
+            policy.succeeded()
+            submissions = _scan_profile(response, max_bytes, started + max_seconds)
     except requests.exceptions.RequestException as e:
-        print(f"An error occurred during the request: {e}")
+        policy.failed()
+        logger.warning("LeetCode profile request for '%s' failed: %s", username, e)
+        return None
+    finally:
+        metrics.observe_upstream(time.perf_counter() - started, status)
+
+    if submissions is None:
+        logger.info("No submission list within the limits on the profile of '%s'", username)
+        return None
+    return submissions[:limit]
+
+
+def _scan_profile(response, max_bytes, deadline):
+    """Feeds a streamed page to a SubmissionListScanner until it finds the list or a cap is hit."""
+    # LeetCode serves UTF-8; requests would guess ISO-8859-1 for text/html without a charset
+    scanner = SubmissionListScanner()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    read = 0
+    for chunk in response.iter_content(chunk_size=16 * 1024):
+        read += len(chunk)
+        submissions = scanner.feed(decoder.decode(chunk))
+        if submissions is not None:
+            return submissions
+        if read >= max_bytes or time.perf_counter() >= deadline:
+            return None
+    return None
+
+
+# One aiohttp session and concurrency limit per event loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _async_client():
+    loop = asyncio.get_running_loop()
+    pair = _async_clients.get(loop)
+    if pair is None:
+        concurrency = _setting('LEETCODE_ASYNC_CONCURRENCY', 100)
+        session = aiohttp.ClientSession(
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=_setting('LEETCODE_CONNECT_TIMEOUT', 3.05),
+                sock_read=_setting('LEETCODE_READ_TIMEOUT', 10),
+            ),
+            connector=aiohttp.TCPConnector(limit=concurrency),
+        )
+        pair = _async_clients[loop] = (session, asyncio.Semaphore(concurrency))
+    return pair
+
+
+async def aclose_client():
+    """Closes the current event loop's aiohttp session, if one was opened."""
+    pair = _async_clients.pop(asyncio.get_running_loop(), None)
+    if pair is not None:
+        await pair[0].close()
+
+
+async def aget_latest_submissions(username: str, limit: int = 15):
+    """
+    Async version of get_latest_submissions for ASGI views.
+
+    At most LEETCODE_ASYNC_CONCURRENCY calls per event loop are in flight
+    upstream at once; the rest wait for a slot.
+    """
+    logger.debug("Checking the last %s submissions for user '%s'", limit, username)
+    session, slots = _async_client()
+    policy = get_policy()
+    # The limiter and breaker read and write the shared cache, which may be on
+    # disk; keep that off the event loop (and out of the single thread that
+    # sync_to_async uses for database work by default)
+    admit = sync_to_async(policy.admit, thread_sensitive=False)
+    succeeded = sync_to_async(policy.succeeded, thread_sensitive=False)
+    retry_delay = sync_to_async(policy.retry_delay, thread_sensitive=False)
+    attempt = 0
+    try:
+        while True:
+            await asyncio.sleep(await admit())
+            started = time.perf_counter()
+            try:
+                async with slots:
+                    async with session.post(
+                        _setting('LEETCODE_GRAPHQL_URL', LEETCODE_GRAPHQL_URL),
+                        json=_submissions_payload(username, limit),
+                        headers=_submissions_headers(username),
+                    ) as response:
+                        text = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                metrics.observe_upstream(time.perf_counter() - started, 'error')
+                delay = await retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                metrics.observe_upstream(time.perf_counter() - started, response.status)
+                if not _is_retryable(response.status):
+                    if _is_answer(response.status, response.headers.get('Content-Type')):
+                        await succeeded()
+                    break
+                delay = await retry_delay(attempt, response.headers.get('Retry-After'))
+                if delay is None:
+                    break
+            await asyncio.sleep(delay)
+            attempt += 1
+        return _read_submissions(response.status, text)
+    except (aiohttp.ClientError, asyncio.TimeoutError, UpstreamUnavailable) as e:
+        logger.warning("LeetCode request for '%s' failed: %s", username, e)
         return None
 
+
+class _Flight:
+    """An upstream call that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+_cache_stats_lock = threading.Lock()
+
+
+def _count(stat):
+    with _cache_stats_lock:
+        _cache_stats[stat] += 1
+
+
+def _submissions_cache():
+    return caches[_setting('LEETCODE_CACHE_ALIAS', 'default')]
+
+
+def _submissions_key(username, limit):
+    return f"leetcode:submissions:{username}:{limit}"
+
+
+def get_cached_submissions(username: str, limit: int = 15):
+    """
+    Like get_latest_submissions, but served from a short-lived cache.
+
+    Results are kept for LEETCODE_CACHE_TTL seconds in the configured Django
+    cache (LocMem evicts least recently used entries once MAX_ENTRIES is hit).
+    On a miss, concurrent callers in this process for the same user share a
+    single upstream request instead of each sending their own.
+    """
+    key = _submissions_key(username, limit)
+    cache = _submissions_cache()
+    submissions = cache.get(key)
+    if submissions is not None:
+        _count('hits')
+        return submissions
+
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        _count('coalesced')
+        client = get_client()
+        # As long as the leader may take, retries and rate limit waits included
+        flight.done.wait(get_policy().budget(client.connect_timeout + client.read_timeout))
+        return flight.result
+
+    _count('misses')
+    try:
+        flight.result = get_latest_submissions(username, limit)
+        if flight.result is not None:
+            cache.set(key, flight.result, _setting('LEETCODE_CACHE_TTL', 30))
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+    return flight.result
+
+
+def submission_cache_stats():
+    """Returns this process's hit/miss/coalesced counters for get_cached_submissions."""
+    with _cache_stats_lock:
+        return dict(_cache_stats)
+
+
+def build_batch_query(count):
+    """
+    Builds one query that asks for the recent submissions of `count` users.
+
+    Each user gets an aliased recentSubmissionList field (u0, u1, ...) bound to
+    its own $uN variable, so a single round-trip answers for all of them.
+    """
+    variables = ", ".join(f"$u{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"  u{i}: recentSubmissionList(username: $u{i}, limit: $limit) {{\n"
+        f"    statusDisplay\n"
+        f"    title\n"
+        f"    titleSlug\n"
+        f"    timestamp\n"
+        f"  }}"
+        for i in range(count)
+    )
+    return f"query batchRecentSubmissions($limit: Int!, {variables}) {{\n{fields}\n}}\n"
+
+
+def get_latest_submissions_batch(usernames, limit: int = 15, batch_size: int = None):
+    """
+    Fetches the latest submissions of many LeetCode users in a few requests.
+
+    Args:
+        usernames: The LeetCode usernames to look up.
+        limit: The number of recent submissions to fetch per user.
+        batch_size: How many users to ask for per request
+            (defaults to the LEETCODE_BATCH_SIZE setting).
+
+    Returns:
+        A dict mapping every username to its list of submission dictionaries,
+        or to None if that user (or the whole batch request) failed.
+    """
+    batch_size = batch_size or _setting('LEETCODE_BATCH_SIZE', 20)
+    usernames = list(dict.fromkeys(usernames))
+    results = {}
+    cache = _submissions_cache()
+
+    for start in range(0, len(usernames), batch_size):
+        batch = usernames[start:start + batch_size]
+        variables = {"limit": limit}
+        variables.update({f"u{i}": name for i, name in enumerate(batch)})
+        payload = {"query": build_batch_query(len(batch)), "variables": variables}
+
+        data = None
+        try:
+            response = guarded_post(payload)
+            if response.status_code == 200:
+                answer = response.json()
+                if not isinstance(answer, dict) or not isinstance(answer.get('data') or {}, dict):
+                    raise ValueError(f"not a GraphQL answer: {response.text:.200}")
+                # Unknown users only null out their own alias and add an entry to 'errors'
+                data = answer.get('data') or {}
+            else:
+                logger.warning("LeetCode batch request returned status %s", response.status_code)
+        except ValueError as e:
+            get_policy().failed()
+            logger.warning("LeetCode batch request returned a body that isn't a GraphQL answer: %s", e)
+        except (requests.exceptions.RequestException, UpstreamUnavailable) as e:
+            logger.warning("LeetCode batch request failed: %s", e)
+
+        for i, name in enumerate(batch):
+            results[name] = data.get(f"u{i}") if data is not None else None
+
+        # Fresh results also serve the next verify clicks of these users
+        cache.set_many(
+            {_submissions_key(name, limit): results[name] for name in batch if results[name] is not None},
+            _setting('LEETCODE_CACHE_TTL', 30),
+        )
+    return results
+
 def display_solved_questions(submissions, username, limit):
     """
     Filters for 'Accepted' submissions and displays the unique question titles.
@@ -81,7 +845,7 @@ def display_solved_questions(submissions, username, limit):
         limit: The number of submissions that were checked.
     """
     if not submissions:
-        print(f"Could not find any recent submissions for user '{username}'.")
+        logger.debug("Could not find any recent submissions for user '%s'", username)
         return
 
     # Use a set to store unique question titles to avoid duplicates
@@ -96,13 +860,16 @@ def display_solved_questions(submissions, username, limit):
                 solved_questions.add(title)
     
     if not solved_questions:
-        print(f"No successfully solved questions found in the last {limit} submission(s) for '{username}'.")
+        logger.debug("No solved questions in the last %s submission(s) of '%s'", limit, username)
     else:
-        print(f"\n--- Recently Solved Questions by {username} ---")
         # Convert set to list to print with numbers
         solved_list = list(solved_questions)
         return solved_list
 
+async def adisplay_solved_questions(submissions, username, limit):
+    """Async counterpart of display_solved_questions; filtering needs no I/O."""
+    return display_solved_questions(submissions, username, limit)
+
 # if __name__ == "__main__":
 #     try:
 #         leetcode_username = input("Enter LeetCode username: ")
@@ -123,4 +890,3 @@ def display_solved_questions(submissions, username, limit):
 #         print("Invalid number. Please enter an integer.")
 #     except KeyboardInterrupt:
 #         print("\nOperation cancelled by user.")
-
@@ -0,0 +1,47 @@
+"""
+Who a request belongs to, kept in the session.
+
+login stores the student's id, email and LeetCode username in the session, so
+views read it from there instead of a ?leetcode_id= parameter. With the
+cached_db session engine the session is read from SESSION_CACHE_ALIAS and
+django_session is only queried when the cache lost it, so identifying a
+logged-in request costs no query.
+
+IsLogin mirrors logins for the admin: log_in() upserts the student's row as
+logged in, with the LeetCode username they logged in with.
+"""
+from .models import IsLogin
+
+SESSION_KEY = 'student'
+
+
+def remember(session, student, leetcode_username):
+    """Stores a student as the owner of `session`."""
+    session[SESSION_KEY] = {
+        'id': student.pk,
+        'email': student.email,
+        'leetcode_username': leetcode_username,
+    }
+
+
+def log_in(request, student, leetcode_username):
+    """Makes `student` the owner of the request's session and marks them logged in."""
+    if request.session.session_key:
+        # A new key, so one handed out before the login can't be reused (session fixation)
+        request.session.cycle_key()
+    remember(request.session, student, leetcode_username)
+    IsLogin.objects.bulk_create(
+        [IsLogin(email=student.email, is_logged_in=True, leetcode_username=leetcode_username)],
+        update_conflicts=True, unique_fields=['email'], update_fields=['is_logged_in', 'leetcode_username'],
+    )
+
+
+def current(request):
+    """The logged-in student as {'id', 'email', 'leetcode_username'}, or None."""
+    return request.session.get(SESSION_KEY)
+
+
+def leetcode_username(request):
+    """The LeetCode username of the logged-in student, or None."""
+    student = current(request)
+    return student['leetcode_username'] if student else None
@@ -0,0 +1,112 @@
+"""
+Background verification jobs.
+
+A verify click only inserts a VerificationJob row and hands its id to a small
+pool of worker threads living in the web process. The request returns at once
+and the page polls the job status endpoint until a worker has finished the
+LeetCode call and written the score.
+"""
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import VerificationJob
+from . import verify
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue(maxsize=getattr(settings, 'VERIFY_QUEUE_SIZE', 500))
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def _ensure_workers():
+    """Starts the worker threads the first time a job is submitted."""
+    with _workers_lock:
+        if _workers:
+            return
+        for number in range(getattr(settings, 'VERIFY_WORKERS', 4)):
+            worker = threading.Thread(
+                target=_work, name=f'verify-worker-{number}', daemon=True
+            )
+            worker.start()
+            _workers.append(worker)
+
+
+def enqueue(contest, username):
+    """
+    Queues a verification for a participant, reusing a pending one if any.
+
+    Args:
+        contest: The Contest being verified.
+        username: The LeetCode username of the participant.
+
+    Returns:
+        The VerificationJob tracking the request.
+    """
+    # Jobs older than this were lost with a restarted worker; don't reuse them.
+    stale_before = timezone.now() - timedelta(
+        seconds=getattr(settings, 'VERIFY_JOB_STALE_SECONDS', 120)
+    )
+    pending = VerificationJob.objects.filter(
+        contest=contest,
+        user_name=username,
+        status__in=[VerificationJob.QUEUED, VerificationJob.RUNNING],
+        created_at__gte=stale_before,
+    ).first()
+    if pending is not None:
+        return pending
+
+    job = VerificationJob.objects.create(contest=contest, user_name=username)
+    _ensure_workers()
+    try:
+        _queue.put_nowait(job.pk)
+    except queue.Full:
+        job.status = VerificationJob.FAILED
+        job.error = 'Too many verifications in progress, please try again.'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def run_job(job_id):
+    """Runs a queued job, unless another worker already claimed it."""
+    claimed = VerificationJob.objects.filter(
+        pk=job_id, status=VerificationJob.QUEUED
+    ).update(status=VerificationJob.RUNNING)
+    if not claimed:
+        return
+
+    job = VerificationJob.objects.select_related('contest').get(pk=job_id)
+    try:
+        result = verify.verify_user(job.contest, job.user_name)
+    except Exception:
+        logger.exception('Verification of %s failed', job.user_name)
+        job.status = VerificationJob.FAILED
+        job.error = 'Could not verify submissions, please try again.'
+    else:
+        job.status = VerificationJob.DONE
+        job.marks = result['marks']
+        job.question1 = result['question1']
+        job.question2 = result['question2']
+        job.question3 = result['question3']
+    job.finished_at = timezone.now()
+    job.save()
+
+
+def _work():
+    while True:
+        job_id = _queue.get()
+        try:
+            close_old_connections()
+            run_job(job_id)
+        except Exception:
+            logger.exception('Verification worker crashed on job %s', job_id)
+        finally:
+            close_old_connections()
+            _queue.task_done()
@@ -0,0 +1,352 @@
+"""
+In-process leaderboard cache.
+
+Each contest's rows (keyed by contest id, as several contests can share a
+day) are loaded once and kept sorted by rank (marks descending,
+then penalty, then id). The post_save/post_delete signals on ContestLeaderboard apply every
+write to the cached board directly, so page views are served without touching
+the database once the board is warm.
+
+Other processes learn about writes through a version counter kept in the
+LEADERBOARD_CACHE_ALIAS cache: when the version moved and it wasn't us, the
+local boards are dropped and rebuilt on the next read.
+
+Rows still waiting in the write-behind buffer (members/writebehind.py) are
+staged here with stage_row() and laid over every board loaded until
+rows_saved() reports them written.
+"""
+import bisect
+import hashlib
+import itertools
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ContestLeaderboard
+from . import live
+
+VERSION_KEY = 'leaderboard:version'
+
+# Columns the pages need from every row.
+FIELDS = (
+    'id',
+    'contest_name',
+    'user_name',
+    'marks',
+    'question1',
+    'question2',
+    'question3',
+    'penalty',
+    'contest_id',
+    'contest_date',
+)
+
+# Columns events carry outside of 'entry'
+EVENT_FIELDS = ('contest_id', 'contest_date')
+
+
+# Staged rows get ids from here, so until they're saved they rank after
+# saved rows with the same marks
+STAGED_ID_BASE = 10 ** 15
+
+# The columns a verify result sets
+SCORE_FIELDS = ('marks', 'question1', 'question2', 'question3', 'penalty')
+
+
+def rank_key(row):
+    # Equal marks are ranked by the solve-time penalty (see events.tiebreak)
+    return (-row['marks'], row['penalty'], row['id'])
+
+
+class ContestBoard:
+    """The rows of one contest, pre-sorted by rank."""
+
+    def __init__(self, contest_id, rows):
+        self.contest_id = contest_id
+        self.rows = sorted(rows, key=rank_key)
+        self.keys = [rank_key(row) for row in self.rows]
+        self.by_user = {row['user_name']: row for row in self.rows}
+        self.updated_at = timezone.now()
+        self._json = None
+        self._etag = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def contest_date(self):
+        return self.rows[0]['contest_date'] if self.rows else None
+
+    def upsert(self, row):
+        """Inserts or moves a row to its ranked position."""
+        self._discard(row['user_name'])
+        index = bisect.bisect_left(self.keys, rank_key(row))
+        self.rows.insert(index, row)
+        self.keys.insert(index, rank_key(row))
+        self.by_user[row['user_name']] = row
+        self._touch()
+
+    def remove(self, user_name):
+        if self._discard(user_name):
+            self._touch()
+
+    def rank_of(self, user_name):
+        """The 1-based rank of a user on this board, or None."""
+        row = self.by_user.get(user_name)
+        if row is None:
+            return None
+        return bisect.bisect_left(self.keys, rank_key(row)) + 1
+
+    def as_json(self):
+        """The ranked rows serialized once per change, not once per view."""
+        if self._json is None:
+            self._json = json.dumps(self.rows, cls=DjangoJSONEncoder)
+        return self._json
+
+    @property
+    def etag(self):
+        """A content hash, so every process agrees on it for the same rows."""
+        if self._etag is None:
+            self._etag = hashlib.md5(self.as_json().encode()).hexdigest()
+        return self._etag
+
+    def page(self, after=None, limit=10):
+        """
+        Returns one ranked page using keyset pagination.
+
+        Args:
+            after: The rank key of the last row already shown, or None for
+                the first page.
+            limit: The maximum number of rows to return.
+
+        Returns:
+            A (start, rows) tuple where start is the zero-based rank of the
+            first returned row.
+        """
+        start = 0 if after is None else bisect.bisect_right(self.keys, tuple(after))
+        return start, self.rows[start:start + limit]
+
+    def _discard(self, user_name):
+        old = self.by_user.pop(user_name, None)
+        if old is None:
+            return False
+        index = bisect.bisect_left(self.keys, rank_key(old))
+        del self.rows[index]
+        del self.keys[index]
+        return True
+
+    def _touch(self):
+        self.updated_at = timezone.now()
+        self._json = None
+        self._etag = None
+
+
+_boards = {}
+_staged = {}
+# (contest_date, contest_id) of the latest board
+_latest = None
+_synced_version = None
+_synced_at = 0.0
+_lock = threading.RLock()
+
+_staged_ids = itertools.count(STAGED_ID_BASE)
+
+
+def _cache():
+    return caches[getattr(settings, 'LEADERBOARD_CACHE_ALIAS', 'default')]
+
+
+def _sync():
+    """Drops the local boards if another process wrote since we last looked."""
+    global _synced_version, _synced_at, _latest
+    version = _cache().get(VERSION_KEY)
+    max_age = getattr(settings, 'LEADERBOARD_CACHE_MAX_AGE', 300)
+    if version != _synced_version or time.monotonic() - _synced_at > max_age:
+        _boards.clear()
+        _latest = None
+        _synced_version = version
+        _synced_at = time.monotonic()
+
+
+def _bump_version():
+    """Announces a local write; keeps our boards if nobody else wrote meanwhile."""
+    global _synced_version
+    cache = _cache()
+    if cache.add(VERSION_KEY, 1, timeout=None):
+        version = 1
+    else:
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, timeout=None)
+            version = 1
+    if _synced_version is not None and version == _synced_version + 1:
+        _synced_version = version
+        return True
+    return False
+
+
+def get_board(contest_id):
+    """Returns the cached board of a contest, loading it on first use."""
+    with _lock:
+        _sync()
+        board = _boards.get(contest_id)
+        if board is None:
+            rows = ContestLeaderboard.objects.filter(contest_id=contest_id).values(*FIELDS)
+            board = ContestBoard(contest_id, list(rows))
+            for (pk, user_name), row in _staged.items():
+                if pk == contest_id:
+                    board.upsert(_staged_row(board, row))
+            # Don't let lookups of arbitrary ids fill memory with empty boards
+            if board:
+                _boards[contest_id] = board
+        return board
+
+
+def _later(date, contest_id):
+    """Moves _latest forward to the board of (date, contest_id) if that one is newer."""
+    global _latest
+    if _latest is not None and contest_id is not None and (date, contest_id) > _latest:
+        _latest = (date, contest_id)
+
+
+def latest_board():
+    """Returns the board of the most recent contest, or None if there is none."""
+    global _latest
+    with _lock:
+        _sync()
+        if _latest is None:
+            _latest = (
+                ContestLeaderboard.objects.filter(contest__isnull=False)
+                .order_by('-contest_date', '-contest_id')
+                .values_list('contest_date', 'contest_id')
+                .first()
+            )
+            staged = [(row['contest_date'], row['contest_id']) for row in _staged.values()]
+            if staged and (_latest is None or max(staged) > _latest):
+                _latest = max(staged)
+        if _latest is None:
+            return None
+        return get_board(_latest[1])
+
+
+def current_version():
+    """The leaderboard version in the shared cache, and the one this process holds."""
+    return _cache().get(VERSION_KEY), _synced_version
+
+
+def _entry_event(entry, board):
+    return {
+        'type': 'row',
+        **{field: getattr(entry, field) for field in EVENT_FIELDS},
+        'rank': board.rank_of(entry.user_name) if board is not None else None,
+        'entry': {field: getattr(entry, field) for field in FIELDS if field not in EVENT_FIELDS},
+    }
+
+
+def row_saved(entry):
+    """Applies a saved ContestLeaderboard instance to the cached boards."""
+    global _latest
+    with _lock:
+        board = None
+        if not _bump_version():
+            _boards.clear()
+            _latest = None
+        else:
+            _later(entry.contest_date, entry.contest_id)
+            board = _boards.get(entry.contest_id)
+            if board is not None:
+                board.upsert({field: getattr(entry, field) for field in FIELDS})
+        event = _entry_event(entry, board)
+    live.publish(event)
+
+
+def row_deleted(entry):
+    """Removes a deleted ContestLeaderboard instance from the cached boards."""
+    global _latest
+    with _lock:
+        if not _bump_version():
+            _boards.clear()
+            _latest = None
+        else:
+            board = _boards.get(entry.contest_id)
+            if board is not None:
+                board.remove(entry.user_name)
+                if not board and (entry.contest_date, entry.contest_id) == _latest:
+                    del _boards[entry.contest_id]
+                    _latest = None
+    live.publish({
+        'type': 'remove',
+        **{field: getattr(entry, field) for field in EVENT_FIELDS},
+        'entry': {'user_name': entry.user_name},
+    })
+
+
+def _staged_row(board, row):
+    """A staged row takes over the id of the user's saved row, so it keeps its place."""
+    existing = board.by_user.get(row['user_name'])
+    if existing is not None and existing['id'] < STAGED_ID_BASE:
+        return dict(row, id=existing['id'])
+    return row
+
+
+def stage_row(row):
+    """
+    Shows a row that hasn't been written to the database yet on the cached boards.
+
+    Args:
+        row: A dict with every field of FIELDS except 'id'.
+    """
+    row = dict(row, id=next(_staged_ids))
+    with _lock:
+        _staged[(row['contest_id'], row['user_name'])] = row
+        _later(row['contest_date'], row['contest_id'])
+        board = _boards.get(row['contest_id'])
+        if board is not None:
+            row = _staged_row(board, row)
+            board.upsert(row)
+        event = {
+            'type': 'row',
+            **{field: row[field] for field in EVENT_FIELDS},
+            'rank': board.rank_of(row['user_name']) if board is not None else None,
+            'entry': {field: row[field] for field in FIELDS if field not in EVENT_FIELDS},
+        }
+    live.publish(event)
+
+
+def rows_saved(entries, flushed=()):
+    """
+    Applies ContestLeaderboard instances written in bulk (no signals) to the cached boards.
+
+    Args:
+        entries: The rows that changed.
+        flushed: (contest_id, user_name, result) of every result written,
+            including those that matched the database already.
+
+    The staged rows of everything written are dropped, unless a newer result
+    was staged meanwhile. Subscribers already heard about them from stage_row().
+    """
+    global _latest
+    with _lock:
+        written = [
+            (entry.contest_id, entry.user_name, {field: getattr(entry, field) for field in SCORE_FIELDS})
+            for entry in entries
+        ]
+        for contest_id, user_name, result in [*written, *flushed]:
+            staged = _staged.get((contest_id, user_name))
+            if staged is not None and all(staged[field] == result[field] for field in SCORE_FIELDS):
+                del _staged[(contest_id, user_name)]
+        if not _bump_version():
+            _boards.clear()
+            _latest = None
+            return
+        for entry in entries:
+            _later(entry.contest_date, entry.contest_id)
+            board = _boards.get(entry.contest_id)
+            if board is not None and (entry.contest_id, entry.user_name) not in _staged:
+                board.upsert({field: getattr(entry, field) for field in FIELDS})
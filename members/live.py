@@ -0,0 +1,69 @@
+"""
+Live leaderboard updates for Server-Sent Events clients.
+
+Every open stream owns a small asyncio.Queue on the event loop that serves it.
+Leaderboard writes happen on other threads (request threads, verify workers),
+so publish() hands each event to the subscriber's loop with
+call_soon_threadsafe. A subscriber that falls too far behind gets a single
+'resync' event instead of an unbounded backlog.
+
+Subscribers only hear about writes made in their own process; the leaderboard
+version check in leaderboard_stream covers writes made by other workers.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+
+RESYNC = {'type': 'resync'}
+
+
+class Subscription:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=getattr(settings, 'LIVE_STREAM_QUEUE_SIZE', 100))
+
+    def offer(self, event):
+        """Runs on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+def subscribe():
+    """Registers a new subscription; must be called from the event loop serving it."""
+    subscription = Subscription()
+    with _subscribers_lock:
+        _subscribers.add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    with _subscribers_lock:
+        _subscribers.discard(subscription)
+
+
+def subscriber_count():
+    with _subscribers_lock:
+        return len(_subscribers)
+
+
+def publish(event):
+    """Sends an event to every subscriber of this process, from any thread."""
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+        except RuntimeError:
+            # The loop has been closed under a stream that never cleaned up
+            unsubscribe(subscription)
@@ -0,0 +1,59 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members import onboarding
+
+
+class Command(BaseCommand):
+    help = "Imports students and their LeetCode usernames from a CSV or JSONL file."
+
+    # Seconds between progress lines
+    progress_every = 1
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or - for standard input.")
+        parser.add_argument('--format', choices=onboarding.FORMATS,
+                            help="File format (guessed from the extension by default).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Rows written per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and count without writing.")
+
+    def progress(self, report):
+        if report.seconds >= self._next_progress:
+            self._next_progress = report.seconds + self.progress_every
+            self.stderr.write(report.summary())
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or onboarding.detect_format(path)
+        if format is None:
+            raise CommandError("Can't tell the format from the file name; pass --format.")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        self._next_progress = self.progress_every
+
+        try:
+            # utf-8-sig drops the byte order mark spreadsheet exports start with
+            handle = (
+                io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='') if path == '-'
+                else open(path, encoding='utf-8-sig', newline='')
+            )
+        except OSError as e:
+            raise CommandError(f"Can't open {path}: {e}")
+        with handle:
+            report = onboarding.import_students(
+                onboarding.read_rows(handle, format),
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+                progress=self.progress,
+            )
+
+        for line_number, reason in report.errors:
+            self.stderr.write(self.style.WARNING(f"Line {line_number}: {reason}"))
+        if report.invalid > len(report.errors):
+            self.stderr.write(self.style.WARNING(f"... and {report.invalid - len(report.errors)} more invalid row(s)."))
+        self.stdout.write(self.style.SUCCESS(
+            ("Dry run, nothing written. " if options['dry_run'] else "")
+            + f"{report.summary()} in {report.seconds:.2f}s."
+        ))
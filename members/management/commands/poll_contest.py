@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import Contest
+from members import contests
+from members import poller
+from members import writebehind
+
+
+class Command(BaseCommand):
+    help = "Verifies every participant in the background while a contest is running."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contest', help="Contest name (defaults to today's contest).")
+        parser.add_argument('--once', action='store_true', help="Poll everyone once and exit.")
+
+    def handle(self, *args, **options):
+        if options['contest']:
+            contest = Contest.objects.filter(name=options['contest']).first()
+        else:
+            current = contests.current_contest()
+            contest = current.contest if current is not None else None
+        if contest is None:
+            raise CommandError("No contest found.")
+
+        written = poller.poll_contest(contest, once=options['once'], log=self.stdout.write)
+        # Results may still sit in the write-behind buffer
+        writebehind.flush()
+        self.stdout.write(self.style.SUCCESS(f"Done polling {contest.name}: {written} entries written."))
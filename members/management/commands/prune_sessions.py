@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from members import db
+
+
+class Command(BaseCommand):
+    help = "Deletes expired sessions from django_session in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Sessions deleted per transaction.")
+        parser.add_argument('--pause', type=float, default=0,
+                            help="Seconds to wait between batches, so other writers get the database.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        # Short transactions instead of one long DELETE keep SQLite's write lock free for the site
+        now = timezone.now()
+        deleted = 0
+        while True:
+            with db.writer():
+                keys = list(
+                    Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+                )
+                Session.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            if len(keys) < batch_size:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired session(s)."))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from members import ratings
+
+
+class Command(BaseCommand):
+    help = "Recomputes every StudentRating from the whole ContestLeaderboard history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows streamed per query.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = ratings.rebuild(
+            chunk_size=options['chunk_size'],
+            progress=lambda count: self.stdout.write(f"  {count} entries..."),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt ratings from {processed} entries in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import Contest, ContestLeaderboard
+from members import contests
+from members import events
+from members import writebehind
+
+
+class Command(BaseCommand):
+    help = "Scores a contest again from its stored accepted submissions, without calling LeetCode."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contest', help="Contest name (defaults to today's contest).")
+        parser.add_argument('--dry-run', action='store_true', help="Show the new top ten without writing.")
+        parser.add_argument('--tiebreak', choices=events.RULES,
+                            help="Preview another tie-break rule (with --dry-run only).")
+
+    def handle(self, *args, **options):
+        if options['contest']:
+            contest = Contest.objects.filter(name=options['contest']).first()
+        else:
+            current = contests.current_contest()
+            contest = current.contest if current is not None else None
+        if contest is None:
+            raise CommandError("No contest found.")
+        if options['tiebreak'] and not options['dry_run']:
+            # Later verifies score with the setting, so a rescore must use it too
+            raise CommandError("--tiebreak only previews; change LEADERBOARD_TIEBREAK to rescore with another rule.")
+
+        standings = events.standings(contest)
+        ranked = standings.ranked(options['tiebreak'])
+        # Entries from before the event store have nothing to be scored from
+        skipped = (
+            ContestLeaderboard.objects.filter(contest_name=contest.name, contest_date=contest.date)
+            .exclude(user_name__in=[user_name for user_name, _, _ in ranked]).count()
+        )
+
+        if options['dry_run']:
+            for rank, (user_name, result, _) in enumerate(ranked[:10], start=1):
+                self.stdout.write(f"{rank:>3}. {user_name}: {result['marks']} marks, penalty {result['penalty']}")
+            self.stdout.write(f"{len(ranked)} participant(s) would be rescored, {skipped} without events.")
+            return
+
+        entries = writebehind.write({
+            (contest.name, user_name, contest.date): (contest, result, solved)
+            for user_name, result, solved in ranked
+        })
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {len(ranked)} participant(s) of {contest.name} from their stored accepts, "
+            f"{len(entries)} entries changed"
+            + (f", {skipped} without events left as they were." if skipped else ".")
+        ))
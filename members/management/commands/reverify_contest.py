@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import Contest
+from members import contests
+from members import poller
+from members import verify
+from members import writebehind
+
+
+class Command(BaseCommand):
+    help = "Re-verifies every participant of a contest with batched LeetCode requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contest', help="Contest name (defaults to today's contest).")
+        parser.add_argument('--batch-size', type=int, help="Users per LeetCode request.")
+
+    def handle(self, *args, **options):
+        if options['contest']:
+            contest = Contest.objects.filter(name=options['contest']).first()
+        else:
+            current = contests.current_contest()
+            contest = current.contest if current is not None else None
+        if contest is None:
+            raise CommandError("No contest found.")
+
+        # Registered students too, so those not on the leaderboard yet get their first result
+        usernames = sorted(poller.participants(contest))
+        results = verify.verify_users(contest, usernames, batch_size=options['batch_size'])
+        # Results may still sit in the write-behind buffer
+        writebehind.flush()
+
+        failed = len(usernames) - len(results)
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-verified {len(results)} participant(s) of {contest.name}"
+            + (f", {failed} could not be fetched." if failed else ".")
+        ))
@@ -0,0 +1,221 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+MetricsMiddleware times every request by view. While it runs, a RequestTimings
+object in a context variable collects the time spent in:
+- database queries: an execute_wrapper installed on every new connection
+- LeetCode calls: fetch.py calls observe_upstream()
+- template rendering: the Django template backend's render() is wrapped
+
+Those are recorded in histograms and, with METRICS_SERVER_TIMING on, sent
+back in a Server-Timing header. The histograms belong to the process;
+every worker serves its own /metrics, only with METRICS_ENABLED on and to
+requests carrying METRICS_TOKEN.
+"""
+import bisect
+import contextvars
+import hmac
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per label value tuple."""
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {values: (list(counts), total) for values, (counts, total) in self._series.items()}
+        for values, (counts, total) in sorted(series.items()):
+            labels = ','.join(f'{name}="{value}"' for name, value in zip(self.labels, values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{{{labels + "," if labels else ""}{le}}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{self.name}_sum{suffix} {total:.6f}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return '\n'.join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    'contestvibes_request_seconds', 'Time to produce a response, by view.', ('view', 'method', 'status'),
+)
+DB_QUERY_SECONDS = Histogram(
+    'contestvibes_db_query_seconds', 'Time of each database query, by view.', ('view',),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'contestvibes_db_queries_per_request', 'Database queries run per request, by view.', ('view',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+UPSTREAM_SECONDS = Histogram(
+    'contestvibes_upstream_seconds', 'Time of each LeetCode call, by HTTP status.', ('status',),
+)
+TEMPLATE_SECONDS = Histogram(
+    'contestvibes_template_render_seconds', 'Time to render each template.', ('template',),
+)
+
+HISTOGRAMS = (REQUEST_SECONDS, DB_QUERY_SECONDS, DB_QUERIES_PER_REQUEST, UPSTREAM_SECONDS, TEMPLATE_SECONDS)
+
+
+class RequestTimings:
+    def __init__(self, request):
+        self.request = request
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.upstream_seconds = 0.0
+        self.upstream_calls = 0
+        self.template_seconds = 0.0
+
+    @property
+    def view(self):
+        return _view_name(self.request)
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+            f'upstream;dur={self.upstream_seconds * 1000:.1f};desc="{self.upstream_calls} calls"',
+            f'tpl;dur={self.template_seconds * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def _view_label():
+    timings = _current.get()
+    return timings.view if timings is not None else 'background'
+
+
+def observe_upstream(seconds, status):
+    """Records one LeetCode call; status is the HTTP status or 'error'."""
+    UPSTREAM_SECONDS.observe(seconds, str(status))
+    timings = _current.get()
+    if timings is not None:
+        timings.upstream_seconds += seconds
+        timings.upstream_calls += 1
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        DB_QUERY_SECONDS.observe(seconds, _view_label())
+        timings = _current.get()
+        if timings is not None:
+            timings.db_seconds += seconds
+            timings.db_queries += 1
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def timed(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            TEMPLATE_SECONDS.observe(seconds, getattr(self.template, 'name', None) or 'string')
+            timings = _current.get()
+            if timings is not None:
+                timings.template_seconds += seconds
+    return timed
+
+
+def install():
+    """Hooks the database and template timers in; called once from MembersConfig.ready()."""
+    from django.template.backends.django import Template
+
+    if not getattr(settings, 'METRICS_ENABLED', False) or getattr(Template.render, '_metrics', False):
+        return
+    connection_created.connect(_install_query_wrapper, dispatch_uid='metrics_query_wrapper')
+    Template.render = _timed_render(Template.render)
+    Template.render._metrics = True
+
+
+def authorized(request):
+    """Whether a /metrics request carries METRICS_TOKEN; nobody is, while it is unset."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+def render():
+    """All histograms in the Prometheus text exposition format."""
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+def _view_name(request):
+    # Set by the URL resolver just before the view is called
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def _finish(request, response, timings, started):
+    total = time.perf_counter() - started
+    view = _view_name(request)
+    REQUEST_SECONDS.observe(total, view, request.method, str(response.status_code))
+    DB_QUERIES_PER_REQUEST.observe(timings.db_queries, view)
+    if getattr(settings, 'METRICS_SERVER_TIMING', False):
+        response['Server-Timing'] = timings.server_timing(total)
+
+
+@sync_and_async_middleware
+def MetricsMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            timings = RequestTimings(request)
+            token = _current.set(timings)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            _finish(request, response, timings, started)
+            return response
+    else:
+        def middleware(request):
+            timings = RequestTimings(request)
+            token = _current.set(timings)
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+            _finish(request, response, timings, started)
+            return response
+    return middleware
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0007_rename_question1_time_contestleaderboard_question1_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_name', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('marks', models.IntegerField(default=0)),
+                ('question1', models.BooleanField(default=False)),
+                ('question2', models.BooleanField(default=False)),
+                ('question3', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, max_length=300)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='members.contest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['contest', 'user_name', 'status'], name='members_ver_contest_5569c3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_and_dedupe_entries(apps, schema_editor):
+    """Points entries at their Contest and drops duplicates of the new unique key."""
+    Contest = apps.get_model('members', 'Contest')
+    ContestLeaderboard = apps.get_model('members', 'ContestLeaderboard')
+
+    duplicates = (
+        ContestLeaderboard.objects.values('contest_name', 'user_name', 'contest_date')
+        .annotate(keep=models.Max('id'), count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        ContestLeaderboard.objects.filter(
+            contest_name=duplicate['contest_name'],
+            user_name=duplicate['user_name'],
+            contest_date=duplicate['contest_date'],
+        ).exclude(id=duplicate['keep']).delete()
+
+    for contest in Contest.objects.all():
+        ContestLeaderboard.objects.filter(
+            contest_name=contest.name, contest_date=contest.date
+        ).update(contest=contest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0008_verificationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contestleaderboard',
+            name='contest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leaderboard', to='members.contest'),
+        ),
+        migrations.RunPython(link_and_dedupe_entries, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='contest',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='contestleaderboard',
+            index=models.Index(fields=['contest_date', '-marks'], name='leaderboard_date_marks_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contestleaderboard',
+            constraint=models.UniqueConstraint(fields=('contest_name', 'user_name', 'contest_date'), name='unique_leaderboard_entry'),
+        ),
+    ]
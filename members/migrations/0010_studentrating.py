@@ -0,0 +1,76 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+# ratings.rebuild() as it was when this migration was written; migrations must
+# not import app code, which keeps changing under them
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32
+QUESTIONS_PER_CONTEST = 3
+
+
+def build_ratings(apps, schema_editor):
+    ContestLeaderboard = apps.get_model('members', 'ContestLeaderboard')
+    StudentRating = apps.get_model('members', 'StudentRating')
+    totals = {}
+    changed = []
+    entries = ContestLeaderboard.objects.order_by('contest_date', 'id').values(
+        'id', 'user_name', 'marks', 'question1', 'question2', 'question3'
+    )
+    for entry in entries.iterator(chunk_size=2000):
+        user = totals.setdefault(entry['user_name'], {
+            'total_marks': 0,
+            'contests_attended': 0,
+            'questions_solved': 0,
+            'rating': DEFAULT_RATING,
+        })
+        solved = int(entry['question1']) + int(entry['question2']) + int(entry['question3'])
+        expected = 1 / (1 + 10 ** ((DEFAULT_RATING - user['rating']) / 400))
+        change = K_FACTOR * (solved / QUESTIONS_PER_CONTEST - expected)
+        user['total_marks'] += entry['marks']
+        user['contests_attended'] += 1
+        user['questions_solved'] += solved
+        user['rating'] += change
+        if change:
+            changed.append(ContestLeaderboard(id=entry['id'], rating_change=change))
+    ContestLeaderboard.objects.bulk_update(changed, ['rating_change'], batch_size=2000)
+    StudentRating.objects.bulk_create(
+        (StudentRating(user_name=name, **values) for name, values in totals.items()),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0009_leaderboard_indexes_and_contest_fk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_name', models.CharField(max_length=100, unique=True)),
+                ('total_marks', models.IntegerField(default=0)),
+                ('contests_attended', models.IntegerField(default=0)),
+                ('questions_solved', models.IntegerField(default=0)),
+                ('rating', models.FloatField(default=1500)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contestleaderboard',
+            name='rating_change',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='contestleaderboard',
+            index=models.Index(fields=['user_name', 'contest_date'], name='leaderboard_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentrating',
+            index=models.Index(fields=['-rating', 'id'], name='rating_rank_idx'),
+        ),
+        migrations.RunPython(build_ratings, migrations.RunPython.noop),
+    ]
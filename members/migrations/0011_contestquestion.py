@@ -0,0 +1,85 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:18
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import slugify
+
+# questions.DEFAULT_POINTS and questions.legacy_slug() as they were when this
+# migration was written; migrations must not import app code
+DEFAULT_POINTS = 100
+
+_PROBLEM_LINK = re.compile(r'/problems/([\w-]+)')
+
+
+def legacy_slug(title, link=''):
+    match = _PROBLEM_LINK.search(link or '')
+    return match.group(1) if match else slugify(title)
+
+
+def copy_legacy_questions(apps, schema_editor):
+    Contest = apps.get_model('members', 'Contest')
+    ContestQuestion = apps.get_model('members', 'ContestQuestion')
+    ContestLeaderboard = apps.get_model('members', 'ContestLeaderboard')
+    QuestionSolve = apps.get_model('members', 'QuestionSolve')
+    for contest in Contest.objects.all():
+        legacy = [
+            (contest.question_1, contest.question_1_link),
+            (contest.question_2, contest.question_2_link),
+            (contest.question_3, contest.question_3_link),
+        ]
+        created = {}
+        for number, (title, link) in enumerate(legacy, start=1):
+            slug = legacy_slug(title, link)
+            if title and slug not in [question.slug for question in created.values()]:
+                created[number] = ContestQuestion.objects.create(
+                    contest=contest, slug=slug, title=title, points=DEFAULT_POINTS, order=number,
+                )
+        solves = []
+        for entry in ContestLeaderboard.objects.filter(contest=contest):
+            for number, question in created.items():
+                if getattr(entry, f'question{number}'):
+                    solves.append(QuestionSolve(entry=entry, question=question))
+        QuestionSolve.objects.bulk_create(solves)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0010_studentrating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=300)),
+                ('title', models.CharField(blank=True, max_length=300)),
+                ('points', models.IntegerField(default=100)),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='members.contest')),
+            ],
+            options={
+                'ordering': ['order', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionSolve',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solves', to='members.contestleaderboard')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solves', to='members.contestquestion')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='questionsolve',
+            constraint=models.UniqueConstraint(fields=('entry', 'question'), name='unique_question_solve'),
+        ),
+        migrations.AddConstraint(
+            model_name='contestquestion',
+            constraint=models.UniqueConstraint(fields=('contest', 'slug'), name='unique_contest_question'),
+        ),
+        migrations.RunPython(copy_legacy_questions, migrations.RunPython.noop),
+    ]
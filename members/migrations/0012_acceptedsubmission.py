@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0011_contestquestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contestleaderboard',
+            name='penalty',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AcceptedSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(db_index=False, max_length=300)),
+                ('timestamp', models.BigIntegerField()),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accepted_submissions', to='members.contest')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='acceptedsubmission',
+            constraint=models.UniqueConstraint(fields=('contest', 'user_name', 'slug', 'timestamp'), name='unique_accepted_submission'),
+        ),
+    ]
@@ -10,7 +10,7 @@ class Students(models.Model):
         return f"{self.first_name} {self.last_name}"
 class Contest(models.Model):
     name = models.CharField(max_length=200, unique=True)      # Contest name
-    date = models.DateField()                                  # Contest date
+    date = models.DateField(db_index=True)                     # Contest date
     start_time = models.TimeField()                            # Start time
     end_time = models.TimeField()                              # End time
 
@@ -36,6 +36,9 @@ class IsLogin(models.Model):
 from django.db import models
 
 class ContestLeaderboard(models.Model):
+    contest = models.ForeignKey(
+        Contest, on_delete=models.SET_NULL, null=True, blank=True, related_name='leaderboard'
+    )
     contest_name = models.CharField(max_length=100)
     user_name = models.CharField(max_length=100)
     marks = models.IntegerField(default=0)
@@ -46,5 +49,148 @@ class ContestLeaderboard(models.Model):
     
     contest_date = models.DateField()
 
+    # What this entry added to the user's StudentRating.rating
+    rating_change = models.FloatField(default=0)
+
+    # Breaks ties between equal marks, lower first (see events.tiebreak)
+    penalty = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # The key verification upserts on
+            models.UniqueConstraint(
+                fields=['contest_name', 'user_name', 'contest_date'],
+                name='unique_leaderboard_entry',
+            ),
+        ]
+        indexes = [
+            # Latest contest day, and one day's rows ranked by marks
+            models.Index(fields=['contest_date', '-marks'], name='leaderboard_date_marks_idx'),
+            # One user's history, for ratings
+            models.Index(fields=['user_name', 'contest_date'], name='leaderboard_user_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signal handlers can apply score deltas
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def solved_count(self):
+        return int(self.question1) + int(self.question2) + int(self.question3)
+
     def __str__(self):
         return f"{self.user_name} - {self.contest_name}"
+
+
+class ContestQuestion(models.Model):
+    """One question of a contest, matched against submissions by its LeetCode slug."""
+
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='questions')
+    slug = models.SlugField(max_length=300)          # e.g. "two-sum"
+    title = models.CharField(max_length=300, blank=True)
+    points = models.IntegerField(default=100)
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['order', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['contest', 'slug'], name='unique_contest_question'),
+        ]
+
+    def __str__(self):
+        return f"{self.contest.name} - {self.slug}"
+
+
+class QuestionSolve(models.Model):
+    """A contest question solved by a leaderboard entry."""
+
+    entry = models.ForeignKey(ContestLeaderboard, on_delete=models.CASCADE, related_name='solves')
+    question = models.ForeignKey(ContestQuestion, on_delete=models.CASCADE, related_name='solves')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entry', 'question'], name='unique_question_solve'),
+        ]
+
+    def __str__(self):
+        return f"{self.entry.user_name} - {self.question.slug}"
+
+
+class AcceptedSubmission(models.Model):
+    """
+    An accepted LeetCode submission of a contest question, as seen by a verify.
+
+    Rows are only ever added (duplicates are ignored on insert), so a contest
+    can be scored again from them without asking LeetCode.
+    """
+
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='accepted_submissions')
+    user_name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=300, db_index=False)
+    timestamp = models.BigIntegerField()            # LeetCode's Unix timestamp
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['contest', 'user_name', 'slug', 'timestamp'],
+                name='unique_accepted_submission',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_name} - {self.slug} ({self.timestamp})"
+
+
+class StudentRating(models.Model):
+    """All-time totals of one participant, kept in step with ContestLeaderboard."""
+
+    user_name = models.CharField(max_length=100, unique=True)
+    total_marks = models.IntegerField(default=0)
+    contests_attended = models.IntegerField(default=0)
+    questions_solved = models.IntegerField(default=0)
+    rating = models.FloatField(default=1500)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating', 'id'], name='rating_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_name} - {round(self.rating)}"
+
+
+class VerificationJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE)
+    user_name = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+
+    marks = models.IntegerField(default=0)
+    question1 = models.BooleanField(default=False)
+    question2 = models.BooleanField(default=False)
+    question3 = models.BooleanField(default=False)
+    error = models.CharField(max_length=300, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['contest', 'user_name', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_name} - {self.contest.name} ({self.status})"
@@ -0,0 +1,185 @@
+"""
+Bulk student import, for onboarding a whole class at once.
+
+Reads a CSV with a header row, or JSONL with one object per line, using the
+fields:
+
+    first_name, last_name, email, password, leetcode_username
+
+last_name and leetcode_username may be empty. Rows are streamed and handled
+a chunk at a time: the chunk is validated, checked against the emails
+already registered with one IN query, and its new students are written with
+bulk_create, Students and IsLogin together in one transaction. A row is
+skipped, never half imported, if it is invalid, repeats an email seen
+earlier in the file or belongs to a registered student.
+
+Used by manage.py import_students and the "Import students" page of the
+Students admin.
+"""
+import csv
+import json
+import re
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from .models import IsLogin, Students
+from . import db
+
+FIELDS = ('first_name', 'last_name', 'email', 'password', 'leetcode_username')
+FORMATS = ('csv', 'jsonl')
+
+# Invalid rows kept in a report; the rest are only counted
+MAX_ERRORS = 50
+
+_LEETCODE_USERNAME = re.compile(r'^[\w.-]{1,100}$')
+
+
+def detect_format(name):
+    """'csv' or 'jsonl' from a file name, or None if its extension is neither."""
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    return 'csv' if extension == 'csv' else None
+
+
+def read_rows(handle, format):
+    """
+    Yields (line number, row dict) from an open text file, one row at a time.
+
+    A JSONL line that isn't a JSON object is yielded as None, to be reported
+    as invalid.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+class ImportReport:
+    """Running totals of an import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.existing = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def reject(self, line_number, reason):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line_number, reason))
+
+    def summary(self):
+        return (
+            f"{self.rows} row(s): {self.created} created, {self.existing} already registered, "
+            f"{self.duplicates} repeated in the file, {self.invalid} invalid "
+            f"({self.rows_per_second:.0f} rows/sec)"
+        )
+
+
+def _clean(row):
+    """Returns the row's fields, stripped, or raises ValidationError."""
+    if row is None:
+        raise ValidationError("Not a JSON object")
+    values = {field: str(row.get(field) or '').strip() for field in FIELDS}
+    for field in ('first_name', 'email', 'password'):
+        if not values[field]:
+            raise ValidationError(f"Missing {field}")
+    for field in ('first_name', 'last_name', 'password'):
+        if len(values[field]) > 100:
+            raise ValidationError(f"{field} is longer than 100 characters")
+    try:
+        validate_email(values['email'])
+    except ValidationError:
+        raise ValidationError("Invalid email address")
+    if values['leetcode_username'] and not _LEETCODE_USERNAME.match(values['leetcode_username']):
+        raise ValidationError("Invalid LeetCode username")
+    return values
+
+
+def _import_chunk(chunk, seen, report, dry_run):
+    valid = []
+    for line_number, row in chunk:
+        report.rows += 1
+        try:
+            values = _clean(row)
+        except ValidationError as e:
+            report.reject(line_number, e.messages[0])
+            continue
+        if values['email'] in seen:
+            report.duplicates += 1
+            continue
+        seen.add(values['email'])
+        valid.append(values)
+    if not valid:
+        return
+
+    with db.writer():
+        # Inside the write transaction, so a registration can't slip in between
+        existing = set(
+            Students.objects.filter(email__in=[values['email'] for values in valid]).values_list('email', flat=True)
+        )
+        new = [values for values in valid if values['email'] not in existing]
+        report.existing += len(existing)
+        if new and not dry_run:
+            Students.objects.bulk_create([
+                Students(first_name=values['first_name'], last_name=values['last_name'],
+                         email=values['email'], password=values['password'])
+                for values in new
+            ])
+            # An IsLogin row left behind by a deleted student is kept as it is
+            IsLogin.objects.bulk_create([
+                IsLogin(email=values['email'], leetcode_username=values['leetcode_username'])
+                for values in new
+            ], ignore_conflicts=True)
+        report.created += len(new)
+
+
+def import_students(rows, chunk_size=500, dry_run=False, progress=None):
+    """
+    Imports students from (line number, row dict) pairs, as read_rows() yields them.
+
+    Args:
+        rows: An iterable of (line number, row dict or None).
+        chunk_size: Rows validated, checked and written together.
+        dry_run: Validate and check against the database, but write nothing.
+        progress: Called with the ImportReport after every chunk.
+
+    Returns:
+        The ImportReport; with dry_run, `created` counts the students that
+        would have been created.
+    """
+    report = ImportReport()
+    seen = set()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, seen, report, dry_run)
+        if progress is not None:
+            progress(report)
+    return report
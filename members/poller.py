@@ -0,0 +1,154 @@
+"""
+Pre-verifies contest participants while the contest is running.
+
+Instead of every participant pressing verify near the end, the poller walks
+all known LeetCode usernames between the contest's start and end time and
+scores them with batched requests. Each user has their own interval: it
+drops to POLLER_MIN_INTERVAL when they just solved something and grows by
+POLLER_BACKOFF on every idle poll, up to POLLER_MAX_INTERVAL. The batched
+fetch also fills the submission cache, so a verify click shortly after a
+poll needs no upstream call.
+"""
+import heapq
+import time
+
+from django.conf import settings
+
+from .models import ContestLeaderboard, IsLogin
+from . import contests
+from . import cursors
+from . import verify
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class PollSchedule:
+    """When each participant is due next, ordered with a heap."""
+
+    def __init__(self, min_interval, max_interval, backoff):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._heap = []
+        self._intervals = {}
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __contains__(self, username):
+        return username in self._intervals
+
+    def add(self, username, due):
+        self._intervals[username] = self.min_interval
+        heapq.heappush(self._heap, (due, username))
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Removes and returns the usernames due at `now`."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def reschedule(self, username, now, active):
+        """Puts a polled user back, sooner if they were `active`."""
+        if active:
+            interval = self.min_interval
+        else:
+            interval = min(self.max_interval, self._intervals[username] * self.backoff)
+        self._intervals[username] = interval
+        heapq.heappush(self._heap, (now + interval, username))
+
+
+def participants(contest):
+    """Registered LeetCode usernames plus anyone already on the contest's leaderboard."""
+    registered = (
+        IsLogin.objects.exclude(leetcode_username='')
+        .values_list('leetcode_username', flat=True)
+    )
+    entered = (
+        ContestLeaderboard.objects.filter(contest_name=contest.name, contest_date=contest.date)
+        .values_list('user_name', flat=True)
+    )
+    return set(registered) | set(entered)
+
+
+def _known_results(contest):
+    """The scores already on the leaderboard, so unchanged results aren't rewritten."""
+    entries = ContestLeaderboard.objects.filter(
+        contest_name=contest.name, contest_date=contest.date
+    ).values('user_name', 'marks', 'question1', 'question2', 'question3', 'penalty')
+    return {entry.pop('user_name'): entry for entry in entries}
+
+
+def poll_contest(contest, once=False, log=print):
+    """
+    Polls the participants of `contest` until it ends.
+
+    Args:
+        contest: The Contest to poll for.
+        once: Poll every participant a single time and return, whatever the time.
+        log: Callable receiving progress messages.
+
+    Returns:
+        The number of leaderboard entries written.
+    """
+    min_interval = _setting('POLLER_MIN_INTERVAL', 30)
+    schedule = PollSchedule(min_interval, _setting('POLLER_MAX_INTERVAL', 300), _setting('POLLER_BACKOFF', 2))
+    refresh_every = _setting('POLLER_REFRESH_SECONDS', 60)
+    known = _known_results(contest)
+    start, end = contests.contest_window(contest)
+    written = 0
+    refreshed_at = None
+
+    if not once and contests.now_ist() < start:
+        wait = (start - contests.now_ist()).total_seconds()
+        log(f"Waiting {wait:.0f}s for {contest.name} to start")
+        time.sleep(wait)
+
+    while once or contests.now_ist() < end:
+        now = time.monotonic()
+        if refreshed_at is None or now - refreshed_at >= refresh_every:
+            # Spread newly seen users over one interval rather than polling them all at once
+            new = sorted(username for username in participants(contest) if username not in schedule)
+            for i, username in enumerate(new):
+                schedule.add(username, now if once else now + min_interval * i / len(new))
+            if new:
+                log(f"Polling {len(new)} new participant(s), {len(schedule)} in total")
+            refreshed_at = now
+
+        due = schedule.pop_due(float('inf') if once else now)
+        if due:
+            # Loaded every round: web verifies move the same cursors
+            user_cursors = cursors.load_many(contest, due)
+            fetched = verify.fetch_submissions_batch(contest, user_cursors)
+            polled_at = time.monotonic()
+            for username in due:
+                submissions = fetched.get(username)
+                active = False
+                if submissions is not None:
+                    previous = known.get(username)
+                    result = verify.record_submissions(
+                        contest, username, submissions, user_cursors[username], previous=previous, save_cursor=False,
+                    )
+                    if verify.is_new_result(result, previous):
+                        known[username] = result
+                        written += 1
+                        active = True
+                schedule.reschedule(username, polled_at, active)
+            cursors.save_many(contest, {
+                username: user_cursors[username] for username in due if fetched.get(username) is not None
+            })
+            failed = sum(fetched.get(username) is None for username in due)
+            log(f"Polled {len(due)} participant(s), {failed} failed, {written} entries written so far")
+
+        if once:
+            break
+        next_due = schedule.next_due()
+        sleep_until = min(next_due if next_due is not None else now + refresh_every, refreshed_at + refresh_every)
+        time.sleep(max(0.0, min(sleep_until - time.monotonic(), (end - contests.now_ist()).total_seconds())))
+    return written
@@ -0,0 +1,117 @@
+"""
+Contest questions, matched against accepted submissions by LeetCode slug.
+
+A contest's questions are loaded once into a {slug: question} map kept in the
+CONTEST_QUESTIONS_CACHE_ALIAS cache, and dropped by the signals whenever a
+Contest or ContestQuestion changes. Scoring a verify is then a set
+intersection between that map and the user's accepted slugs, with no query.
+
+Contests without ContestQuestion rows fall back to their question_1..3
+fields, with slugs taken from the question links.
+"""
+import itertools
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.text import slugify
+
+from .models import ContestQuestion
+
+DEFAULT_POINTS = 100
+
+_PROBLEM_LINK = re.compile(r'/problems/([\w-]+)')
+
+
+def legacy_slug(title, link=''):
+    """The slug of a question_N field: from its link if there is one, else its title."""
+    match = _PROBLEM_LINK.search(link or '')
+    return match.group(1) if match else slugify(title)
+
+
+def _cache():
+    return caches[getattr(settings, 'CONTEST_QUESTIONS_CACHE_ALIAS', 'default')]
+
+
+def _key(contest_id):
+    return f'contest:{contest_id}:questions'
+
+
+def _numbers(orders):
+    """
+    Numbers questions by their slot (question1..3 on the leaderboard): their
+    stored order, or, for questions without one (0) or repeating one already
+    taken, the lowest slot no other question claims.
+    """
+    claimed = {order for order in orders if order}
+    taken = set()
+    numbers = []
+    for order in orders:
+        number = order
+        if not number or number in taken:
+            number = next(n for n in itertools.count(1) if n not in claimed and n not in taken)
+        taken.add(number)
+        numbers.append(number)
+    return numbers
+
+
+def _load(contest):
+    rows = list(
+        ContestQuestion.objects.filter(contest=contest).order_by('order', 'id')
+        .values('id', 'slug', 'points', 'order')
+    )
+    questions = [
+        {'id': row['id'], 'slug': row['slug'], 'points': row['points'], 'number': number}
+        for row, number in zip(rows, _numbers([row['order'] for row in rows]))
+    ]
+    if not questions:
+        legacy = [
+            (contest.question_1, contest.question_1_link),
+            (contest.question_2, contest.question_2_link),
+            (contest.question_3, contest.question_3_link),
+        ]
+        questions = [
+            {'id': None, 'slug': legacy_slug(title, link), 'points': DEFAULT_POINTS, 'number': number}
+            for number, (title, link) in enumerate(legacy, start=1) if title
+        ]
+    return {question['slug']: question for question in questions}
+
+
+def contest_questions(contest):
+    """
+    Returns a contest's questions as a {slug: question} map, from the cache.
+
+    Each question is a dict with 'id' (None for question_N fallbacks), 'slug',
+    'points' and its 'number', the question1..3 slot it is scored in.
+    """
+    cache = _cache()
+    questions = cache.get(_key(contest.pk))
+    if questions is None:
+        questions = _load(contest)
+        cache.set(_key(contest.pk), questions, None)
+    return questions
+
+
+def invalidate(contest_id):
+    _cache().delete(_key(contest_id))
+
+
+def submission_slug(submission):
+    """A submission's question slug (its title slugified if the slug is missing)."""
+    return submission.get('titleSlug') or slugify(submission.get('title') or '')
+
+
+def accepted_slugs(submissions):
+    """The slugs of the accepted submissions."""
+    return {
+        submission_slug(sub)
+        for sub in submissions or ()
+        if sub.get('statusDisplay') == 'Accepted'
+    }
+
+
+def match(contest, submissions):
+    """Returns the contest questions solved in `submissions`, in contest order."""
+    questions = contest_questions(contest)
+    solved = questions.keys() & accepted_slugs(submissions)
+    return sorted((questions[slug] for slug in solved), key=lambda question: question['number'])
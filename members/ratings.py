@@ -0,0 +1,216 @@
+"""
+All-time participant totals and an Elo-style rating.
+
+Every contest entry moves its user's rating towards how they did: a full
+solve counts as a win against a par player rated DEFAULT_RATING, nothing
+solved as a loss. The change an entry applied is stored on the entry itself
+(rating_change), so a re-verified entry swaps its old change for the new one
+and StudentRating never has to be recomputed from the whole history.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import Contest, ContestLeaderboard, StudentRating
+from . import questions
+
+DEFAULT_RATING = 1500.0
+
+# How far a single contest can move a rating
+K_FACTOR = 32
+
+# Questions in a contest whose questions aren't known (its Contest was deleted)
+QUESTIONS_PER_CONTEST = 3
+
+
+def rating_change(rating_before, solved, questions_count=QUESTIONS_PER_CONTEST):
+    """The Elo update for an entry solving `solved` of `questions_count` questions from `rating_before`."""
+    expected = 1 / (1 + 10 ** ((DEFAULT_RATING - rating_before) / 400))
+    actual = min(solved, questions_count) / questions_count
+    return K_FACTOR * (actual - expected)
+
+
+def questions_per_contest(contest_ids):
+    """{contest id: number of questions}, read from the cached question maps."""
+    contests = Contest.objects.in_bulk({pk for pk in contest_ids if pk is not None})
+    return {
+        pk: len(questions.contest_questions(contest)) or QUESTIONS_PER_CONTEST
+        for pk, contest in contests.items()
+    }
+
+
+def _solved(values):
+    return int(values['question1']) + int(values['question2']) + int(values['question3'])
+
+
+def entry_saved(entry, created):
+    """Applies a saved ContestLeaderboard entry to its user's StudentRating."""
+    previous = None if created else getattr(entry, '_loaded_values', None)
+    if previous is None and not created:
+        # Saved without being loaded first, so the old values are unknown
+        recompute_user(entry.user_name)
+        return
+    if previous is not None and previous['marks'] == entry.marks and _solved(previous) == entry.solved_count:
+        return
+
+    old_marks = previous['marks'] if previous else 0
+    old_solved = _solved(previous) if previous else 0
+    old_change = previous['rating_change'] if previous else 0
+
+    counts = questions_per_contest([entry.contest_id])
+    with transaction.atomic():
+        rating, _ = StudentRating.objects.select_for_update().get_or_create(user_name=entry.user_name)
+        new_change = rating_change(
+            rating.rating - old_change, entry.solved_count, counts.get(entry.contest_id, QUESTIONS_PER_CONTEST),
+        )
+        StudentRating.objects.filter(pk=rating.pk).update(
+            total_marks=F('total_marks') + entry.marks - old_marks,
+            questions_solved=F('questions_solved') + entry.solved_count - old_solved,
+            contests_attended=F('contests_attended') + (1 if created else 0),
+            rating=F('rating') - old_change + new_change,
+        )
+        ContestLeaderboard.objects.filter(pk=entry.pk).update(rating_change=new_change)
+    entry.rating_change = new_change
+    entry._loaded_values = {
+        'marks': entry.marks,
+        'question1': entry.question1,
+        'question2': entry.question2,
+        'question3': entry.question3,
+        'rating_change': new_change,
+    }
+
+
+def entries_saved(entries):
+    """
+    Applies many saved entries at once, for rows written without signals (bulk_create).
+
+    Args:
+        entries: (entry, previous) pairs, where entry is a saved ContestLeaderboard
+            and previous holds its 'marks', 'question1'..'question3' and
+            'rating_change' from before the write, or None if it was created.
+    """
+    with transaction.atomic():
+        users = {entry.user_name for entry, _ in entries}
+        ratings = {
+            rating.user_name: rating
+            for rating in StudentRating.objects.select_for_update().filter(user_name__in=users)
+        }
+        counts = questions_per_contest({entry.contest_id for entry, _ in entries})
+        changed = []
+        for entry, previous in entries:
+            if previous is not None and previous['marks'] == entry.marks and _solved(previous) == entry.solved_count:
+                continue
+            rating = ratings.get(entry.user_name)
+            if rating is None:
+                rating = ratings[entry.user_name] = StudentRating(
+                    user_name=entry.user_name, total_marks=0, contests_attended=0,
+                    questions_solved=0, rating=DEFAULT_RATING,
+                )
+            old_change = previous['rating_change'] if previous else 0
+            new_change = rating_change(
+                rating.rating - old_change, entry.solved_count, counts.get(entry.contest_id, QUESTIONS_PER_CONTEST),
+            )
+            rating.total_marks += entry.marks - (previous['marks'] if previous else 0)
+            rating.questions_solved += entry.solved_count - (_solved(previous) if previous else 0)
+            rating.contests_attended += 0 if previous else 1
+            rating.rating += new_change - old_change
+            entry.rating_change = new_change
+            changed.append(entry)
+
+        touched = [ratings[name] for name in {entry.user_name for entry in changed}]
+        StudentRating.objects.bulk_create([rating for rating in touched if rating.pk is None])
+        StudentRating.objects.bulk_update(
+            [rating for rating in touched if rating.pk is not None],
+            ['total_marks', 'contests_attended', 'questions_solved', 'rating'],
+        )
+        ContestLeaderboard.objects.bulk_update(changed, ['rating_change'])
+
+
+def entry_deleted(entry):
+    """Takes a deleted ContestLeaderboard entry back out of its user's totals."""
+    StudentRating.objects.filter(user_name=entry.user_name).update(
+        total_marks=F('total_marks') - entry.marks,
+        questions_solved=F('questions_solved') - entry.solved_count,
+        contests_attended=F('contests_attended') - 1,
+        rating=F('rating') - entry.rating_change,
+    )
+
+
+def recompute_user(user_name):
+    """Recomputes one user's StudentRating from their leaderboard entries."""
+    with transaction.atomic():
+        values = {
+            'total_marks': 0,
+            'contests_attended': 0,
+            'questions_solved': 0,
+            'rating': DEFAULT_RATING,
+        }
+        entries = list(
+            ContestLeaderboard.objects.filter(user_name=user_name).order_by('contest_date', 'id').select_for_update()
+        )
+        counts = questions_per_contest({entry.contest_id for entry in entries})
+        for entry in entries:
+            change = rating_change(
+                values['rating'], entry.solved_count, counts.get(entry.contest_id, QUESTIONS_PER_CONTEST),
+            )
+            values['total_marks'] += entry.marks
+            values['contests_attended'] += 1
+            values['questions_solved'] += entry.solved_count
+            values['rating'] += change
+            if entry.rating_change != change:
+                ContestLeaderboard.objects.filter(pk=entry.pk).update(rating_change=change)
+        StudentRating.objects.update_or_create(user_name=user_name, defaults=values)
+
+
+def rebuild(chunk_size=2000, progress=None):
+    """
+    Recomputes every StudentRating from the full leaderboard history.
+
+    Entries are streamed in contest order with .iterator(), so memory stays
+    bounded by the number of users rather than the number of entries.
+
+    Args:
+        chunk_size: Rows fetched and written per database round-trip.
+        progress: Optional callable receiving the number of entries processed.
+
+    Returns:
+        The number of entries processed.
+    """
+    totals = {}
+    changed = []
+    processed = 0
+
+    counts = questions_per_contest(Contest.objects.values_list('pk', flat=True))
+    with transaction.atomic():
+        entries = ContestLeaderboard.objects.order_by('contest_date', 'id').values(
+            'id', 'user_name', 'contest_id', 'marks', 'question1', 'question2', 'question3', 'rating_change'
+        )
+        for entry in entries.iterator(chunk_size=chunk_size):
+            user = totals.setdefault(entry['user_name'], {
+                'total_marks': 0,
+                'contests_attended': 0,
+                'questions_solved': 0,
+                'rating': DEFAULT_RATING,
+            })
+            solved = _solved(entry)
+            change = rating_change(user['rating'], solved, counts.get(entry['contest_id'], QUESTIONS_PER_CONTEST))
+            user['total_marks'] += entry['marks']
+            user['contests_attended'] += 1
+            user['questions_solved'] += solved
+            user['rating'] += change
+
+            if entry['rating_change'] != change:
+                changed.append(ContestLeaderboard(id=entry['id'], rating_change=change))
+            if len(changed) >= chunk_size:
+                ContestLeaderboard.objects.bulk_update(changed, ['rating_change'])
+                changed = []
+            processed += 1
+            if progress and processed % chunk_size == 0:
+                progress(processed)
+        ContestLeaderboard.objects.bulk_update(changed, ['rating_change'])
+
+        StudentRating.objects.all().delete()
+        StudentRating.objects.bulk_create(
+            (StudentRating(user_name=name, **values) for name, values in totals.items()),
+            batch_size=chunk_size,
+        )
+    return processed
@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Contest, ContestLeaderboard, ContestQuestion
+from . import contests
+from . import leaderboard
+from . import questions
+from . import ratings
+
+
+@receiver(post_save, sender=ContestLeaderboard)
+def leaderboard_row_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        ratings.entry_saved(instance, created)
+    transaction.on_commit(lambda: leaderboard.row_saved(instance))
+
+
+@receiver(post_delete, sender=ContestLeaderboard)
+def leaderboard_row_deleted(sender, instance, **kwargs):
+    ratings.entry_deleted(instance)
+    transaction.on_commit(lambda: leaderboard.row_deleted(instance))
+
+
+@receiver(post_save, sender=Contest)
+@receiver(post_delete, sender=Contest)
+def contest_changed(sender, instance, **kwargs):
+    contests.invalidate()
+    questions.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=ContestQuestion)
+@receiver(post_delete, sender=ContestQuestion)
+def contest_question_changed(sender, instance, **kwargs):
+    questions.invalidate(instance.contest_id)
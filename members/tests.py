@@ -1,3 +1,964 @@
-from django.test import TestCase
+import asyncio
+import json
+import queue
+import tempfile
+import threading
+import time
+from datetime import date, datetime, time as clock, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from bench.stub_leetcode import SUBMISSIONS, StubHandler, StubServer
+
+from .models import AcceptedSubmission, Contest, ContestLeaderboard, ContestQuestion, IsLogin, StudentRating, Students, VerificationJob
+from . import contests
+from . import cursors
+from . import events
+from . import fetch
+from . import identity
+from . import jobs
+from . import leaderboard
+from . import live
+from . import onboarding
+from . import questions
+from . import ratings
+from . import verify
+from . import views
+from . import writebehind
+
+CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'tests-{alias}'}
+    for alias in ('default', 'shared', 'sessions', 'cursors')
+}
+
+# Saved LeetCode profile pages (see bench/bench_profile_extract.py)
+FIXTURES = Path(__file__).resolve().parent.parent / 'bench' / 'fixtures'
+
+
+class FlakyServer(StubServer):
+    """A StubServer whose first `fail_first` requests fail with `error_status`."""
+
+    def __init__(self, fail_first=0, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_first = fail_first
+
+    def answer(self, payload):
+        status, answer = super().answer(payload)
+        if self.requests <= self.fail_first:
+            self.errors += 1
+            return self.error_status, {'errors': [{'message': 'Injected failure'}]}
+        return status, answer
+
+
+class ListServer(StubServer):
+    """Answers 200 with JSON that isn't an object."""
+
+    def answer(self, payload):
+        super().answer(payload)
+        return 200, ['not', 'an', 'answer']
+
+
+class ChallengeHandler(StubHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.answer({})
+        body = b'<html>Checking your browser</html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ChallengeServer(StubServer):
+    """Answers 200 with an HTML page instead of JSON, like a bot challenge."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.RequestHandlerClass = ChallengeHandler
+
+
+class ProfileHandler(StubHandler):
+    def do_GET(self):
+        body = self.server.page
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stops reading once it has the list
+            pass
+
+
+class ProfileServer(StubServer):
+    """Serves `page` as every user's profile page."""
+
+    def __init__(self, page, **kwargs):
+        super().__init__(**kwargs)
+        self.page = page
+        self.RequestHandlerClass = ProfileHandler
+
+
+@override_settings(
+    CACHES=CACHES,
+    LEADERBOARD_WRITE_BEHIND=False,
+    LEETCODE_RATE_LIMIT=1000,
+    LEETCODE_RATE_BURST=1000,
+    LEETCODE_MAX_RETRIES=2,
+    LEETCODE_BACKOFF_BASE=0.01,
+    LEETCODE_BACKOFF_MAX=0.05,
+    LEETCODE_BREAKER_THRESHOLD=3,
+    LEETCODE_BREAKER_COOLDOWN=0.2,
+)
+class MembersTestCase(TestCase):
+    """Starts every test with empty caches and none of the module-level state of earlier tests."""
+
+    def setUp(self):
+        for alias in CACHES:
+            caches[alias].clear()
+        fetch._policy = None
+        fetch._client = None
+        leaderboard._boards.clear()
+        leaderboard._staged.clear()
+        leaderboard._latest = None
+        leaderboard._synced_version = None
+        writebehind._pending.clear()
+        writebehind._accepted.clear()
+        writebehind._cursors.clear()
+        contests.invalidate()
+        # Flushes are run by the tests, not by the flusher thread
+        patcher = mock.patch.object(writebehind, '_flusher', object())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        if fetch._client is not None:
+            fetch._client.close()
+        fetch._client = None
+        fetch._policy = None
+
+    def serve(self, server):
+        """Starts `server` and points the LeetCode client at it for the test."""
+        server.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        settings = override_settings(LEETCODE_GRAPHQL_URL=server.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        return server
+
+
+def make_contest(name='Weekly 1', day=date(2026, 10, 18), **questions):
+    values = {
+        'question_1': 'Two Sum', 'question_1_link': 'https://leetcode.com/problems/two-sum/',
+        'question_2': 'Add Two Numbers', 'question_2_link': 'https://leetcode.com/problems/add-two-numbers/',
+        'question_3': 'Trapping Rain Water', 'question_3_link': 'https://leetcode.com/problems/trapping-rain-water/',
+    }
+    values.update(questions)
+    return Contest.objects.create(name=name, date=day, start_time=clock(20, 0), end_time=clock(21, 30), **values)
+
+
+def submission(slug, timestamp, status='Accepted'):
+    return {'statusDisplay': status, 'title': slug, 'titleSlug': slug, 'timestamp': str(timestamp)}
+
+
+class UpstreamPolicyTests(MembersTestCase):
+    def test_failed_calls_are_retried_with_backoff(self):
+        stub = self.serve(FlakyServer(fail_first=2, error_status=503))
+        with mock.patch('members.fetch.time.sleep') as sleep:
+            submissions = fetch.get_latest_submissions('alice')
+
+        self.assertEqual(submissions, SUBMISSIONS)
+        self.assertEqual(stub.requests, 3)
+        delays = [call.args[0] for call in sleep.call_args_list if call.args[0]]
+        self.assertEqual(len(delays), 2)
+        self.assertLessEqual(delays[0], 0.01)
+        self.assertLessEqual(delays[1], 0.02)
+
+    def test_async_client_keeps_policy_cache_calls_off_the_event_loop(self):
+        stub = self.serve(FlakyServer(fail_first=1, error_status=503))
+        policy = fetch.get_policy()
+        threads = []
+        admit = policy.admit
+
+        def recording_admit():
+            threads.append(threading.get_ident())
+            return admit()
+
+        async def fetch_submissions():
+            try:
+                return threading.get_ident(), await fetch.aget_latest_submissions('alice')
+            finally:
+                await fetch.aclose_client()
+
+        with mock.patch.object(policy, 'admit', recording_admit):
+            loop_thread, submissions = asyncio.run(fetch_submissions())
+
+        self.assertEqual(submissions, SUBMISSIONS)
+        self.assertEqual(stub.requests, 2)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_gives_up_after_max_retries(self):
+        stub = self.serve(StubServer(error_rate=1))
+        with mock.patch('members.fetch.time.sleep'), self.assertLogs('members.fetch', 'WARNING'):
+            self.assertIsNone(fetch.get_latest_submissions('alice'))
+        self.assertEqual(stub.requests, 3)
+
+    def test_retry_after_is_honored(self):
+        stub = self.serve(FlakyServer(fail_first=1, error_status=429, retry_after=3))
+        with mock.patch('members.fetch.time.sleep') as sleep:
+            submissions = fetch.get_latest_submissions('alice')
+
+        self.assertEqual(submissions, SUBMISSIONS)
+        self.assertEqual(stub.requests, 2)
+        sleep.assert_any_call(3.0)
+
+    def test_retry_after_longer_than_max_wait_gives_up(self):
+        stub = self.serve(StubServer(error_rate=1, error_status=429, retry_after=60))
+        with mock.patch('members.fetch.time.sleep'), self.assertLogs('members.fetch', 'WARNING'):
+            self.assertIsNone(fetch.get_latest_submissions('alice'))
+        self.assertEqual(stub.requests, 1)
+
+    def test_breaker_opens_and_recovers(self):
+        stub = self.serve(StubServer(error_rate=1))
+        with self.assertLogs('members.fetch', 'WARNING'):
+            self.assertIsNone(fetch.get_latest_submissions('alice'))
+        self.assertEqual(stub.requests, 3)
+
+        # Open: LeetCode isn't called at all
+        with self.assertLogs('members.fetch', 'WARNING') as logs:
+            self.assertIsNone(fetch.get_latest_submissions('alice'))
+        self.assertEqual(stub.requests, 3)
+        self.assertIn('not calling it for now', logs.output[0])
+
+        stub.error_rate = 0
+        time.sleep(0.25)
+        self.assertEqual(fetch.get_latest_submissions('alice'), SUBMISSIONS)
+        self.assertEqual(stub.requests, 4)
+        self.assertTrue(fetch.get_policy().breaker.allow())
+        self.assertIsNone(caches['default'].get('leetcode:circuit'))
+
+    def test_answer_that_isnt_graphql_counts_as_a_failure(self):
+        self.serve(ChallengeServer())
+        with self.assertLogs('members.fetch', 'WARNING'):
+            for _ in range(3):
+                self.assertIsNone(fetch.get_latest_submissions('alice'))
+        self.assertFalse(fetch.get_policy().breaker.allow())
+
+    def test_batch_answers_every_user(self):
+        stub = self.serve(StubServer())
+        answers = fetch.get_latest_submissions_batch(['alice', 'bob', 'carol'], batch_size=2)
+        self.assertEqual(answers, {'alice': SUBMISSIONS, 'bob': SUBMISSIONS, 'carol': SUBMISSIONS})
+        self.assertEqual(stub.requests, 2)
+
+    def test_batch_answer_that_isnt_an_object_fails_the_batch(self):
+        self.serve(ListServer())
+        with self.assertLogs('members.fetch', 'WARNING'):
+            answers = fetch.get_latest_submissions_batch(['alice', 'bob'])
+        self.assertEqual(answers, {'alice': None, 'bob': None})
+
+
+class SubmissionCacheTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(fetch._cache_stats, {'hits': 0, 'misses': 0, 'coalesced': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_misses_share_one_request(self):
+        stub = self.serve(StubServer(latency_ms=200))
+        barrier = threading.Barrier(5)
+        results = []
+
+        def verify_click():
+            barrier.wait()
+            results.append(fetch.get_cached_submissions('alice'))
+
+        threads = [threading.Thread(target=verify_click) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [SUBMISSIONS] * 5)
+        self.assertEqual(stub.requests, 1)
+        self.assertEqual(fetch.submission_cache_stats(), {'hits': 0, 'misses': 1, 'coalesced': 4})
+
+        self.assertEqual(fetch.get_cached_submissions('alice'), SUBMISSIONS)
+        self.assertEqual(stub.requests, 1)
+        self.assertEqual(fetch.submission_cache_stats()['hits'], 1)
+
+    def test_failed_request_is_not_cached(self):
+        self.serve(StubServer())
+        with mock.patch.object(fetch, 'get_latest_submissions', return_value=None):
+            self.assertIsNone(fetch.get_cached_submissions('alice'))
+        self.assertEqual(fetch.get_cached_submissions('alice'), SUBMISSIONS)
+        self.assertEqual(fetch.submission_cache_stats(), {'hits': 0, 'misses': 2, 'coalesced': 0})
+
+
+def fixture(name):
+    return (FIXTURES / name).read_bytes()
+
+
+class ProfileScannerTests(MembersTestCase):
+    def scan(self, text, chunk_size):
+        scanner = fetch.SubmissionListScanner()
+        for start in range(0, len(text), chunk_size):
+            submissions = scanner.feed(text[start:start + chunk_size])
+            if submissions is not None:
+                return submissions
+        return None
+
+    def test_list_split_across_pieces_is_found(self):
+        for name in ('profile_next_data.html', 'profile_flight.html'):
+            text = fixture(name).decode()
+            whole = self.scan(text, len(text))
+            self.assertEqual(whole[0]['title'], 'Merge k Sorted Lists')
+            for chunk_size in (3, 64, 4096):
+                with self.subTest(name, chunk_size=chunk_size):
+                    self.assertEqual(self.scan(text, chunk_size), whole)
+
+    def test_private_profile_has_no_list(self):
+        self.assertIsNone(self.scan(fixture('profile_private.html').decode(), 4096))
+
+    def test_profile_is_read_until_the_list(self):
+        page = fixture('profile_next_data.html')
+        stub = self.serve(ProfileServer(page))
+        with self.settings(LEETCODE_PROFILE_URL=stub.url.replace('/graphql', '/{username}/')):
+            submissions = fetch.get_submissions_from_profile('alice', limit=2)
+        self.assertEqual(len(submissions), 2)
+        self.assertEqual(submissions[0]['titleSlug'], 'merge-k-sorted-lists')
+
+    def test_private_profile_gives_up_at_the_byte_cap(self):
+        page = fixture('profile_private.html')
+        stub = self.serve(ProfileServer(page))
+        with self.settings(LEETCODE_PROFILE_URL=stub.url.replace('/graphql', '/{username}/')):
+            with self.assertLogs('members.fetch', 'INFO'):
+                self.assertIsNone(fetch.get_submissions_from_profile('alice', max_bytes=64 * 1024))
+
+
+class ReverifyContestTests(MembersTestCase):
+    def test_registered_students_without_an_entry_are_verified(self):
+        self.serve(StubServer())
+        contest = make_contest()
+        IsLogin.objects.create(email='alice@example.com', leetcode_username='alice')
+        ContestLeaderboard.objects.create(
+            contest=contest, contest_name=contest.name, user_name='bob', contest_date=contest.date,
+        )
+        out = StringIO()
+        call_command('reverify_contest', contest=contest.name, stdout=out)
+
+        self.assertIn('Re-verified 2 participant(s)', out.getvalue())
+        self.assertEqual(
+            set(ContestLeaderboard.objects.values_list('user_name', 'marks')), {('alice', 100), ('bob', 100)},
+        )
+
+
+class ScoringTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.contest = make_contest()
+        start, _ = contests.contest_window(self.contest)
+        self.start = int(start.timestamp())
+
+    def test_first_accept_of_each_question_is_scored(self):
+        result, solved = verify.score_submissions(self.contest, [
+            submission('two-sum', self.start + 600),
+            submission('two-sum', self.start + 60),
+            submission('add-two-numbers', self.start + 120, status='Wrong Answer'),
+            submission('trapping-rain-water', self.start + 300),
+            submission('n-queens', self.start + 30),
+        ])
+        self.assertEqual(result, {
+            'marks': 200, 'question1': True, 'question2': False, 'question3': True, 'penalty': 360,
+        })
+        self.assertEqual([question['slug'] for question in solved], ['two-sum', 'trapping-rain-water'])
+
+    def test_first_solve_tiebreak(self):
+        with self.settings(LEADERBOARD_TIEBREAK='first_solve'):
+            result, _ = events.score(self.contest, {'two-sum': self.start + 60, 'add-two-numbers': self.start + 300})
+        self.assertEqual(result['penalty'], 300)
+
+    def test_solve_without_a_time_counts_as_the_end(self):
+        result, _ = events.score(self.contest, {'two-sum': None})
+        self.assertEqual(result['penalty'], 90 * 60)
+
+    def test_blank_question_keeps_the_slots_after_it(self):
+        contest = make_contest('Weekly 2', question_1='', question_1_link='')
+        result, _ = verify.score_submissions(contest, [submission('add-two-numbers', self.start)])
+        self.assertEqual((result['question1'], result['question2']), (False, True))
+
+    def test_questions_are_numbered_by_their_order(self):
+        contest = make_contest('Weekly 3')
+        ContestQuestion.objects.create(contest=contest, slug='n-queens', points=300, order=3)
+        ContestQuestion.objects.create(contest=contest, slug='two-sum', points=100, order=1)
+        result, _ = verify.score_submissions(contest, [submission('n-queens', self.start)])
+        self.assertEqual(result['marks'], 300)
+        self.assertTrue(result['question3'])
+
+    def test_questions_without_an_order_take_free_slots(self):
+        contest = make_contest('Weekly 4')
+        ContestQuestion.objects.create(contest=contest, slug='two-sum', order=1)
+        ContestQuestion.objects.create(contest=contest, slug='n-queens', order=0)
+        ContestQuestion.objects.create(contest=contest, slug='trapping-rain-water', order=0)
+        numbers = {slug: question['number'] for slug, question in questions.contest_questions(contest).items()}
+        self.assertEqual(numbers, {'two-sum': 1, 'n-queens': 2, 'trapping-rain-water': 3})
+
+
+class CursorTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.contest = make_contest()
+        start, _ = contests.contest_window(self.contest)
+        self.start = int(start.timestamp())
+
+    def test_only_unseen_submissions_are_read(self):
+        cursor = cursors.Cursor()
+        first = [submission('two-sum', self.start + 60)]
+        verify.score_submissions(self.contest, first, cursor)
+        self.assertEqual(cursor.timestamp, self.start + 60)
+
+        later = [submission('add-two-numbers', self.start + 120), *first]
+        self.assertEqual(cursor.unseen(later), later[:1])
+        result, _ = verify.score_submissions(self.contest, later, cursor)
+        self.assertEqual(result['marks'], 200)
+        self.assertEqual(result['penalty'], 180)
+
+    def test_solves_pushed_out_of_the_window_are_kept(self):
+        cursor = cursors.Cursor()
+        verify.score_submissions(self.contest, [submission('two-sum', self.start + 60)], cursor)
+        noise = [submission('n-queens', self.start + 100 + i, status='Wrong Answer') for i in range(10)]
+        result, _ = verify.score_submissions(self.contest, noise, cursor)
+        self.assertTrue(result['question1'])
+
+    def test_window_widens_while_it_is_all_unseen(self):
+        cursor = cursors.Cursor()
+        full = [submission('n-queens', self.start + 60 + i) for i in range(10)]
+        self.assertEqual(cursors.wider_limit(self.contest, cursor, full, 10), 20)
+        self.assertIsNone(cursors.wider_limit(self.contest, cursor, full[:5], 10))
+        cursor.timestamp = self.start + 60
+        self.assertIsNone(cursors.wider_limit(self.contest, cursor, full, 10))
+
+    def test_missing_cursor_starts_from_the_leaderboard_and_events(self):
+        ContestLeaderboard.objects.create(
+            contest=self.contest, contest_name=self.contest.name, user_name='alice',
+            contest_date=self.contest.date, marks=100, question1=True,
+        )
+        AcceptedSubmission.objects.create(
+            contest=self.contest, user_name='alice', slug='add-two-numbers', timestamp=self.start + 90,
+        )
+        cursor = cursors.load(self.contest, 'alice')
+        self.assertEqual(cursor.timestamp, 0)
+        self.assertEqual(cursor.solved, {'two-sum': None, 'add-two-numbers': self.start + 90})
+
+    def test_verify_saves_the_cursor(self):
+        self.serve(StubServer())
+        result = verify.verify_user(self.contest, 'alice')
+
+        self.assertEqual(result['marks'], 100)
+        self.assertTrue(ContestLeaderboard.objects.filter(user_name='alice', marks=100).exists())
+        cursor = cursors.load(self.contest, 'alice')
+        self.assertEqual(cursor.timestamp, int(SUBMISSIONS[0]['timestamp']))
+        self.assertIn('two-sum', cursor.solved)
+        self.assertEqual(len(caches['cursors']._cache), 1)
+
+
+class LeaderboardTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.morning = make_contest('Morning')
+        self.evening = make_contest('Evening')
+        self.result = {'marks': 100, 'question1': True, 'question2': False, 'question3': False, 'penalty': 60}
+
+    def test_contests_on_the_same_day_have_their_own_boards(self):
+        verify.record_result(self.morning, 'alice', self.result)
+        verify.record_result(self.evening, 'bob', self.result)
+
+        self.assertEqual(list(leaderboard.get_board(self.morning.pk).by_user), ['alice'])
+        self.assertEqual(list(leaderboard.get_board(self.evening.pk).by_user), ['bob'])
+        self.assertEqual(leaderboard.latest_board().contest_id, self.evening.pk)
+
+        page = self.client.get('/api/leaderboard/', {'contest': self.morning.pk}).json()
+        self.assertEqual((page['contest_id'], page['contest_name']), (self.morning.pk, 'Morning'))
+
+    def test_saved_rows_are_applied_to_the_loaded_board(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            verify.record_result(self.morning, 'alice', self.result)
+        board = leaderboard.get_board(self.morning.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            verify.record_result(self.morning, 'bob', dict(self.result, marks=200, question2=True))
+        with self.assertNumQueries(0):
+            self.assertIs(leaderboard.get_board(self.morning.pk), board)
+        self.assertEqual([row['user_name'] for row in board.rows], ['bob', 'alice'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ContestLeaderboard.objects.get(user_name='bob').delete()
+        self.assertEqual(list(board.by_user), ['alice'])
+
+    def test_write_from_another_process_drops_the_boards(self):
+        verify.record_result(self.morning, 'alice', self.result)
+        board = leaderboard.get_board(self.morning.pk)
+        leaderboard._cache().set(leaderboard.VERSION_KEY, 42)
+        self.assertIsNot(leaderboard.get_board(self.morning.pk), board)
+
+
+class LeaderboardApiTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        contest = make_contest()
+        for number, (user_name, marks, penalty) in enumerate(
+            [('alice', 300, 900), ('bob', 300, 600), ('carol', 200, 0), ('dave', 100, 0), ('erin', 0, 0)]
+        ):
+            ContestLeaderboard.objects.create(
+                contest=contest, contest_name=contest.name, contest_date=contest.date,
+                user_name=user_name, marks=marks, penalty=penalty,
+            )
+
+    def test_pages_are_chained_with_the_next_cursor(self):
+        first = self.client.get('/api/leaderboard/', {'limit': 2}).json()
+        self.assertEqual(first['total'], 5)
+        self.assertEqual([(entry['rank'], entry['user_name']) for entry in first['entries']], [(1, 'bob'), (2, 'alice')])
+
+        second = self.client.get('/api/leaderboard/', {'limit': 2, 'after': first['next']}).json()
+        self.assertEqual([(entry['rank'], entry['user_name']) for entry in second['entries']], [(3, 'carol'), (4, 'dave')])
+
+        last = self.client.get('/api/leaderboard/', {'limit': 2, 'after': second['next']}).json()
+        self.assertEqual([entry['user_name'] for entry in last['entries']], ['erin'])
+        self.assertIsNone(last['next'])
+
+    def test_bad_cursor_is_rejected(self):
+        for params in ({'after': 'abc'}, {'limit': 'ten'}):
+            self.assertEqual(self.client.get('/api/leaderboard/', params).status_code, 400)
+
+    def test_unchanged_board_is_not_sent_again(self):
+        response = self.client.get('/api/leaderboard/')
+        self.assertEqual(response.status_code, 200)
+
+        again = self.client.get('/api/leaderboard/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        again = self.client.get('/api/leaderboard/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ContestLeaderboard.objects.filter(user_name='erin').get().delete()
+        changed = self.client.get('/api/leaderboard/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['total'], 4)
+
+    def test_contest_without_entries_has_an_empty_board(self):
+        page = self.client.get('/api/leaderboard/', {'contest': 999}).json()
+        self.assertEqual((page['total'], page['entries'], page['next']), (0, [], None))
+
+
+class LiveStreamTests(MembersTestCase):
+    def test_subscriber_that_falls_behind_gets_one_resync(self):
+        async def receive():
+            subscription = live.subscribe()
+            try:
+                for number in range(3):
+                    live.publish({'type': 'row', 'number': number})
+                await asyncio.sleep(0)
+                return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            finally:
+                live.unsubscribe(subscription)
+
+        with self.settings(LIVE_STREAM_QUEUE_SIZE=2):
+            self.assertEqual(asyncio.run(receive()), [live.RESYNC])
+
+    @override_settings(LIVE_STREAM_KEEPALIVE_SECONDS=0.05)
+    def test_stream_sends_changed_rows_and_resyncs(self):
+        request = RequestFactory().get('/api/leaderboard/stream/')
+
+        async def stream():
+            response = await views.leaderboard_stream(request)
+            chunks = response.streaming_content
+
+            async def next_event():
+                async for chunk in chunks:
+                    if not chunk.startswith(b':'):
+                        return chunk.decode()
+
+            received = [await next_event()]
+            # Writes in this process are published from the thread that made them
+            event = {'type': 'row', 'contest_id': 1, 'rank': 1, 'entry': {'user_name': 'alice'}}
+            await asyncio.to_thread(live.publish, event)
+            received.append(await next_event())
+            # Writes in other processes only move the shared version
+            leaderboard._cache().set(leaderboard.VERSION_KEY, 42)
+            received.append(await next_event())
+            return received
+
+        first, row, resync = asyncio.run(stream())
+        self.assertEqual(first, 'retry: 3000\n\n')
+        self.assertTrue(row.startswith('event: row\ndata: '))
+        self.assertEqual(json.loads(row.split('data: ', 1)[1])['entry'], {'user_name': 'alice'})
+        self.assertTrue(resync.startswith('event: resync\n'))
+        self.assertEqual(live.subscriber_count(), 0)
+
+
+class HomePageTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        contest = make_contest(day=date(2026, 10, 11))
+        ContestLeaderboard.objects.create(
+            contest=contest, contest_name=contest.name, contest_date=contest.date,
+            user_name='alice', marks=100, question1=True,
+        )
+        self.log_in('bob')
+
+    def log_in(self, username):
+        session = self.client.session
+        session[identity.SESSION_KEY] = {'id': 1, 'email': f'{username}@example.com', 'leetcode_username': username}
+        session.save()
+
+    def test_unchanged_home_is_a_304(self):
+        response = self.client.get('/home/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'alice')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        again = self.client.get('/home/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = ContestLeaderboard.objects.get(user_name='alice')
+            entry.marks = 200
+            entry.save()
+        changed = self.client.get('/home/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, '"marks": 200')
+
+    def test_home_etag_depends_on_the_user(self):
+        etag = self.client.get('/home/')['ETag']
+        self.log_in('carol')
+        self.assertEqual(self.client.get('/home/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class RatingTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.contest = make_contest()
+
+    def record(self, contest, username, *flags):
+        result = dict(zip(('question1', 'question2', 'question3'), flags + (False,) * (3 - len(flags))))
+        result.update(marks=100 * sum(flags), penalty=0)
+        return verify.record_result(contest, username, result)
+
+    def test_entries_move_the_rating(self):
+        self.record(self.contest, 'alice', True, True, True)
+        self.record(self.contest, 'bob', True)
+        self.assertEqual(StudentRating.objects.get(user_name='alice').rating, ratings.DEFAULT_RATING + 16)
+        self.assertAlmostEqual(StudentRating.objects.get(user_name='bob').rating, ratings.DEFAULT_RATING - 16 / 3)
+
+    def test_rerecorded_entry_swaps_its_change(self):
+        self.record(self.contest, 'alice', True)
+        self.record(self.contest, 'alice', True, True, True)
+        rating = StudentRating.objects.get(user_name='alice')
+        self.assertEqual((rating.rating, rating.contests_attended, rating.questions_solved), (1516, 1, 3))
+
+    def test_full_solve_of_a_shorter_contest_is_a_win(self):
+        contest = make_contest('Weekly 2', question_3='', question_3_link='')
+        self.record(contest, 'alice', True, True)
+        self.assertEqual(StudentRating.objects.get(user_name='alice').rating, ratings.DEFAULT_RATING + 16)
+
+    def test_rebuild_matches_the_incremental_ratings(self):
+        later = make_contest('Weekly 2', day=date(2026, 10, 25), question_3='', question_3_link='')
+        self.record(self.contest, 'alice', True, True)
+        self.record(self.contest, 'bob', True, True, True)
+        self.record(later, 'alice', True)
+        self.record(later, 'bob', True, True)
+        incremental = list(StudentRating.objects.order_by('user_name').values(
+            'user_name', 'total_marks', 'contests_attended', 'questions_solved', 'rating',
+        ))
+
+        StudentRating.objects.all().delete()
+        ratings.rebuild()
+        self.assertEqual(list(StudentRating.objects.order_by('user_name').values(*incremental[0])), incremental)
+
+
+@override_settings(LEADERBOARD_WRITE_BEHIND=True, LEADERBOARD_FLUSH_SIZE=1000)
+class WriteBehindTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.contest = make_contest()
+        self.result = {'marks': 100, 'question1': True, 'question2': False, 'question3': False, 'penalty': 60}
+
+    def entry(self, **values):
+        return ContestLeaderboard.objects.create(
+            contest=self.contest, contest_name=self.contest.name, user_name='alice',
+            contest_date=self.contest.date, **values,
+        )
+
+    def test_result_is_staged_until_flushed(self):
+        writebehind.submit(self.contest, 'alice', self.result)
+
+        self.assertFalse(ContestLeaderboard.objects.exists())
+        row = leaderboard.get_board(self.contest.pk).by_user['alice']
+        self.assertEqual(row['marks'], 100)
+
+        self.assertEqual(writebehind.flush(), 1)
+        self.assertEqual(ContestLeaderboard.objects.get(user_name='alice').marks, 100)
+        self.assertEqual(leaderboard._staged, {})
+        self.assertEqual(writebehind.pending_count(), 0)
+
+    def test_record_result_is_buffered(self):
+        self.assertIsNone(verify.record_result(self.contest, 'alice', self.result))
+        self.assertIsNone(verify.record_result(self.contest, 'bob', {'marks': 0, 'question1': False}))
+        self.assertEqual(writebehind.pending_count(), 2)
+
+        self.assertEqual(writebehind.flush(), 2)
+        self.assertEqual(
+            set(ContestLeaderboard.objects.values_list('user_name', 'marks', 'penalty')),
+            {('alice', 100, 60), ('bob', 0, 0)},
+        )
+
+    def test_newest_result_of_a_user_wins(self):
+        writebehind.submit(self.contest, 'alice', self.result)
+        writebehind.submit(self.contest, 'alice', dict(self.result, marks=200, question2=True))
+        self.assertEqual(writebehind.flush(), 1)
+        self.assertEqual(ContestLeaderboard.objects.get(user_name='alice').marks, 200)
+
+    def test_unchanged_result_drops_its_staged_row(self):
+        self.entry(**self.result)
+        writebehind.submit(self.contest, 'alice', self.result)
+        self.assertEqual(writebehind.flush(), 0)
+        self.assertEqual(leaderboard._staged, {})
+
+        # A later write isn't hidden behind a stale staged row
+        entry = ContestLeaderboard.objects.get(user_name='alice')
+        entry.marks = 300
+        entry.save()
+        self.assertEqual(leaderboard.get_board(self.contest.pk).by_user['alice']['marks'], 300)
+
+    def test_cursor_is_saved_after_its_events(self):
+        start, _ = contests.contest_window(self.contest)
+        submissions = [submission('two-sum', int(start.timestamp()) + 60)]
+        verify.record_submissions(self.contest, 'alice', submissions, cursors.load(self.contest, 'alice'))
+        self.assertEqual(cursors.load(self.contest, 'alice').timestamp, 0)
+
+        writebehind.flush()
+        self.assertTrue(AcceptedSubmission.objects.filter(user_name='alice', slug='two-sum').exists())
+        self.assertEqual(cursors.load(self.contest, 'alice').timestamp, int(start.timestamp()) + 60)
+
+    def test_events_lost_with_the_buffer_are_read_again(self):
+        start, _ = contests.contest_window(self.contest)
+        submissions = [submission('two-sum', int(start.timestamp()) + 60)]
+        verify.record_submissions(self.contest, 'alice', submissions, cursors.load(self.contest, 'alice'))
+        # The process dies before the flush
+        writebehind._pending.clear()
+        writebehind._accepted.clear()
+        writebehind._cursors.clear()
+
+        verify.record_submissions(self.contest, 'alice', submissions, cursors.load(self.contest, 'alice'))
+        writebehind.flush()
+        self.assertTrue(AcceptedSubmission.objects.filter(user_name='alice', slug='two-sum').exists())
+        self.assertEqual(ContestLeaderboard.objects.get(user_name='alice').marks, 100)
+
+    def test_poll_contest_writes_before_reporting(self):
+        self.serve(StubServer())
+        IsLogin.objects.create(email='alice@example.com', leetcode_username='alice')
+        IsLogin.objects.create(email='bob@example.com', leetcode_username='bob')
+        out = StringIO()
+        call_command('poll_contest', contest=self.contest.name, once=True, stdout=out)
+
+        self.assertIn('2 entries written', out.getvalue())
+        self.assertEqual(
+            set(ContestLeaderboard.objects.values_list('user_name', 'marks')), {('alice', 100), ('bob', 100)},
+        )
+        self.assertEqual(writebehind.pending_count(), 0)
+
+        # Nothing changed: nothing is written again
+        out = StringIO()
+        call_command('poll_contest', contest=self.contest.name, once=True, stdout=out)
+        self.assertIn('0 entries written', out.getvalue())
+
+
+class CurrentContestTests(MembersTestCase):
+    def at(self, day, hour, minute=0):
+        return contests.IST.localize(datetime.combine(day, clock(hour, minute)))
+
+    def test_contest_past_midnight_stays_current_until_it_ends(self):
+        late = Contest.objects.create(name='Late', date=date(2026, 10, 17), start_time=clock(23, 0), end_time=clock(1, 0))
+        today = make_contest('Evening', day=date(2026, 10, 18))
+
+        self.assertEqual(contests.current_contest(self.at(date(2026, 10, 18), 0, 30)).contest, late)
+        contests.invalidate()
+        self.assertEqual(contests.current_contest(self.at(date(2026, 10, 18), 1, 30)).contest, today)
+
+
+class JobTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.contest = make_contest()
+        self.queue = queue.Queue(maxsize=2)
+        for patcher in (
+            mock.patch.object(jobs, '_queue', self.queue),
+            mock.patch.object(jobs, '_ensure_workers'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_pending_job_is_reused(self):
+        job = jobs.enqueue(self.contest, 'alice')
+        self.assertEqual(jobs.enqueue(self.contest, 'alice'), job)
+        self.assertEqual(self.queue.qsize(), 1)
+
+        VerificationJob.objects.filter(pk=job.pk).update(created_at=job.created_at - timedelta(minutes=5))
+        self.assertNotEqual(jobs.enqueue(self.contest, 'alice'), job)
+
+    def test_full_queue_fails_the_job(self):
+        for username in ('alice', 'bob'):
+            jobs.enqueue(self.contest, username)
+        job = jobs.enqueue(self.contest, 'carol')
+        self.assertEqual(job.status, VerificationJob.FAILED)
+
+    def test_job_is_run_once(self):
+        job = jobs.enqueue(self.contest, 'alice')
+        result = {'marks': 100, 'question1': True, 'question2': False, 'question3': False, 'penalty': 0}
+        with mock.patch.object(verify, 'verify_user', return_value=result) as verify_user:
+            jobs.run_job(job.pk)
+            jobs.run_job(job.pk)
+
+        verify_user.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.marks, job.question1), (VerificationJob.DONE, 100, True))
+
+    def test_failed_verify_fails_the_job(self):
+        job = jobs.enqueue(self.contest, 'alice')
+        failing = mock.patch.object(verify, 'verify_user', side_effect=verify.VerificationError)
+        with failing, self.assertLogs('members.jobs', 'ERROR'):
+            jobs.run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, VerificationJob.FAILED)
+        self.assertTrue(job.error)
+
+
+class LoginTests(MembersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = Students.objects.create(
+            first_name='Alice', last_name='Smith', email='alice@example.com', password='secret',
+        )
+
+    def log_in(self, password='secret', leetcode_id='alice_lc'):
+        return self.client.post('/login/', {
+            'email': 'alice@example.com', 'password': password, 'LeetcodeID': leetcode_id,
+        })
+
+    def test_login_keeps_the_student_in_the_session(self):
+        session = self.client.session
+        session['visited'] = True
+        session.save()
+        anonymous_key = session.session_key
+
+        self.assertRedirects(self.log_in(), '/home/', fetch_redirect_response=False)
+        self.assertNotEqual(self.client.session.session_key, anonymous_key)
+        self.assertEqual(self.client.session[identity.SESSION_KEY], {
+            'id': self.student.pk, 'email': 'alice@example.com', 'leetcode_username': 'alice_lc',
+        })
+
+    def test_login_upserts_is_login(self):
+        self.log_in()
+        self.log_in(leetcode_id='alice_new')
+        row = IsLogin.objects.get()
+        self.assertEqual((row.email, row.is_logged_in, row.leetcode_username), ('alice@example.com', True, 'alice_new'))
+
+    def test_failed_login_keeps_the_session_anonymous(self):
+        for response in (self.log_in(password='wrong'), self.log_in(leetcode_id='')):
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('error', response.context)
+        self.assertNotIn(identity.SESSION_KEY, self.client.session)
+        self.assertFalse(IsLogin.objects.exists())
+
+
+class ImportStudentsTests(MembersTestCase):
+    CSV = (
+        'first_name,last_name,email,password,leetcode_username\n'
+        'Alice,Smith,alice@example.com,pw1,alice_lc\n'
+        'Bob,,bob@example.com,pw2,\n'
+        'Carol,Jones,carol@example.com,pw3,carol_lc\n'
+        'Alice,Again,alice@example.com,pw4,alice_2\n'
+        'Dave,,not-an-email,pw5,dave_lc\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        Students.objects.create(first_name='Carol', last_name='Jones', email='carol@example.com', password='old')
+
+    def write(self, text, suffix):
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        with handle:
+            handle.write(text)
+        self.addCleanup(Path(handle.name).unlink)
+        return handle.name
+
+    def test_rows_are_imported_in_chunks(self):
+        out, err = StringIO(), StringIO()
+        call_command('import_students', self.write(self.CSV, '.csv'), chunk_size=2, stdout=out, stderr=err)
+
+        self.assertIn('5 row(s): 2 created, 1 already registered, 1 repeated in the file, 1 invalid', out.getvalue())
+        self.assertIn('Line 6: Invalid email address', err.getvalue())
+        self.assertEqual(Students.objects.get(email='alice@example.com').last_name, 'Smith')
+        self.assertEqual(Students.objects.get(email='carol@example.com').password, 'old')
+        self.assertEqual(
+            dict(IsLogin.objects.values_list('email', 'leetcode_username')),
+            {'alice@example.com': 'alice_lc', 'bob@example.com': ''},
+        )
+
+    def test_dry_run_reports_every_chunk_and_writes_nothing(self):
+        rows = onboarding.read_rows(StringIO(self.CSV), 'csv')
+        progress = mock.Mock()
+        report = onboarding.import_students(rows, chunk_size=2, dry_run=True, progress=progress)
+        self.assertEqual(progress.call_count, 3)
+        self.assertEqual((report.created, report.existing, report.duplicates), (2, 1, 1))
+        self.assertEqual(Students.objects.count(), 1)
+
+    def test_jsonl_line_that_isnt_an_object_is_invalid(self):
+        path = self.write(
+            '{"first_name": "Erin", "email": "erin@example.com", "password": "pw"}\n[1, 2]\n', '.jsonl'
+        )
+        out = StringIO()
+        call_command('import_students', path, stdout=out, stderr=StringIO())
+        self.assertIn('1 created', out.getvalue())
+        self.assertIn('1 invalid', out.getvalue())
+
+
+class VerifyStatusTests(MembersTestCase):
+    def test_only_the_owner_sees_a_job(self):
+        job = VerificationJob.objects.create(contest=make_contest(), user_name='alice')
+        self.assertEqual(self.client.get(f'/verify/{job.pk}/').status_code, 404)
+
+        session = self.client.session
+        session[identity.SESSION_KEY] = {'id': 1, 'email': 'bob@example.com', 'leetcode_username': 'bob'}
+        session.save()
+        self.assertEqual(self.client.get(f'/verify/{job.pk}/').status_code, 404)
+
+        session[identity.SESSION_KEY] = {'id': 2, 'email': 'alice@example.com', 'leetcode_username': 'alice'}
+        session.save()
+        response = self.client.get(f'/verify/{job.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], VerificationJob.QUEUED)
+
+
+class MetricsTests(MembersTestCase):
+    def test_metrics_need_to_be_enabled_and_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with self.settings(METRICS_ENABLED=True, METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with self.settings(METRICS_ENABLED=True, METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
@@ -6,4 +6,11 @@ urlpatterns = [
     path('register/',views.register,name='register'),
     path('login/',views.login,name='login'),
     path('home/',views.home,name='home'),
+    path('verify/now/',views.verify_now,name='verify_now'),
+    path('verify/<int:job_id>/',views.verify_status,name='verify_status'),
+    path('api/leaderboard/',views.leaderboard_api,name='leaderboard_api'),
+    path('api/leaderboard/stream/',views.leaderboard_stream,name='leaderboard_stream'),
+    path('api/ratings/',views.ratings_api,name='ratings_api'),
+    path('stats/leetcode-cache/',views.fetch_cache_stats,name='fetch_cache_stats'),
+    path('metrics',views.metrics_view,name='metrics'),
 ]
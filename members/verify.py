@@ -0,0 +1,214 @@
+from asgiref.sync import sync_to_async
+
+from .models import ContestLeaderboard, QuestionSolve
+from . import cursors
+from . import db
+from . import events
+from . import fetch
+from . import writebehind
+
+# How many recent submissions are fetched on every verification. The window
+# grows (up to cursors.MAX_SUBMISSIONS_TO_CHECK) when all of it is unseen.
+SUBMISSIONS_TO_CHECK = 10
+
+
+class VerificationError(Exception):
+    """Raised when a participant's submissions could not be fetched."""
+
+
+def score_submissions(contest, submissions, cursor=None):
+    """
+    Scores a participant's submissions against the questions of a contest.
+
+    Args:
+        contest: The Contest being verified.
+        submissions: The user's recent submission dictionaries.
+        cursor: The user's cursors.Cursor for the contest, if any. Only the
+            submissions newer than it are read, the questions it holds count
+            as solved, and it is moved past `submissions`.
+
+    Returns:
+        A (result, solved) tuple: result is a dict with the total 'marks', the
+        'question1'..'question3' flags and the tie-break 'penalty' (see
+        events.tiebreak), ready to be used as ContestLeaderboard defaults;
+        solved lists the matched questions (see questions.contest_questions).
+    """
+    if cursor is None:
+        solve_times = events.first_accepts(events.accepted(contest, submissions))
+    else:
+        solve_times = events.first_accepts(events.accepted(contest, cursor.unseen(submissions)), cursor.solved)
+    result, solved = events.score(contest, solve_times)
+    if cursor is not None:
+        cursor.advance(submissions, solved, solve_times)
+    return result, solved
+
+
+# record_submissions' default: the caller doesn't track the previous result
+_UNTRACKED = object()
+
+
+def is_new_result(result, previous):
+    """
+    Whether `result` needs writing over the `previous` one (None if the user
+    isn't on the board). Users who solved nothing stay off the board.
+    """
+    return result != previous and (previous is not None or bool(result['marks']))
+
+
+def record_submissions(contest, username, submissions, cursor=None, previous=_UNTRACKED, save_cursor=True):
+    """
+    Scores a participant's fetched submissions and writes them to the leaderboard.
+
+    Args:
+        contest: The Contest being verified.
+        username: The LeetCode username of the participant.
+        submissions: The user's recent submission dictionaries (or None).
+        cursor: The user's cursor (see score_submissions), saved once the
+            result is recorded.
+        previous: The user's result already on the leaderboard, when the
+            caller keeps track of it; the result is then only written if
+            is_new_result().
+        save_cursor: False when the caller saves the cursors itself, in bulk.
+
+    Returns:
+        The scoring dict (see score_submissions).
+    """
+    new_accepts = events.accepted(contest, cursor.unseen(submissions) if cursor is not None else submissions)
+    result, solved = score_submissions(contest, submissions, cursor)
+    events.record(contest, username, new_accepts)
+    if previous is _UNTRACKED or is_new_result(result, previous):
+        record_result(contest, username, result, solved)
+    if cursor is not None and save_cursor:
+        cursors.save(contest, username, cursor)
+    return result
+
+
+def record_result(contest, username, result, solved=None):
+    """
+    Writes a scoring dict (see score_submissions) to the contest's leaderboard.
+
+    When the matched questions are given, the entry's QuestionSolve rows are
+    brought in line with them as well. With LEADERBOARD_WRITE_BEHIND on the
+    result is only buffered (see members/writebehind.py) and None is returned.
+    """
+    if writebehind.enabled():
+        writebehind.submit(contest, username, result, solved)
+        return None
+    with db.writer():
+        entry, _ = ContestLeaderboard.objects.update_or_create(
+            contest_name=contest.name,
+            user_name=username,
+            contest_date=contest.date,
+            defaults={'contest': contest, **result},
+        )
+        if solved is not None:
+            _record_solves(entry, solved)
+    return entry
+
+
+def _record_solves(entry, solved):
+    solved_ids = {question['id'] for question in solved if question['id'] is not None}
+    existing = set(entry.solves.values_list('question_id', flat=True))
+    if existing - solved_ids:
+        entry.solves.filter(question_id__in=existing - solved_ids).delete()
+    if solved_ids - existing:
+        QuestionSolve.objects.bulk_create(
+            [QuestionSolve(entry=entry, question_id=question_id) for question_id in solved_ids - existing],
+            ignore_conflicts=True,
+        )
+
+
+def verify_user(contest, username):
+    """
+    Checks a user's recent LeetCode submissions and records their score.
+
+    Args:
+        contest: The Contest being verified.
+        username: The LeetCode username of the participant.
+
+    Returns:
+        The scoring dict written to the leaderboard (see score_submissions).
+
+    Raises:
+        VerificationError: If LeetCode could not be reached or the user is unknown.
+    """
+    cursor = cursors.load(contest, username)
+    submissions = fetch_submissions(contest, username, cursor)
+    if submissions is None:
+        raise VerificationError(f"Could not fetch submissions for '{username}'")
+    return record_submissions(contest, username, submissions, cursor)
+
+
+def fetch_submissions(contest, username, cursor):
+    """
+    Fetches a user's recent submissions, widening the window while it may
+    have cut off unseen ones (see cursors.wider_limit).
+
+    Returns:
+        The submission dictionaries, or None if LeetCode could not be reached.
+    """
+    limit = SUBMISSIONS_TO_CHECK
+    while True:
+        submissions = fetch.get_cached_submissions(username, limit)
+        wider = cursors.wider_limit(contest, cursor, submissions, limit)
+        if wider is None:
+            return submissions
+        limit = wider
+
+
+def fetch_submissions_batch(contest, user_cursors, batch_size=None):
+    """
+    Batched fetch_submissions: {username: submissions or None} for every user
+    in `user_cursors`, re-asking only for those whose window was too small.
+    """
+    fetched = {}
+    pending = list(user_cursors)
+    limit = SUBMISSIONS_TO_CHECK
+    while pending:
+        answers = fetch.get_latest_submissions_batch(pending, limit, batch_size=batch_size)
+        widened = []
+        for username in pending:
+            fetched[username] = answers.get(username)
+            wider = cursors.wider_limit(contest, user_cursors[username], fetched[username], limit)
+            if wider is not None:
+                widened.append(username)
+        pending, limit = widened, min(limit * 2, cursors.MAX_SUBMISSIONS_TO_CHECK)
+    return fetched
+
+
+def verify_users(contest, usernames, batch_size=None):
+    """
+    Verifies many participants with batched LeetCode requests.
+
+    Users whose lookup failed are left untouched on the leaderboard.
+
+    Returns:
+        A dict mapping each successfully verified username to its scoring dict.
+    """
+    user_cursors = cursors.load_many(contest, usernames)
+    fetched = fetch_submissions_batch(contest, user_cursors, batch_size=batch_size)
+    return {
+        username: record_submissions(contest, username, submissions, user_cursors[username])
+        for username, submissions in fetched.items()
+        if submissions is not None
+    }
+
+
+async def averify_user(contest, username):
+    """
+    Async version of verify_user for ASGI views.
+
+    The upstream call shares the event loop with every other in-flight verify
+    (bounded by LEETCODE_ASYNC_CONCURRENCY) instead of holding a thread.
+    """
+    cursor = await sync_to_async(cursors.load)(contest, username)
+    limit = SUBMISSIONS_TO_CHECK
+    while True:
+        submissions = await fetch.aget_latest_submissions(username, limit)
+        wider = cursors.wider_limit(contest, cursor, submissions, limit)
+        if wider is None:
+            break
+        limit = wider
+    if submissions is None:
+        raise VerificationError(f"Could not fetch submissions for '{username}'")
+    return await sync_to_async(record_submissions)(contest, username, submissions, cursor)
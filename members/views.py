@@ -1,13 +1,29 @@
-from django.shortcuts import render,redirect
-from .models import Students,Contest,IsLogin,ContestLeaderboard
+from django.shortcuts import render,redirect,get_object_or_404
+from django.http import JsonResponse,Http404,StreamingHttpResponse,HttpResponseNotAllowed,HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+import asyncio
+import time
+from django.views.decorators.http import condition
+from .models import Students,VerificationJob,StudentRating
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from datetime import datetime
-import pytz
 import json
-from django.utils.dateparse import parse_date
+import hashlib
+from functools import lru_cache
+from django.utils.cache import patch_cache_control
+from django.template.loader import get_template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.serializers.json import DjangoJSONEncoder
+from . import contests
+from . import jobs
+from . import verify
 from . import fetch
+from . import identity
+from . import leaderboard
+from . import live
+from . import metrics
 
 myvar=""
 
@@ -51,102 +67,228 @@ def login(request):
     userleet=request.POST.get("LeetcodeID")
     if(email==password):
         return render(request,'login.html')
-    if not Students.objects.filter(email=email).exists():
+    # One query; the password is compared on the row it returns
+    mystudent=Students.objects.filter(email=email).only('email','password').first()
+    if mystudent is None:
         return render(request,'login.html',{'error': 'Email not found'})
-    mystudent=Students.objects.get(email=email)
     if(mystudent.password!=password):
         return render(request,'login.html',{'error': 'incorrect password or Mail'})
-    if(mystudent.password==password):
+    if not userleet:
+        return render(request,'login.html',{'error': 'Enter your LeetCode ID'})
+    identity.log_in(request,mystudent,userleet)
+    return redirect('home')
+def _board_page(board,after=None,limit=10):
+    """One ranked page of a board in the shape leaderboard_api returns."""
+    start,rows=board.page(after,limit)
+    entries=[{
+        'rank':start+offset+1,
+        'user_name':row['user_name'],
+        'marks':row['marks'],
+        'question1':row['question1'],
+        'question2':row['question2'],
+        'question3':row['question3'],
+        'penalty':row['penalty'],
+    } for offset,row in enumerate(rows)]
+    more=start+len(rows)<len(board)
+    first=board.rows[0] if board.rows else {}
+    return {
+        'contest_id':board.contest_id,
+        'contest_name':first.get('contest_name',''),
+        'contest_date':board.contest_date,
+        'total':len(board),
+        'entries':entries,
+        'next':','.join(str(part) for part in leaderboard.rank_key(rows[-1])) if more else None,
+    }
+def _leaderboard_context():
+    """
+    The first leaderboard page for home.html.
+
+    The template caches the rendered table under board_version, so it is only
+    rendered again once the leaderboard changes.
+    """
+    board=leaderboard.latest_board()
+    if board is None or not len(board):
+        return {'board_version':None,'fragment_seconds':settings.HOME_FRAGMENT_SECONDS}
+    return {
+        'board':_board_page(board),
+        'board_version':f'{board.contest_id}:{board.etag}',
+        'fragment_seconds':settings.HOME_FRAGMENT_SECONDS,
+    }
+@lru_cache(maxsize=None)
+def _home_page_version():
+    # Changes when a deploy changes home.html or the static files it links
+    source=get_template('home.html').template.source
+    assets=staticfiles_storage.url('css/home.css')+staticfiles_storage.url('js/home.js')
+    return hashlib.md5((source+assets).encode()).hexdigest()
+def _home_etag(request):
+    """
+    An ETag for the leaderboard version of home, so browsers get a 304 until
+    the leaderboard, the contest or the user changes.
 
-        return redirect(f'/home/?leetcode_id={userleet}')
-    return render(request,'login.html')
+    The running-contest page carries a CSRF form and is never cached, nor is
+    anything in DEBUG, where templates change without a restart.
+    """
+    if request.method!='GET' or settings.DEBUG:
+        return None
+    current=contests.current_contest()
+    if current is not None and current.is_running():
+        return None
+    board=leaderboard.latest_board()
+    parts=[
+        _home_page_version(),
+        identity.leetcode_username(request) or '',
+        f'{current.contest.pk}:{current.start.isoformat()}:{current.end.isoformat()}' if current else '',
+        f'{board.contest_id}:{board.etag}' if board is not None else '',
+    ]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+@condition(etag_func=_home_etag)
 def home(request):
-    ist = pytz.timezone('Asia/kolkata')
-    now_ist = datetime.now(ist)
     ques1=0
     ques2=0
     ques3=0
-    today_ist = now_ist.date()
-    contest = Contest.objects.filter(date=today_ist).first() 
-    myvar=request.GET.get('leetcode_id')
-    if(contest==None):
-        latest_date = ContestLeaderboard.objects.latest('contest_date').contest_date
-        
-        # Get all entries for that date
-        latest_entries = ContestLeaderboard.objects.filter(contest_date=latest_date)
-        data = list(latest_entries.values(
-            'contest_name', 
-            'user_name', 
-            'marks', 
-            'question1', 
-            'question2', 
-            'question3', 
-            'contest_date'
-        ))
-        entrylist_json = json.dumps(data, cls=DjangoJSONEncoder)
+    current=contests.current_contest()
+    myvar=identity.leetcode_username(request)
+    if(current==None):
+        # The first leaderboard page comes with the page; the browser pages in the rest
         context = {
         'myvar': myvar,
         'start': None,
-        'entrylist_json': entrylist_json  # <-- Add this line
+        **_leaderboard_context(),
         }
-        print(entrylist_json)
-        return render(request, 'home.html', context)
-    curr_ti=now_ist.time()
+        return _revalidated(render(request, 'home.html', context))
+    contest=current.contest
     start=0
-     
-
-    start_ti=contest.start_time
-    end_ti=contest.end_time
    
+    job=None
     if request.method == "POST":
-        if "verify" in request.POST:
-            task1=fetch.get_latest_submissions(myvar,10)
-            mylist=fetch.display_solved_questions(task1,myvar,10)
-
-            ques1=contest.question_1
-            ques2=contest.question_2
-            ques3=contest.question_3
-            marks=0
-            if(ques1 in mylist):
-                ques1=1
-                marks+=100
-            else:
-                ques1=0
-            if(ques2 in mylist):
-                ques2=1
-                marks+=100
-            else:
-                ques2=0
-            if(ques3 in mylist):
-                marks+=100
-                ques3=1
-            else:
-                ques3=0
-            
-            entry=ContestLeaderboard.objects.update_or_create(
-            contest_name = contest.name,
-            user_name = myvar,
-            contest_date = today_ist,
-            defaults={
-                'marks':marks,
-                'question1':ques1,
-                'question2':ques2,
-                'question3':ques3,
-            }
-            )
+        if "verify" in request.POST and myvar:
+            job=jobs.enqueue(contest,myvar)
             
-    if(curr_ti>=start_ti and curr_ti<=end_ti):
+    if(current.is_running()):
         start=1
 
 
-    return render(request,'home.html',{'contest': contest,'myvar':myvar,'start':start,'ques1':ques1,
-                                       'ques2':ques2,'ques3':ques3})
-def newhome(request,leetcode_id):
-    ist = pytz.timezone('Asia/Kolkata')
-    
-    now_ist = datetime.now(ist)
+    context={'contest': contest,'myvar':myvar,'start':start,'ques1':ques1,
+             'ques2':ques2,'ques3':ques3,'job':job}
+    if not start:
+        context.update(_leaderboard_context())
+        return _revalidated(render(request,'home.html',context))
+    return render(request,'home.html',context)
+def _revalidated(response):
+    # Keep the page, but check its ETag with us before every reuse
+    patch_cache_control(response,private=True,no_cache=True)
+    return response
+def verify_status(request,job_id):
+    # Only the student who queued a job can see it
+    job=get_object_or_404(VerificationJob,pk=job_id,user_name=identity.leetcode_username(request))
+    return JsonResponse({
+        'id':job.pk,
+        'status':job.status,
+        'marks':job.marks,
+        'question1':job.question1,
+        'question2':job.question2,
+        'question3':job.question3,
+        'error':job.error,
+    })
+def _requested_board(request):
+    contest_id=request.GET.get('contest') or ''
+    if contest_id.isdigit():
+        return leaderboard.get_board(int(contest_id))
+    return leaderboard.latest_board()
+def _board_etag(request):
+    board=_requested_board(request)
+    return board.etag if board is not None else None
+def _board_last_modified(request):
+    board=_requested_board(request)
+    return board.updated_at if board is not None else None
+@condition(etag_func=_board_etag,last_modified_func=_board_last_modified)
+def leaderboard_api(request):
+    """
+    One ranked page of a contest leaderboard (latest contest unless ?contest=<id>).
 
-    today_ist = now_ist.date()
-    
-    contest = Contest.objects.filter(date=today_ist).first()  
+    Pages are chained with keyset pagination: pass the 'next' cursor of a page
+    as ?after= to get the following one.
+    """
+    board=_requested_board(request)
+    if board is None:
+        raise Http404("No leaderboard yet")
+    try:
+        limit=min(max(int(request.GET.get('limit',10)),1),100)
+        after=request.GET.get('after')
+        after=[int(part) for part in after.split(',')] if after else None
+    except ValueError:
+        return JsonResponse({'error':'Invalid limit or cursor'},status=400)
+
+    return JsonResponse(_board_page(board,after,limit))
+async def verify_now(request):
+    """Verifies inline on the event loop; the ASGI alternative to the job queue."""
+    if request.method!="POST":
+        return HttpResponseNotAllowed(['POST'])
+    # Sessions have no async API in Django 4.2
+    myvar=await sync_to_async(identity.leetcode_username)(request)
+    if not myvar:
+        return JsonResponse({'status':'failed','error':'Log in first'},status=403)
+    current=await sync_to_async(contests.current_contest)()
+    if current is None:
+        return JsonResponse({'status':'failed','error':'No contest today'},status=404)
+    contest=current.contest
+    try:
+        result=await verify.averify_user(contest,myvar)
+    except verify.VerificationError:
+        return JsonResponse({'status':'failed','error':'Could not verify submissions, please try again.'},status=502)
+    return JsonResponse({'status':'done',**result})
+async def leaderboard_stream(request):
+    """
+    Server-Sent Events feed of leaderboard changes (serve under ASGI).
+
+    Each event carries only the row that changed; 'resync' asks the page to
+    reload what it shows. Streams end after LIVE_STREAM_MAX_SECONDS and the
+    browser's EventSource reconnects on its own.
+    """
+    subscription=live.subscribe()
+    keepalive=getattr(settings,'LIVE_STREAM_KEEPALIVE_SECONDS',15)
+    deadline=time.monotonic()+getattr(settings,'LIVE_STREAM_MAX_SECONDS',300)
+
+    async def events():
+        try:
+            seen_version,_=await sync_to_async(leaderboard.current_version)()
+            yield 'retry: 3000\n\n'
+            while time.monotonic()<deadline:
+                try:
+                    event=await asyncio.wait_for(subscription.get(),timeout=keepalive)
+                except asyncio.TimeoutError:
+                    # Writes made by other worker processes only show up as a new version
+                    shared_version,local_version=await sync_to_async(leaderboard.current_version)()
+                    if shared_version!=seen_version and shared_version!=local_version:
+                        event=live.RESYNC
+                    else:
+                        yield ': keep-alive\n\n'
+                        continue
+                    seen_version=shared_version
+                yield f"event: {event['type']}\ndata: {json.dumps(event,cls=DjangoJSONEncoder)}\n\n"
+        finally:
+            live.unsubscribe(subscription)
 
+    response=StreamingHttpResponse(events(),content_type='text/event-stream')
+    response['Cache-Control']='no-cache'
+    response['X-Accel-Buffering']='no'
+    return response
+def ratings_api(request):
+    try:
+        limit=min(max(int(request.GET.get('limit',25)),1),100)
+        offset=max(int(request.GET.get('offset',0)),0)
+    except ValueError:
+        return JsonResponse({'error':'Invalid limit or offset'},status=400)
+    rows=StudentRating.objects.filter(contests_attended__gt=0).order_by('-rating','id').values(
+        'user_name','rating','total_marks','contests_attended','questions_solved'
+    )[offset:offset+limit]
+    entries=[{**row,'rank':offset+index+1,'rating':round(row['rating'])} for index,row in enumerate(rows)]
+    return JsonResponse({'entries':entries})
+@staff_member_required
+def fetch_cache_stats(request):
+    return JsonResponse(fetch.submission_cache_stats())
+def metrics_view(request):
+    """This process's request, database, upstream and template timings for Prometheus."""
+    if not getattr(settings,'METRICS_ENABLED',False) or not metrics.authorized(request):
+        raise Http404("Metrics are disabled")
+    return HttpResponse(metrics.render(),content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,234 @@
+"""
+Write-behind buffer for verify results.
+
+With LEADERBOARD_WRITE_BEHIND on, verify.record_result() only stages the
+result on the cached leaderboard (so the user sees it at once) and adds it
+to an in-process buffer. A flusher thread writes the buffer every
+LEADERBOARD_FLUSH_SECONDS, or as soon as it holds LEADERBOARD_FLUSH_SIZE
+results, with one bulk_create(update_conflicts=True) on the
+unique_leaderboard_entry key. A user verified twice between flushes is
+written once.
+
+bulk_create sends no post_save signals, so a flush does their work itself:
+ratings.entries_saved() for StudentRating, QuestionSolve rows, and
+leaderboard.rows_saved() for the shared leaderboard version. New
+AcceptedSubmission events (see members/events.py) are buffered too and go
+out in the same transaction. So are the users' submission cursors, which are
+only saved once that transaction has committed: a cursor never moves past
+accepts that aren't in the event store yet. Everything still buffered when a
+process is killed is lost, but with the cursors left behind, the next verify
+or poll of those users reads the same submissions and writes it all again.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import AcceptedSubmission, ContestLeaderboard, QuestionSolve
+from . import cursors
+from . import db
+from . import leaderboard
+from . import ratings
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_FIELDS = ['contest_name', 'user_name', 'contest_date']
+_SCORE_DEFAULTS = {
+    field: ContestLeaderboard._meta.get_field(field).get_default() for field in leaderboard.SCORE_FIELDS
+}
+
+_pending = {}
+_accepted = []
+_cursors = {}
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_flusher = None
+
+
+def enabled():
+    return getattr(settings, 'LEADERBOARD_WRITE_BEHIND', False)
+
+
+def _ensure_flusher():
+    """Starts the flusher thread the first time a result is buffered."""
+    global _flusher
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_run, name='leaderboard-flusher', daemon=True)
+        _flusher.start()
+    atexit.register(flush)
+
+
+def submit(contest, username, result, solved=None):
+    """
+    Buffers a verify result and shows it on the cached leaderboard right away.
+
+    Args:
+        contest: The Contest being verified.
+        username: The LeetCode username of the participant.
+        result: The scoring dict (see verify.score_submissions).
+        solved: The matched questions, to record as QuestionSolve rows.
+    """
+    # Score fields left out get the model defaults, as with update_or_create()
+    result = {**_SCORE_DEFAULTS, **result}
+    key = (contest.name, username, contest.date)
+    with _lock:
+        _pending[key] = (contest, result, solved)
+        size = len(_pending)
+    leaderboard.stage_row({
+        'contest_id': contest.pk,
+        'contest_name': contest.name,
+        'user_name': username,
+        'contest_date': contest.date,
+        **result,
+    })
+    _ensure_flusher()
+    if size >= getattr(settings, 'LEADERBOARD_FLUSH_SIZE', 200):
+        _wakeup.set()
+
+
+def submit_events(rows):
+    """Buffers unsaved AcceptedSubmission rows; duplicates are dropped on write."""
+    with _lock:
+        _accepted.extend(rows)
+    _ensure_flusher()
+
+
+def submit_cursors(entries):
+    """Buffers cursor cache entries (see cursors.save_many), saved after the next flush."""
+    with _lock:
+        _cursors.update(entries)
+    _ensure_flusher()
+
+
+def pending_count():
+    with _lock:
+        return len(_pending)
+
+
+def flush():
+    """
+    Writes every buffered result to the database.
+
+    Returns:
+        The number of leaderboard rows written.
+    """
+    global _pending, _accepted, _cursors
+    with _flush_lock:
+        with _lock:
+            batch, _pending = _pending, {}
+            accepted, _accepted = _accepted, []
+            cursor_entries, _cursors = _cursors, {}
+        if not batch and not accepted and not cursor_entries:
+            return 0
+        try:
+            entries, flushed = _write(batch, accepted)
+        except Exception:
+            # Put the batch back for the next flush, behind anything newer
+            with _lock:
+                _pending = {**batch, **_pending}
+                _accepted = accepted + _accepted
+                _cursors = {**cursor_entries, **_cursors}
+            raise
+        # The events the cursors are past are in the database now
+        cursors.store(cursor_entries)
+        leaderboard.rows_saved(entries, flushed)
+        return len(entries)
+
+
+def write(results):
+    """
+    Writes results straight away, the way a flush does.
+
+    Args:
+        results: {(contest_name, user_name, contest_date): (contest, result, solved)}.
+
+    Returns:
+        The leaderboard rows that changed.
+    """
+    with _flush_lock:
+        entries, flushed = _write(results)
+    leaderboard.rows_saved(entries, flushed)
+    return entries
+
+
+def _write(batch, accepted=()):
+    """
+    Returns:
+        The leaderboard rows that changed, and (contest_id, user_name, result)
+        for every result in the batch, changed or not, so their staged rows
+        can be dropped.
+    """
+    flushed = [(contest.pk, username, result) for (_, username, _), (contest, result, _) in batch.items()]
+    users = {username for _, username, _ in batch}
+    dates = {date for _, _, date in batch}
+    with db.writer():
+        if accepted:
+            AcceptedSubmission.objects.bulk_create(accepted, ignore_conflicts=True)
+        if not batch:
+            return [], flushed
+        before = {
+            (row['contest_name'], row['user_name'], row['contest_date']): row
+            for row in ContestLeaderboard.objects.filter(user_name__in=users, contest_date__in=dates).values(
+                'contest_name', 'user_name', 'contest_date', 'marks',
+                'question1', 'question2', 'question3', 'penalty', 'rating_change',
+            )
+        }
+        changed = {
+            key: value for key, value in batch.items()
+            if key not in before
+            or any(before[key][field] != value[1][field] for field in leaderboard.SCORE_FIELDS)
+        }
+        if not changed:
+            return [], flushed
+
+        ContestLeaderboard.objects.bulk_create(
+            [
+                ContestLeaderboard(contest=contest, contest_name=name, user_name=username, contest_date=date, **result)
+                for (name, username, date), (contest, result, _) in changed.items()
+            ],
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=['contest', *leaderboard.SCORE_FIELDS],
+        )
+        entries = [
+            entry for entry in ContestLeaderboard.objects.filter(
+                user_name__in={username for _, username, _ in changed},
+                contest_date__in={date for _, _, date in changed},
+            )
+            if (entry.contest_name, entry.user_name, entry.contest_date) in changed
+        ]
+        ratings.entries_saved([
+            (entry, before.get((entry.contest_name, entry.user_name, entry.contest_date)))
+            for entry in entries
+        ])
+
+        solves = {
+            entry.pk: changed[(entry.contest_name, entry.user_name, entry.contest_date)][2]
+            for entry in entries
+        }
+        solves = {pk: solved for pk, solved in solves.items() if solved is not None}
+        QuestionSolve.objects.filter(entry_id__in=solves).delete()
+        QuestionSolve.objects.bulk_create([
+            QuestionSolve(entry_id=pk, question_id=question['id'])
+            for pk, solved in solves.items()
+            for question in solved if question['id'] is not None
+        ])
+    return entries, flushed
+
+
+def _run():
+    while True:
+        _wakeup.wait(getattr(settings, 'LEADERBOARD_FLUSH_SECONDS', 2))
+        _wakeup.clear()
+        try:
+            close_old_connections()
+            flush()
+        except Exception:
+            logger.exception('Leaderboard flush failed, will retry')
+        finally:
+            close_old_connections()
@@ -0,0 +1,242 @@
+// Scripts for home.html. Each part starts only when its element is on the
+// page, and the template passes URLs and times in data- attributes.
+(() => {
+    const escapeHtml = (text) => String(text).replace(/[&<>"']/g, (c) => `&#${c.charCodeAt(0)};`);
+
+    // --- VERIFY JOB ---
+    // The verification runs in the background; poll its status until a worker is done with it.
+    function startVerifyPolling(statusEl) {
+        const statusUrl = statusEl.dataset.statusUrl;
+        const verifyButton = document.getElementById('verify-button');
+        verifyButton.disabled = true;
+        statusEl.textContent = 'Verifying...';
+
+        const poll = () => {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.status === 'queued' || job.status === 'running') {
+                        setTimeout(poll, 1000);
+                        return;
+                    }
+                    verifyButton.disabled = false;
+                    if (job.status === 'failed') {
+                        statusEl.textContent = job.error;
+                        return;
+                    }
+                    statusEl.textContent = `Verified: ${job.marks} marks`;
+                    [job.question1, job.question2, job.question3].forEach((solved, index) => {
+                        const tick = document.getElementById(`tick-${index + 1}`);
+                        if (tick) tick.style.display = solved ? '' : 'none';
+                    });
+                })
+                .catch(() => setTimeout(poll, 2000));
+        };
+        poll();
+    }
+
+    // --- LEADERBOARD ---
+    // Rows come pre-ranked from the server one page at a time (keyset pagination).
+    function startLeaderboard(boardEl) {
+        const apiUrl = boardEl.dataset.apiUrl;
+        const streamUrl = boardEl.dataset.streamUrl;
+        const rowsPerPage = 10;
+
+        const tableBody = document.getElementById('leaderboard-body');
+        const contestNameEl = document.getElementById('contest-name');
+        const contestDateEl = document.getElementById('contest-date');
+        const prevButton = document.getElementById('prev-button');
+        const nextButton = document.getElementById('next-button');
+        const pageInfoEl = document.getElementById('page-info');
+        const noEntriesEl = document.getElementById('no-entries');
+        const paginationControlsEl = document.getElementById('pagination-controls');
+
+        // cursors[i] is the 'after' cursor that loads page i + 1
+        const cursors = [null];
+        let currentPage = 1;
+        let pageCount = 0;
+        let nextCursor = null;
+        let shownContest = null;
+        let lastRankShown = 0;
+        let usersShown = new Set();
+
+        // SVG Icons for solved/unsolved
+        const checkIcon = `
+            <svg class="w-5 h-5 text-green-500 mx-auto" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke-width="2" stroke="currentColor">
+                <path stroke-linecap="round" stroke-linejoin="round" d="M9 12.75 11.25 15 15 9.75M21 12a9 9 0 1 1-18 0 9 9 0 0 1 18 0Z" />
+            </svg>`;
+        const xIcon = `
+            <svg class="w-5 h-5 text-red-400 mx-auto" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke-width="2" stroke="currentColor">
+                <path stroke-linecap="round" stroke-linejoin="round" d="m9.75 9.75 4.5 4.5m0-4.5-4.5 4.5M21 12a9 9 0 1 1-18 0 9 9 0 0 1 18 0Z" />
+            </svg>`;
+
+        // Shows the rows of one page
+        function displayList(entries) {
+            tableBody.innerHTML = '';
+
+            entries.forEach((item) => {
+                const row = document.createElement('tr');
+                row.classList.add('fade-in-row');
+                row.innerHTML = `
+                    <td class="px-4 py-3 whitespace-nowrap text-sm font-medium text-gray-100">${item.rank}</td>
+                    <td class="px-4 py-3 whitespace-nowrap text-sm text-gray-200 font-medium">${escapeHtml(item.user_name)}</td>
+                    <td class="px-4 py-3 whitespace-nowrap text-sm text-gray-500">${item.question1 ? checkIcon : xIcon}</td>
+                    <td class="px-4 py-3 whitespace-nowrap text-sm text-gray-500">${item.question2 ? checkIcon : xIcon}</td>
+                    <td class="px-4 py-3 whitespace-nowrap text-sm text-gray-500">${item.question3 ? checkIcon : xIcon}</td>
+                    <td class="px-4 py-3 whitespace-nowrap text-sm font-semibold text-gray-100 text-right">${item.marks}</td>
+                `;
+                tableBody.appendChild(row);
+            });
+        }
+
+        function updateControls() {
+            pageInfoEl.textContent = `Page ${currentPage} of ${pageCount}`;
+            prevButton.disabled = currentPage === 1;
+            nextButton.disabled = nextCursor === null;
+        }
+
+        function showEmpty() {
+            tableBody.innerHTML = '';
+            noEntriesEl.classList.remove('hidden');
+            paginationControlsEl.classList.add('hidden');
+            contestNameEl.textContent = 'Contest Leaderboard';
+            contestDateEl.textContent = 'No entries found';
+        }
+
+        // Fetches and shows one page
+        function loadPage(page) {
+            const cursor = cursors[page - 1];
+            const params = new URLSearchParams({ limit: rowsPerPage });
+            if (cursor) params.set('after', cursor);
+
+            fetch(`${apiUrl}?${params}`)
+                .then((response) => {
+                    if (response.status === 404) return null;
+                    return response.json();
+                })
+                .then((data) => showPage(page, data, true))
+                .catch((e) => console.error('Could not load the leaderboard.', e));
+        }
+
+        // Takes in one page of leaderboard_api data; the first page comes
+        // already rendered with home.html, so only its state is picked up.
+        function showPage(page, data, render) {
+            if (!data || data.total === 0) {
+                showEmpty();
+                return;
+            }
+            currentPage = page;
+            nextCursor = data.next;
+            cursors[page] = data.next;
+            pageCount = Math.ceil(data.total / rowsPerPage);
+
+            if (render) {
+                contestNameEl.textContent = data.contest_name;
+                // Add T00:00:00 to treat the date as local, avoiding timezone shifts
+                const date = new Date(data.contest_date + 'T00:00:00');
+                contestDateEl.textContent = date.toLocaleDateString('en-US', {
+                    year: 'numeric',
+                    month: 'long',
+                    day: 'numeric',
+                });
+                displayList(data.entries);
+            }
+
+            shownContest = data.contest_id;
+            lastRankShown = data.entries.length ? data.entries[data.entries.length - 1].rank : 0;
+            usersShown = new Set(data.entries.map((item) => item.user_name));
+            updateControls();
+        }
+
+        // Live updates: the server pushes only the rows that changed, so the
+        // current page is reloaded only when a change can actually affect it.
+        let reloadTimer = null;
+        const reloadCurrentPage = () => {
+            clearTimeout(reloadTimer);
+            reloadTimer = setTimeout(() => loadPage(currentPage), 500);
+        };
+        if (window.EventSource && streamUrl) {
+            const stream = new EventSource(streamUrl);
+            const onChange = (message) => {
+                const change = JSON.parse(message.data);
+                if (shownContest !== null && change.contest_id !== shownContest) return;
+                if (change.rank === null || change.rank === undefined || nextCursor === null
+                    || change.rank <= lastRankShown || usersShown.has(change.entry.user_name)) {
+                    reloadCurrentPage();
+                }
+            };
+            stream.addEventListener('row', onChange);
+            stream.addEventListener('remove', onChange);
+            stream.addEventListener('resync', reloadCurrentPage);
+        }
+
+        prevButton.addEventListener('click', () => {
+            if (currentPage > 1) loadPage(currentPage - 1);
+        });
+        nextButton.addEventListener('click', () => {
+            if (nextCursor !== null) loadPage(currentPage + 1);
+        });
+
+        const firstPage = document.getElementById('leaderboard-first-page');
+        if (firstPage) {
+            showPage(1, JSON.parse(firstPage.textContent), false);
+        } else {
+            loadPage(1);
+        }
+    }
+
+    // --- CONTEST TIMER ---
+    // data-start and data-end are the contest's local start and end, e.g. 2025-10-30T20:00:00.
+    function startContestTimer(statusLineEl) {
+        const contestStartTime = new Date(statusLineEl.dataset.start);
+        const contestEndTime = new Date(statusLineEl.dataset.end);
+
+        const updateTimer = () => {
+            const now = new Date();
+
+            if (now >= contestStartTime && now <= contestEndTime) {
+                statusLineEl.textContent = 'Contest is LIVE';
+                statusLineEl.className = 'live';
+                return;
+            }
+
+            if (now > contestEndTime) {
+                statusLineEl.textContent = 'Contest has ENDED';
+                statusLineEl.className = 'ended';
+                clearInterval(timerInterval);
+                return;
+            }
+
+            statusLineEl.className = '';
+            const timeToStart = contestStartTime - now;
+
+            const days = Math.floor(timeToStart / (1000 * 60 * 60 * 24));
+            const hours = Math.floor((timeToStart % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+            const minutes = Math.floor((timeToStart % (1000 * 60 * 60)) / (1000 * 60));
+            const seconds = Math.floor((timeToStart % (1000 * 60)) / 1000);
+
+            let countdownString = 'Contest starts in ';
+            if (days > 0) {
+                countdownString += `${days}d `;
+            }
+            countdownString += `${String(hours).padStart(2, '0')}h ${String(minutes).padStart(2, '0')}m ${String(seconds).padStart(2, '0')}s`;
+
+            statusLineEl.textContent = countdownString;
+        };
+
+        // Run it once immediately, then every second
+        updateTimer();
+        const timerInterval = setInterval(updateTimer, 1000);
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        const statusEl = document.getElementById('verify-status');
+        if (statusEl && statusEl.dataset.statusUrl) startVerifyPolling(statusEl);
+
+        const boardEl = document.getElementById('leaderboard');
+        if (boardEl) startLeaderboard(boardEl);
+
+        const statusLineEl = document.getElementById('contest-status-line');
+        if (statusLineEl) startContestTimer(statusLineEl);
+    });
+})();
@@ -0,0 +1,11 @@
+/** Tailwind builds static/css/home.css from assets/home.css: npm run build:css */
+module.exports = {
+  content: [
+    './members/templates/**/*.html',
+    './static/js/**/*.js',
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};